@@ -19,98 +19,96 @@ This file is Copyright (c) 2024 CSC111 Teaching Team
 """
 
 # Note: You may add in other import statements here as needed
-from game_data import World, Player
+# Only what every game needs is imported here; saving, profiling, hints, the leaderboard and loading the world files
+# import their modules when they are used, so that the first prompt appears sooner
+import os
+import sys
 
-if __name__ == "__main__":
-    with (open("map.txt") as map_file, open("locations.txt", encoding='utf-8') as locations_file,
-          open("items.txt") as items_file):
-        w = World(map_file, locations_file, items_file)
-    p = Player(0, 0)  # set starting location of player; you may change the x, y coordinates here as appropriate
-    allowed_moves = 30
-    grid = w.map
-    winning_items = [item for item in w.items if item.target_position == 14]
-    exam_room = w.get_location(4, 4)
-    menu = ["look", "inventory", "score", "quit"]
-    choice = ''
-
-    print("--------------------------------------------------------------------------------------------------\n"
-          "You've got an important exam coming up this evening. Last night you studied in various places.\n"
-          "Unfortunately, when you woke up this morning, you were missing some important exam-related items.\n"
-          "You must find your cheat sheet, t-card and lucky pen around the campus and deposit these items at\n"
-          f"the Exam Centre. You have {allowed_moves * 5} minutes left until the exam. It takes you 5 minutes to go\n"
-          "from one location in the campus to the next. Good luck, have fun!\n"
-          "--------------------------------------------------------------------------------------------------\n"
-          "\n")
-
-    while not p.victory and p.moves <= allowed_moves:
-        location = w.get_location(p.x, p.y)
-
-        # Check if the player has won
-        if all(item in exam_room.location_items for item in winning_items):
-            p.victory = True
-            break
-
-        print(f"Time remaining to test: {int((allowed_moves - p.moves) * 5)} minutes")
-
-        # Depending on whether it's been visited before,
-        # print either full description (first time visit) or brief description (every subsequent visit)
-        if choice == 'look':
-            pass
-
-        elif location.visited:
-            print(location.brief_description)
+from embedded import load_embedded_world
+from engine import ALLOWED_MOVES, Game, intro_text
+from renderer import Renderer, terminal_sink
 
+if __name__ == "__main__":
+    # Each turn's output is collected and written to the terminal in one go, together with the prompt
+    out = Renderer(terminal_sink())
+
+    # The introduction does not depend on the world, so a new game shows it before the world is loaded
+    resuming = len(sys.argv) > 1
+    if not resuming:
+        out(intro_text(ALLOWED_MOVES))
+        out.flush()
+
+    # The shipped campus is built from campus.py (see embedded.py), unless ADVENTURE_EMBEDDED is 0 or the world
+    # files changed after it was compiled. Then it is parsed from map.txt, locations.txt and items.txt, or loaded
+    # from their compiled snapshot if it is up to date.
+    w = load_embedded_world() if os.environ.get("ADVENTURE_EMBEDDED") != "0" else None
+    embedded = w is not None
+    if not embedded:
+        from world_cache import load_world
+        w = load_world("map.txt", "locations.txt", "items.txt")
+
+    # Set ADVENTURE_HINTS to 1 to add a hint command to the menu and end the game early once winning is impossible,
+    # using the distances between all locations (found as they are needed for the embedded campus, where a search
+    # takes microseconds, and otherwise loaded from their cache file)
+    oracle = None
+    if os.environ.get("ADVENTURE_HINTS") == "1":
+        if embedded:
+            from distances import DistanceOracle
+            oracle = DistanceOracle(w)
         else:
-            print(location.long_description)
-            location.visited = True
-
-            if location.position == 12:
-                p.movement_mod = 0.5
-                print("At the end of a long alleyway, you find an abandoned skateboard resting against the wall.\n"
-                      "You figure that four wheels are probably more efficient than two feet, and grab it.\n"
-                      "You feel that you can now move twice as fast.\n")
-
-            if location.visit_points != 0:
-                p.score += location.visit_points
-                print(f"You got {location.visit_points} points for visiting this location!")
-
-        print("What to do? \n")
-        print("[menu]")
-        for action in p.available_actions(grid, location):
-            print(action)
-        choice = input("\nEnter action: ").lower()
-
-        if choice == "[menu]":
-            print("Menu Options: \n")
-            for option in menu:
-                print(option)
-            choice = input("\nChoose action: ").lower()
-
-        if choice == "quit":
+            from world_cache import load_distances
+            oracle = load_distances(w, "map.txt", "locations.txt", "items.txt")
+
+    # Set ADVENTURE_PROFILE to a file name to time every stage of every turn and save the timings there as JSON
+    profile_path = os.environ.get("ADVENTURE_PROFILE")
+    profiler = None
+    if profile_path:
+        from profiling import Profiler
+        profiler = Profiler()
+
+    # The game loop itself lives in engine.Game so it can also be replayed headless (see run_solution.py).
+    # Given a save name (python adventure.py NAME), the game is journaled to disk and resumed on the next run.
+    if resuming:
+        from savegame import SavedGame
+        saved = SavedGame.open(w, sys.argv[1], out, oracle, profiler)
+        game, step = saved.game, saved.step
+        if saved.commands:
+            out("Welcome back! Picking up where you left off.\n")
+            game.remind()
+    else:
+        saved = None
+        game = Game(w, out, profiler=profiler, oracle=oracle, intro=False)
+        step = game.step
+
+    while not game.over:
+        out.flush(game.prompt)
+        try:
+            step(input())
+        except EOFError:
             break
 
-        w.do_actions(p, location, choice)
-
-    # Player wins the game
-    if p.victory:
-        print("Congratulations! You have successfully retrieved all of your crucial belongings! \n"
-              "With all of them in hand, you stride confindently into the Exam Centre,\n"
-              "ready to complete your final quest - the computer science exam.\n"
-              "After a long journey, it is time to focus and apply your knowledge to the true test.\n"
-              "Best of luck to you, and may your code be bug-free.")
-        print(f'You had {int((allowed_moves - p.moves) * 5)} minutes remaining.\n'
-              f'You scored a {p.score}% on your exam.')
-
+    if saved is None:
+        game.abandon()
+    elif game.over:
+        saved.discard()
     else:
-        # Player loses the game
-        if p.moves > allowed_moves:
-            print("As you rush toward your next destination and check your watch, you realize with a sinking feeling \n"
-                  "that the exam has already begun. Despite your utmost efforts, the race against the clock comes to \n"
-                  "a melancholic end. It appears the journey until now has all been for naught. However, in every \n"
-                  "defeat lies a lesson. Keep your head high, and you will be better equipped for success!")
-        # Player quits
-        else:
-            print("Regrettably, the quest to find all of your items scattered across the campus \n"
-                  "proved to be a challenge too arduous to complete. You have made the difficult decision to quit, \n"
-                  "leaving your items unclaimed. The path to success is filled with failures, and it seems as though\n"
-                  "this is one of those moments. Stay resilient, and may fortune favour you in the future.")
+        saved.close()
+        out("\nYour game has been saved. Run the game again with the same name to continue.")
+    out.flush()
+
+    # Set ADVENTURE_LEADERBOARD to a database file to record every finished game there (see leaderboard.py),
+    # under the name in ADVENTURE_PLAYER or the name of the user
+    leaderboard_path = os.environ.get("ADVENTURE_LEADERBOARD")
+    if leaderboard_path and game.over:
+        import getpass
+        from leaderboard import Leaderboard
+        from world_cache import world_digest
+        board = Leaderboard(leaderboard_path)
+        board.record(os.environ.get("ADVENTURE_PLAYER") or getpass.getuser(),
+                     world_digest("map.txt", "locations.txt", "items.txt"), game.result())
+        board.close()
+
+    if game.profiler is not None:
+        with open(profile_path, "w") as profile_file:
+            profile_file.write(game.profiler.to_json())
+        print(game.profiler.summary(), file=sys.stderr)
@@ -0,0 +1,243 @@
+"""CSC111 Project 1: Text Adventure Game Benchmarks
+
+Module Description
+==================
+
+A reproducible benchmark suite for the hot paths of the game:
+
+    - load: the time World.__init__ takes to parse map, locations and items files
+    - available_actions: the time of one Player.available_actions call
+    - do_actions: the time of one World.do_actions call (a move)
+    - turn: the time of one full engine.Game.step (action plus describing the next turn)
+    - replay: full transcripts replayed per second with engine.play, each in a fresh session.WorldOverlay of one
+      loaded world (solution.txt on the shipped campus, a seeded random walk on synthetic worlds)
+    - first_prompt (shipped campus only): the time from starting python adventure.py in a new process to its first
+      prompt, with the campus built from the embedded module (see embedded.py) and loaded from its files
+
+It runs on the shipped 5x5 campus and on square worlds of the sizes given, generated by worldgen from a fixed seed
+with the given number of items (one in a hundred of them special), writes the results as JSON and can compare
+them against a stored baseline, exiting with status 1 if any measurement got slower by more than the threshold.
+
+    python benchmark.py                                  # shipped campus plus 100x100 and 1000x1000
+    python benchmark.py --sizes 5 100 1000 2000 --items 5000
+    python benchmark.py --output results.json --save-baseline bench_baseline.json
+    python benchmark.py --baseline bench_baseline.json --threshold 0.2
+
+Copyright and Usage Information
+===============================
+
+This file is provided solely for the personal and private use of students
+taking CSC111 at the University of Toronto St. George campus. All forms of
+distribution of this code, whether as given or with any changes, are
+expressly prohibited. For more information on copyright for CSC111 materials,
+please consult our Course Syllabus.
+
+This file is Copyright (c) 2024 CSC111 Teaching Team
+"""
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable
+
+import worldgen
+from engine import ACTION_PROMPT, Game, play
+from game_data import Player, World
+from session import WorldOverlay
+from world_cache import parse_world
+
+SEED = 111
+DEFAULT_SIZES = [100, 1000]
+DEFAULT_ITEMS = 1000
+REPEATS = 5
+STARTUP_REPEATS = 10
+NOISE_FLOOR_S = 0.005
+
+
+def time_per_call(function: Callable[[], object], calls: int, repeats: int = REPEATS) -> float:
+    """Return the best (over repeats runs) average time in seconds of one call to function, over calls calls.
+    """
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(calls):
+            function()
+        best = min(best, (time.perf_counter() - start) / calls)
+    return best
+
+
+def random_walk(world: World, length: int, seed: int = SEED) -> list[str]:
+    """Return a transcript of length commands that wanders around world from (0, 0) picking things up.
+    """
+    rng = random.Random(seed)
+    player = Player(0, 0)
+    commands = []
+    while len(commands) < length:
+        directions = world.exits_at(player.x, player.y)
+        direction = rng.choice(directions).lower()
+        player.go(direction)
+        commands.append(direction)
+    return commands
+
+
+def bench_world(name: str, paths: tuple[str, str, str], transcript: list[str]) -> dict[str, float]:
+    """Return the measurements for the world stored in paths, replaying transcript.
+    """
+    results = {}
+
+    repeats = 1 if os.path.getsize(paths[1]) > 10_000_000 else REPEATS
+    results['load_s'] = time_per_call(lambda: parse_world(*paths), 1, repeats)
+    world = parse_world(*paths)
+
+    rng = random.Random(SEED)
+    cells = [(x, y) for x, y in ((rng.randrange(world.width), rng.randrange(world.height)) for _ in range(1000))
+             if world.is_walkable(x, y)]
+    players = [(Player(x, y), world.get_location(x, y)) for x, y in cells]
+    index = [0]
+
+    def available() -> None:
+        """Call available_actions for the next sample player."""
+        player, location = players[index[0] % len(players)]
+        index[0] += 1
+        player.available_actions(world, location)
+
+    def do_action() -> None:
+        """Make the next sample player move with do_actions, then put them back."""
+        player, location = players[index[0] % len(players)]
+        index[0] += 1
+        x, y = player.x, player.y
+        world.do_actions(player, location, world.exits_at(x, y)[0].lower(), write=_discard)
+        player.x, player.y = x, y
+
+    results['available_actions_ns'] = time_per_call(available, 20000) * 1e9
+    results['do_actions_ns'] = time_per_call(do_action, 20000) * 1e9
+
+    world.reset()
+    game = Game(world, allowed_moves=10 ** 9)
+    turns = random_walk(world, 20000)
+    turn_index = [0]
+
+    def turn() -> None:
+        """Play the next turn of a long game."""
+        game.step(turns[turn_index[0] % len(turns)])
+        turn_index[0] += 1
+
+    results['turn_ns'] = time_per_call(turn, 20000, 1) * 1e9
+
+    world.reset()
+
+    def replay() -> None:
+        """Replay the transcript in a fresh session of the world."""
+        play(WorldOverlay(world), transcript)
+
+    results['replays_per_s'] = 1 / time_per_call(replay, 200)
+    print(f'{name}: ' + ', '.join(f'{key}={value:,.3f}' for key, value in results.items()), file=sys.stderr)
+    return results
+
+
+def time_to_first_prompt(embedded: bool, repeats: int = STARTUP_REPEATS) -> float:
+    """Return the best (over repeats runs) time in seconds from starting python adventure.py in a new process to
+    its first prompt, with the campus built from the embedded module if embedded is True and otherwise loaded from
+    the world files (or their snapshot).
+    """
+    env = dict(os.environ, ADVENTURE_EMBEDDED='1' if embedded else '0')
+    prompt = ACTION_PROMPT.encode('utf-8')
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        with subprocess.Popen([sys.executable, 'adventure.py'], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                              env=env) as process:
+            output = b''
+            while prompt not in output:
+                chunk = process.stdout.read1()
+                if not chunk:
+                    raise RuntimeError(f'adventure.py ended before its first prompt: {output[-200:]!r}')
+                output += chunk
+            best = min(best, time.perf_counter() - start)
+            process.communicate()  # the game ends at the end of its input
+    return best
+
+
+def _discard(_: str) -> None:
+    """Throw away game output."""
+
+
+def run(sizes: list[int], num_items: int) -> dict:
+    """Run the whole suite and return its results.
+    """
+    with open('solution.txt') as solution_file:
+        solution = solution_file.read().splitlines()
+
+    results = {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'worlds': {'campus': bench_world('campus', ('map.txt', 'locations.txt', 'items.txt'), solution)},
+    }
+    startup = {'first_prompt_embedded_s': time_to_first_prompt(True),
+               'first_prompt_files_s': time_to_first_prompt(False)}
+    print('campus start-up: ' + ', '.join(f'{key}={value:,.3f}' for key, value in startup.items()), file=sys.stderr)
+    results['worlds']['campus'].update(startup)
+
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            paths = worldgen.generate(directory, size, size, num_items, num_items // 100, seed=SEED)
+            transcript = random_walk(parse_world(*paths), len(solution))
+            name = f'{size}x{size}/{num_items}'
+            results['worlds'][name] = bench_world(name, paths, transcript)
+
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """Return a description of every measurement in results that is worse than in baseline by more than
+    threshold (a fraction). Throughput measurements (per second) are worse when lower, the others when higher.
+    Load times under NOISE_FLOOR_S are too small to compare reliably and are skipped.
+    """
+    regressions = []
+    for world, measurements in results['worlds'].items():
+        for key, value in measurements.items():
+            old = baseline.get('worlds', {}).get(world, {}).get(key)
+            if not old or (key == 'load_s' and old < NOISE_FLOOR_S):
+                continue
+            change = (old - value) / old if key.endswith('_per_s') else (value - old) / old
+            if change > threshold:
+                regressions.append(f'{world} {key}: {old:,.3f} -> {value:,.3f} ({change:+.0%})')
+    return regressions
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark the text adventure game.')
+    parser.add_argument('--sizes', type=int, nargs='*', default=DEFAULT_SIZES,
+                        help='side lengths of the synthetic square worlds')
+    parser.add_argument('--items', type=int, default=DEFAULT_ITEMS, help='items in each synthetic world')
+    parser.add_argument('--output', default=None, help='write the results to this JSON file')
+    parser.add_argument('--baseline', default=None, help='compare against the results in this JSON file')
+    parser.add_argument('--save-baseline', default=None, help='also store the results as a baseline here')
+    parser.add_argument('--threshold', type=float, default=0.25, help='allowed slowdown before failing')
+    args = parser.parse_args()
+
+    all_results = run(args.sizes, args.items)
+    text = json.dumps(all_results, indent=2, sort_keys=True)
+
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            output_file.write(text + '\n')
+    else:
+        print(text)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as baseline_file:
+            baseline_file.write(text + '\n')
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            found = compare(all_results, json.load(baseline_file), args.threshold)
+        for regression in found:
+            print(f'REGRESSION {regression}', file=sys.stderr)
+        sys.exit(1 if found else 0)
@@ -0,0 +1,148 @@
+"""The default campus of the text adventure game, compiled from map.txt, locations.txt and items.txt.
+
+Generated by embedded.py; do not edit this file, run python embedded.py to rebuild it instead.
+"""
+SOURCE_CRCS = (2343388953, 3202380456, 3691266931)
+
+MAP = (
+    (0, 1, -1, -1, -1),
+    (-1, 2, 3, -1, 4),
+    (-1, 5, 6, 7, 8),
+    (-1, 9, -1, 10, 11),
+    (-1, 12, -1, 13, 14),
+)
+
+EXITS = b'\x04\n\n\x00\x02\x05\x07\n\x0e\x02\x04\x07\r\x0e\x0b\x04\x03\r\x07\x0b\x04\x01\x0c\x05\t'
+
+LOCATIONS = (
+    (0, 0,
+     'You are in the Bahen Center. There is an exit from the building to St. George Street. to the '
+     'East.\n',
+     "You are in the Bahen Center. It's usually crowded at this time of the day, but today it's "
+     'eerily quiet.\n'
+     'Only a few students are studying at the table near the doors. You better not disturb them.\n'
+     'One student is rushing down the corridor, wearing a heavy-looking backpack and carrying a '
+     'textbook\n'
+     'in their arms. You remember studying for the CSC exam in one of the computer labs.\n'
+     'There is an exit from the building to St. George Street to the East.\n'),
+    (1, 0,
+     'You are standing outside of the Bahen Center on St. George Street. You can go back into the '
+     'building to the West or continue down the street to the South.\n',
+     'You are standing outside of the Bahen Center on St. George Street. Bathed in the warm embrace '
+     'of the sunlight,\n'
+     'you want to head back to bed. However, you remember that you lost your items and reconcentrate '
+     'on the task at hand.\n'
+     'You can enter the building to the West or continue down the street to the South.\n'),
+    (2, 0,
+     'You are standing in front of the Galbraith building. You can go inside the building by going '
+     'East, or walk North / South on St. George Street.\n',
+     'You stand in front of the Galbraith building, as students rush out past you. A fellow student '
+     'nearby sits on the steps\n'
+     'while casually eating their fries, seemingly unaffected by the chaos, making you question your '
+     'own lunch plans.\n'
+     'Let’s save that for after the exam, time to find your belongings for now.\n'
+     'You can go inside the building by going East, or walk down St. George Street toward the North '
+     'or South.\n'),
+    (3, 10,
+     'You are in the Galbraith building. You can either exit to St. George Street to the West, or '
+     'College St. to the South.\n',
+     'You find yourself in the Galbraith building, surrounded by students. A blended scent of coffee '
+     'and paper fills the air.\n'
+     'The sound of chatter and hurried footsteps reverberate through the halls, as you navigate '
+     'through the crowd.\n'
+     'You can either exit to St. George Street to the West, or College St. to the South.\n'),
+    (4, 0,
+     'You are now inside the Terrence Donnelly building. You can exit back to College St. by walking '
+     'South.\n',
+     'You are now inside the Terrence Donnelly building. As soon as you enter, an impressive bamboo '
+     'garden beckons,\n'
+     'offering a moment of escape from what has been a busy day. You remember taking a break there '
+     'yesterday.\n'
+     'You can exit back to College St. by walking South.\n'),
+    (5, 0,
+     'You are standing at the corner of College and St. George Street Toward the North is the campus, '
+     'East is down College St, and there is an alleyway to the South.\n',
+     'You are standing at the corner of College and St. George St. The sidewalk is filled with '
+     'students heading to class.\n'
+     'As you stand at this intersection your eyes are still scanning through the street for your '
+     'belongings, but to no avail.\n'
+     'There are no items in sight so you decide to keep moving.\n'
+     'Toward the North is the campus, the East is down College St, and there is an alleyway to the '
+     'South.\n'),
+    (6, 0,
+     'You are now on College St. to the South of Galbraith. Enter Galbraith to the North, or travel '
+     'West / East down College St.\n',
+     'You are now on College St. to the South of Galbraith. The street stretches ahead, lined with '
+     'shops and cafes, the thought of\n'
+     'taking a break is tempting but your exam is going to start soon. You start to get anxious. '
+     'Better find those items first.\n'
+     'Enter Galbraith to the North or travel West / East down College St.\n'),
+    (7, 0,
+     'You are at the intersection of Mccaul and College St. Continue down College St. to the East, or '
+     'go South to enter McCaul St.\n',
+     'You are at the intersection of Mccaul and College St. The streets are busier than usual, and '
+     'amidst the chaos,\n'
+     'you must think of where to go next.\n'
+     'Continue down College St. to the East, or go South to enter McCaul St.\n'),
+    (8, 0,
+     'You have reached the end of College St. Go North to enter the Terrence Donnelly building, South '
+     'to enter Health Sciences, or head back East.\n',
+     'You have reached the end of College St. A cool breeze whispers through the air. You are faced '
+     'with intriguing options.\n'
+     'Go North to enter the Terrence Donnelly building and South to enter Health Sciences. If you are '
+     'feeling indecisive,\n'
+     'retrace your steps back East.\n'),
+    (9, 0,
+     'You now stand in a suspicious alleyway. You can go further South into the alley or head back '
+     'North if you are scared.\n',
+     'You now stand in a suspicious alleyway. Something seems fishy; travelling any further might be '
+     'risky. You should head back.\n'
+     'You can go further South into the alley or head back North if you are scared.\n'),
+    (10, 0,
+     'You are standing next to the Health Science building. You can enter it by going East, or down '
+     'McCaul St. toward South. You can also go North to College St.\n',
+     'You are standing next to the Health Science building. A group of students huddled together, '
+     'sharing war stories about\n'
+     'late-night study sessions and the trials of finding a reliable Wi-Fi connection on campus.\n'
+     'The Health Sciences Building looms ahead, a beacon of knowledge, or a reminder that an apple a '
+     "day won't keep the deadlines away.\n"
+     'You can enter the building by going East, or down McCaul St. toward South. You can also go '
+     'North to College St.\n'),
+    (11, 0,
+     'You are inside the Health Sciences building. You can exit to McCaul St to the West, College St. '
+     'to the North, or go inside the Exam Centre to the South.\n',
+     'You step inside the Health Sciences building. You encounter a student in a lab coat hastily '
+     'moving through the halls,\n'
+     'appearing to have made a groundbreaking discovery or, perhaps, just late to their class.\n'
+     'You can exit to McCaul St to the West, College St. to the North, or go inside the Exam Centre '
+     'to the South.\n'),
+    (12, 15,
+     'Wow! It’s… a… DEAD END?!? Head back North and retrace your steps to find more items.\n',
+     'Wow! It’s… a… DEAD END?!? Head back North and retrace your steps to find more items.\n'),
+    (13, 0,
+     'You are standing in front of the Exam Centre at the end of the street. Proceed East to enter '
+     'the Exam Centre or go back North to find more items.\n',
+     'Now, as you stand before the Exam Centre, you can feel the nervous tension and quiet '
+     'determination emanating through its doors.\n'
+     'The soft murmurs of students engaged in last-minute revisions remind you of your own impending '
+     'exam.\n'
+     'Proceed East to enter the Exam Centre or go back North to find more items.\n'),
+    (14, 0,
+     'You are at the Exam Centre. To the North is the Health Science building, and to the East is an '
+     'exit to McCaul St.\n',
+     'You enter the Exam Centre, where students are huddled in groups, nervously reviewing for their '
+     'exams.\n'
+     'You should do the same, but not before you find all of your belongings first.\n'
+     'To the North is the Health Science building, and to the East is an exit to McCaul St.\n'),
+)
+
+ITEMS = (
+    ('T-Card', 4, 14, 25),
+    ('Lucky Pen', 11, 14, 25),
+)
+
+SPECIAL_ITEMS = (
+    ('Cheat Sheet', 0, 14, 25, 'T-Card',
+     'It seems the Cheat Sheet is locked inside one of the study rooms. You should find something to '
+     'unlock the door.\n'),
+)
@@ -0,0 +1,168 @@
+"""CSC111 Project 1: Text Adventure Game Description Storage
+
+Module Description
+==================
+
+Most location descriptions are never shown during a game, so there is no reason to decode all of them when the
+world is loaded. A DescriptionStore memory-maps locations.txt, remembers only the byte offsets of every brief and
+long description, and decodes a description the first time it is needed. Recently used descriptions are kept in
+a small LRU cache, so memory stays flat no matter how many locations the world has.
+
+Copyright and Usage Information
+===============================
+
+This file is provided solely for the personal and private use of students
+taking CSC111 at the University of Toronto St. George campus. All forms of
+distribution of this code, whether as given or with any changes, are
+expressly prohibited. For more information on copyright for CSC111 materials,
+please consult our Course Syllabus.
+
+This file is Copyright (c) 2024 CSC111 Teaching Team
+"""
+import mmap
+import os
+import sys
+from array import array
+from collections import OrderedDict
+from typing import Optional
+
+CACHE_SIZE = 256
+
+
+class DescriptionStore:
+    """The brief and long descriptions of every location in a locations file, decoded on demand.
+
+    Record i of the store holds the descriptions of the i-th location in the file.
+
+    Instance Attributes:
+        - path: the absolute path of the locations file
+        - positions: the position of the location of each record
+        - points: the visit points of the location of each record
+
+    Representation Invariants:
+        - len(self.positions) == len(self.points)
+    """
+    path: str
+    positions: array
+    points: array
+
+    # Private Instance Attributes:
+    #   - _brief_starts: the byte offset of the brief description of each record
+    #   - _long_starts: the byte offset of the long description of each record (also where its brief one ends)
+    #   - _long_ends: the byte offset of the END line after the long description of each record
+    #   - _map: the memory-mapped locations file, or None until it is first needed
+    #   - _cache: the most recently decoded descriptions, keyed by (record, is_long)
+    _brief_starts: array
+    _long_starts: array
+    _long_ends: array
+    _map: Optional[mmap.mmap]
+    _cache: OrderedDict
+
+    def __init__(self, path: str, data: Optional[mmap.mmap] = None) -> None:
+        """Index the locations file at path, using data as its memory map if it has already been mapped.
+
+        The path is stored as an absolute path, so that a store unpickled from a snapshot finds the file again
+        whatever the working directory is by then.
+        """
+        self.path = os.path.abspath(path)
+        self.positions = array('q')
+        self.points = array('q')
+        self._brief_starts = array('q')
+        self._long_starts = array('q')
+        self._long_ends = array('q')
+        self._map = data
+        self._cache = OrderedDict()
+        self._index()
+
+    def __len__(self) -> int:
+        """Return the number of locations in this store.
+        """
+        return len(self.positions)
+
+    def __getstate__(self) -> dict:
+        """Return the state of this store for pickling, without the memory map or the cache.
+        """
+        state = self.__dict__.copy()
+        state['_map'] = None
+        state['_cache'] = OrderedDict()
+        return state
+
+    def brief(self, record: int) -> str:
+        """Return the brief description of the given record, including its trailing newline.
+        """
+        return self._get(record, False)
+
+    def long(self, record: int) -> str:
+        """Return the long description of the given record.
+        """
+        return self._get(record, True)
+
+    def _data(self) -> mmap.mmap:
+        """Return the memory map of the locations file, mapping it first if necessary.
+        """
+        if self._map is None:
+            with open(self.path, 'rb') as locations_file:
+                self._map = mmap.mmap(locations_file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+
+    def _get(self, record: int, is_long: bool) -> str:
+        """Return the brief or long description of the given record from the cache, decoding it if needed.
+        """
+        key = (record, is_long)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        data = self._data()
+        if is_long:
+            lines = data[self._long_starts[record]:self._long_ends[record]].decode('utf-8').split('\n')
+            text = ''.join(line.strip() + '\n' for line in lines[:-1])
+        else:
+            text = data[self._brief_starts[record]:self._long_starts[record]].decode('utf-8')
+            text = text.replace('\r\n', '\n')
+
+        text = sys.intern(text)
+        self._cache[key] = text
+        if len(self._cache) > CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return text
+
+    def _index(self) -> None:
+        """Record the position, points and description offsets of every location in the locations file.
+
+        This follows the same format as World.load_locations: a position line, a points line, a one-line brief
+        description, a long description ending with a line containing END, then a blank line.
+        """
+        data = self._data()
+        size = len(data)
+        start = 0
+
+        while start < size:
+            end = _line_end(data, start)
+            if not data[start:end].strip():
+                break
+            self.positions.append(int(data[start:end]))
+            start = end
+
+            end = _line_end(data, start)
+            self.points.append(int(data[start:end]))
+            start = end
+
+            self._brief_starts.append(start)
+            start = _line_end(data, start)
+            self._long_starts.append(start)
+
+            end = _line_end(data, start)
+            while start < size and data[start:end].strip() != b'END':
+                start = end
+                end = _line_end(data, start)
+            self._long_ends.append(start)
+
+            start = _line_end(data, end)  # skip the blank line
+
+
+def _line_end(data: mmap.mmap, start: int) -> int:
+    """Return the offset just past the line of data beginning at start.
+    """
+    end = data.find(b'\n', start)
+    return len(data) if end == -1 else end + 1
@@ -0,0 +1,174 @@
+"""CSC111 Project 1: Text Adventure Game Distance Oracle
+
+Module Description
+==================
+
+A DistanceOracle knows the fewest moves between any two locations of a World. Each row of distances (from one
+location to all others) comes from one breadth-first search over the exits of the map, and since every exit of a
+grid map goes both ways, a single row answers every question about its location.
+
+The oracle is computed once per world and cached on disk next to the world's snapshot (see
+world_cache.load_distances). With it, the game knows in O(1) per turn the fewest moves still needed to bring the
+remaining winning items to their targets: it can end a game as soon as winning has become impossible and hint
+the nearest item, and the solver and the simulator prune states that can no longer win.
+
+Copyright and Usage Information
+===============================
+
+This file is provided solely for the personal and private use of students
+taking CSC111 at the University of Toronto St. George campus. All forms of
+distribution of this code, whether as given or with any changes, are
+expressly prohibited. For more information on copyright for CSC111 materials,
+please consult our Course Syllabus.
+
+This file is Copyright (c) 2024 CSC111 Teaching Team
+"""
+from array import array
+from collections import deque
+from typing import Optional
+
+from game_data import DIRECTIONS, CARRIED, World, Item, SpecialItem, Progress
+
+# The distance between two locations with no path between them
+UNREACHABLE = 0xFFFFFFFF
+# Worlds with at most this many locations get every row computed up front (4 bytes per pair of locations)
+ALL_PAIRS_LIMIT = 2048
+
+
+class DistanceOracle:
+    """The fewest moves between any two locations of a World, by position.
+
+    Rows are computed the first time they are needed, or all at once with complete().
+
+    Instance Attributes:
+        - num_positions: the number of locations of the world
+
+    Representation Invariants:
+        - len(self._neighbours) == self.num_positions * len(DIRECTIONS)
+    """
+    num_positions: int
+
+    # Private Instance Attributes:
+    #   - _neighbours: the position reached by going in each direction of DIRECTIONS from each position (at
+    #       position * len(DIRECTIONS) plus the index of the direction), or -1 if there is no exit that way
+    #   - _rows: the distances from a position to every position, for each position whose row has been computed
+    _neighbours: array
+    _rows: dict[int, array]
+
+    def __init__(self, world: World) -> None:
+        """Initialize an oracle for the map of world (a loaded World, not a session view of one), with no rows
+        computed yet.
+        """
+        self.num_positions = len(world.locations)
+        self._neighbours = array('i', [-1]) * (self.num_positions * len(DIRECTIONS))
+        for y in range(world.height):
+            for x in range(world.width):
+                position = world.position_at(x, y)
+                if position == -1:
+                    continue
+                exits = world.exits_at(x, y)
+                for i, (name, dx, dy) in enumerate(DIRECTIONS):
+                    if name in exits:
+                        self._neighbours[position * len(DIRECTIONS) + i] = world.position_at(x + dx, y + dy)
+        self._rows = {}
+
+    @property
+    def is_complete(self) -> bool:
+        """Return whether the row of every location has been computed.
+        """
+        return len(self._rows) == self.num_positions
+
+    def complete(self) -> None:
+        """Compute the row of every location that does not have one yet.
+        """
+        for position in range(self.num_positions):
+            self.row(position)
+
+    def row(self, position: int) -> array:
+        """Return the fewest moves from position to every position (UNREACHABLE where there is no path).
+        """
+        row = self._rows.get(position)
+        if row is None:
+            row = self._rows[position] = self._search(position)
+        return row
+
+    def distance(self, start: int, end: int) -> int:
+        """Return the fewest moves from the location at position start to the one at position end, or UNREACHABLE.
+        """
+        row = self._rows.get(end)
+        if row is not None:
+            return row[start]
+        return self.row(start)[end]
+
+    def moves_to_win(self, progress: Progress, position: int) -> int:
+        """Return a lower bound on the moves a player at position needs to win, given where the winning items of
+        progress are: the most moves needed for any one winning item to be picked up (unless the player carries it)
+        and brought to its target. Return UNREACHABLE if some winning item cannot be brought to its target at all.
+        """
+        needed = 0
+        for item in progress.winning:
+            place = progress.places[id(item)]
+            target = item.target_position
+            if place == CARRIED:
+                moves = self.distance(position, target)
+            elif place == target:
+                continue
+            else:
+                to_item, to_target = self.distance(position, place), self.distance(place, target)
+                moves = UNREACHABLE if UNREACHABLE in (to_item, to_target) else to_item + to_target
+            if moves == UNREACHABLE:
+                return UNREACHABLE
+            needed = max(needed, moves)
+        return needed
+
+    def nearest_goal(self, progress: Progress, position: int) -> Optional[tuple[Item, int, int]]:
+        """Return the closest thing a player at position can do towards winning, as (item, goal, moves): go to
+        goal, the position of a winning item the player does not have yet or the target of one they carry, which
+        is moves away. A locked SpecialItem is skipped while its key is a winning item the player does not carry.
+        Return None if no winning item is left to move, or none can be reached.
+        """
+        best = None
+        for item in progress.winning:
+            place = progress.places[id(item)]
+            if place == item.target_position:
+                continue
+            if isinstance(item, SpecialItem) and not item.status and place != CARRIED and \
+                    progress.places.get(id(item.key), CARRIED) != CARRIED:
+                continue
+            goal = item.target_position if place == CARRIED else place
+            moves = self.distance(position, goal)
+            if moves != UNREACHABLE and (best is None or moves < best[2]):
+                best = (item, goal, moves)
+        return best
+
+    def first_step(self, start: int, end: int) -> Optional[str]:
+        """Return the name of a direction (as listed in DIRECTIONS) to go in from start on a shortest path to end,
+        or None if start is end or there is no path.
+        """
+        moves = self.distance(start, end)
+        if moves == 0 or moves == UNREACHABLE:
+            return None
+        row = self.row(end)
+        for i, (name, _, _) in enumerate(DIRECTIONS):
+            neighbour = self._neighbours[start * len(DIRECTIONS) + i]
+            if neighbour != -1 and row[neighbour] == moves - 1:
+                return name
+        return None
+
+    def _search(self, source: int) -> array:
+        """Return the fewest moves from source to every position, found by breadth-first search.
+        """
+        neighbours = self._neighbours
+        steps = len(DIRECTIONS)
+        distances = array('I', [UNREACHABLE]) * self.num_positions
+        distances[source] = 0
+        queue = deque([source])
+        while queue:
+            position = queue.popleft()
+            moves = distances[position] + 1
+            for i in range(position * steps, position * steps + steps):
+                other = neighbours[i]
+                if other != -1 and distances[other] == UNREACHABLE:
+                    distances[other] = moves
+                    queue.append(other)
+        return distances
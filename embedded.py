@@ -0,0 +1,137 @@
+"""CSC111 Project 1: Text Adventure Game Embedded Campus
+
+Module Description
+==================
+
+Starting the default game used to mean opening map.txt, locations.txt and items.txt (or their snapshot, through
+world_cache and pickle) and building the world from them before the first prompt. This module compiles the shipped
+campus into campus.py, a Python module of plain literals (the map, the exits of every cell, and the records of every
+location and item), so that loading the campus is an import of its cached bytecode and one pass of
+World.from_records.
+
+campus.py records a CRC of each of the three files it was made from. load_embedded_world returns None when
+campus.py is missing or the files have changed since, and the game then loads the files as before.
+
+Run this module to rebuild campus.py from the world files (after editing them), or to see whether it is up to date:
+
+    python embedded.py
+    python embedded.py --check
+
+Copyright and Usage Information
+===============================
+
+This file is provided solely for the personal and private use of students
+taking CSC111 at the University of Toronto St. George campus. All forms of
+distribution of this code, whether as given or with any changes, are
+expressly prohibited. For more information on copyright for CSC111 materials,
+please consult our Course Syllabus.
+
+This file is Copyright (c) 2024 CSC111 Teaching Team
+"""
+import importlib
+import os
+import zlib
+from typing import Optional
+
+from game_data import SpecialItem, World
+
+EMBEDDED_MODULE = 'campus'
+DEFAULT_PATHS = ('map.txt', 'locations.txt', 'items.txt')
+# The longest piece of a description written to the embedded module on one line
+TEXT_WIDTH = 96
+
+
+def source_crcs(paths: tuple[str, str, str] = DEFAULT_PATHS) -> tuple[int, int, int]:
+    """Return the CRC-32 of the contents of each of the three world files in paths.
+    """
+    crcs = []
+    for path in paths:
+        with open(path, 'rb') as world_file:
+            crcs.append(zlib.crc32(world_file.read()))
+    return crcs[0], crcs[1], crcs[2]
+
+
+def freeze_world(paths: tuple[str, str, str] = DEFAULT_PATHS, module_path: Optional[str] = None) -> None:
+    """Compile the world stored in paths into a module at module_path (by default, the embedded module next to
+    this file) that load_embedded_world can build it from.
+    """
+    from world_cache import parse_world  # only needed to rebuild the module, never to load it
+
+    world = parse_world(*paths)
+    if module_path is None:
+        module_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), EMBEDDED_MODULE + '.py')
+
+    lines = ['"""The default campus of the text adventure game, compiled from map.txt, locations.txt and items.txt.',
+             '',
+             'Generated by embedded.py; do not edit this file, run python embedded.py to rebuild it instead.',
+             '"""',
+             f'SOURCE_CRCS = {source_crcs(paths)!r}',
+             '',
+             'MAP = (']
+    lines.extend(f'    {tuple(row)!r},' for row in world.map)
+    lines.extend([')', '', f'EXITS = {bytes(world.exits)!r}', '', 'LOCATIONS = ('])
+    for location in world.locations:
+        lines.append(f'    ({location.position}, {location.visit_points},')
+        lines.extend(_text_lines(location.brief_description, '     ', ','))
+        lines.extend(_text_lines(location.long_description, '     ', '),'))
+    lines.extend([')', '', 'ITEMS = ('])
+    lines.extend(f'    ({item.name!r}, {item.start_position}, {item.target_position}, {item.target_points}),'
+                 for item in world.items if not isinstance(item, SpecialItem))
+    lines.extend([')', '', 'SPECIAL_ITEMS = ('])
+    for item in world.items:
+        if isinstance(item, SpecialItem):
+            lines.append(f'    ({item.name!r}, {item.start_position}, {item.target_position}, {item.target_points}, '
+                         f'{item.key.name!r},')
+            lines.extend(_text_lines(item.hint, '     ', '),'))
+    lines.append(')')
+
+    temp_path = f'{module_path}.{os.getpid()}.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as module_file:
+        module_file.write('\n'.join(lines) + '\n')
+    os.replace(temp_path, module_path)
+
+
+def _text_lines(text: str, indent: str, end: str) -> list[str]:
+    """Return the source lines of a string literal for text, split into adjacent literals of at most
+    TEXT_WIDTH characters each (at the ends of its lines and otherwise after spaces), indented by indent and
+    followed by end.
+    """
+    pieces = []
+    for line in text.splitlines(keepends=True) or ['']:
+        while len(line) > TEXT_WIDTH:
+            cut = line.rfind(' ', 0, TEXT_WIDTH) + 1 or TEXT_WIDTH
+            pieces.append(line[:cut])
+            line = line[cut:]
+        pieces.append(line)
+    lines = [indent + repr(piece) for piece in pieces]
+    lines[-1] += end
+    return lines
+
+
+def load_embedded_world(paths: tuple[str, str, str] = DEFAULT_PATHS) -> Optional[World]:
+    """Return a new World built from the embedded module, or None if there is no embedded module or it was not
+    compiled from the current contents of the files in paths. If those files cannot be read, the embedded world
+    is used as it is.
+    """
+    try:
+        campus = importlib.import_module(EMBEDDED_MODULE)
+    except ImportError:
+        return None
+
+    try:
+        if source_crcs(paths) != campus.SOURCE_CRCS:
+            return None
+    except OSError:
+        pass
+    return World.from_records(campus.MAP, campus.EXITS, campus.LOCATIONS, campus.ITEMS, campus.SPECIAL_ITEMS)
+
+
+if __name__ == '__main__':
+    import sys
+
+    if '--check' in sys.argv[1:]:
+        up_to_date = load_embedded_world() is not None
+        print(f'{EMBEDDED_MODULE}.py is {"up to date" if up_to_date else "missing or out of date"}')
+        sys.exit(0 if up_to_date else 1)
+    freeze_world()
+    print(f'wrote {EMBEDDED_MODULE}.py')
@@ -0,0 +1,627 @@
+"""CSC111 Project 1: Text Adventure Game Engine
+
+Module Description
+==================
+
+This module contains the game loop of the text adventure game, independent of the terminal. A Game is driven one
+command at a time with Game.step and writes everything it would have printed to an output sink, so the same loop
+runs the interactive game in adventure.py, replays transcripts such as solution.txt in-process, and can be hosted
+by a server without any stdin / stdout traffic.
+
+Besides the commands listed to the player, a line of input can pick up or drop an item in one go ("pick up t-card",
+"drop lucky pen"), or hold several commands separated by ";" ("east; south; pick up t-card"). The steps of such a
+batch are checked against the precomputed exits of the map before any of them is carried out, and the batch stops
+at the first step that cannot be done.
+
+A Game given a DistanceOracle (see distances.py) also ends as soon as winning has become impossible in the moves
+left, and offers a "hint" command naming the nearest item still to be moved.
+
+Copyright and Usage Information
+===============================
+
+This file is provided solely for the personal and private use of students
+taking CSC111 at the University of Toronto St. George campus. All forms of
+distribution of this code, whether as given or with any changes, are
+expressly prohibited. For more information on copyright for CSC111 materials,
+please consult our Course Syllabus.
+
+This file is Copyright (c) 2024 CSC111 Teaching Team
+"""
+from time import perf_counter_ns
+from typing import Callable, Iterable, Optional
+
+from distances import UNREACHABLE, DistanceOracle
+from game_data import CARRIED, DIRECTIONS, World, Location, Player, SpecialItem, ItemCollection, Progress, StateTracker
+from profiling import Profiler
+from renderer import Renderer
+
+ALLOWED_MOVES = 30
+START_X, START_Y = 0, 0
+EXAM_X, EXAM_Y = 4, 4
+EXAM_POSITION = 14
+GOALS = (EXAM_POSITION,)
+SKATEBOARD_POSITION = 12
+MENU = ["look", "inventory", "score", "quit"]
+BATCH_SEPARATOR = ";"
+PICK_UP_COMMAND = "pick up "
+DROP_COMMAND = "drop "
+
+ACTION_PROMPT = "\nEnter action: "
+MENU_PROMPT = "\nChoose action: "
+PICK_UP_PROMPT = "Which item would you like to pick up?"
+DROP_PROMPT = "Which item would you like to drop?"
+
+
+def intro_text(allowed_moves: int) -> str:
+    """Return the introduction shown before the first turn of a game with allowed_moves moves.
+    """
+    return ("--------------------------------------------------------------------------------------------------\n"
+            "You've got an important exam coming up this evening. Last night you studied in various places.\n"
+            "Unfortunately, when you woke up this morning, you were missing some important exam-related items.\n"
+            "You must find your cheat sheet, t-card and lucky pen around the campus and deposit these items at\n"
+            f"the Exam Centre. You have {allowed_moves * 5} minutes left until the exam. It takes you 5 minutes to go\n"
+            "from one location in the campus to the next. Good luck, have fun!\n"
+            "--------------------------------------------------------------------------------------------------\n"
+            "\n")
+
+
+VICTORY_TEXT = ("Congratulations! You have successfully retrieved all of your crucial belongings! \n"
+                "With all of them in hand, you stride confindently into the Exam Centre,\n"
+                "ready to complete your final quest - the computer science exam.\n"
+                "After a long journey, it is time to focus and apply your knowledge to the true test.\n"
+                "Best of luck to you, and may your code be bug-free.")
+
+OUT_OF_TIME_TEXT = ("As you rush toward your next destination and check your watch, you realize with a sinking feeling \n"
+                    "that the exam has already begun. Despite your utmost efforts, the race against the clock comes to \n"
+                    "a melancholic end. It appears the journey until now has all been for naught. However, in every \n"
+                    "defeat lies a lesson. Keep your head high, and you will be better equipped for success!")
+
+UNWINNABLE_TEXT = ("You stop and do the math: even running the whole way, there is no way to bring everything to \n"
+                   "the Exam Centre before the exam begins. Your quest ends here, but every defeat teaches you \n"
+                   "something. Plan your route better next time, and you will be better equipped for success!")
+
+QUIT_TEXT = ("Regrettably, the quest to find all of your items scattered across the campus \n"
+             "proved to be a challenge too arduous to complete. You have made the difficult decision to quit, \n"
+             "leaving your items unclaimed. The path to success is filled with failures, and it seems as though\n"
+             "this is one of those moments. Stay resilient, and may fortune favour you in the future.")
+
+
+# The name and the change in x and y of each move, by command
+_MOVES = {name.lower(): (name, dx, dy) for name, dx, dy in DIRECTIONS}
+
+# The commands a Profiler keeps apart; every other command a player types is counted under OTHER_COMMAND, so the
+# table of commands stays bounded
+_PROFILED_COMMANDS = frozenset(_MOVES) | frozenset(MENU) | {'pick up', 'drop'}
+OTHER_COMMAND = 'other'
+
+
+def _discard(_: str) -> None:
+    """An output sink that throws away everything written to it.
+    """
+
+
+class GameResult:
+    """The outcome of a finished (or abandoned) game.
+
+    Instance Attributes:
+        - victory: True if the player deposited every winning item at the Exam Centre
+        - quit: True if the game ended because the player quit or the commands ran out
+        - score: the player's final score
+        - moves: the number of moves the player used
+        - minutes_remaining: the minutes left until the exam when the game ended
+        - transcript: every command the game read, in order
+
+    Representation Invariants:
+        - not (self.victory and self.quit)
+        - self.moves >= 0
+    """
+    victory: bool
+    quit: bool
+    score: int
+    moves: float
+    minutes_remaining: int
+    transcript: list[str]
+
+    def __init__(self, victory: bool, quit_: bool, score: int, moves: float, minutes_remaining: int,
+                 transcript: list[str]) -> None:
+        """Initialize a new game result.
+        """
+        self.victory = victory
+        self.quit = quit_
+        self.score = score
+        self.moves = moves
+        self.minutes_remaining = minutes_remaining
+        self.transcript = transcript
+
+    def __repr__(self) -> str:
+        """Return a string representation of this result.
+        """
+        return (f'GameResult(victory={self.victory}, quit={self.quit}, score={self.score}, moves={self.moves}, '
+                f'minutes_remaining={self.minutes_remaining}, commands={len(self.transcript)})')
+
+
+class Game:
+    """A single game of the text adventure, advanced one command at a time.
+
+    A new Game writes the introduction and the first turn to its output sink straight away. After that, every call
+    to step feeds it the player's next line of input, exactly as adventure.py used to read it with input(); prompt
+    holds the question the game is currently waiting on.
+
+    Instance Attributes:
+        - world: the world this game is played in (it is mutated as the game is played)
+        - player: the player of this game
+        - allowed_moves: the number of moves the player may use before the exam starts
+        - over: True once the game has finished
+        - prompt: the prompt of the input the game is waiting for
+        - transcript: every command passed to step so far
+        - profiler: the Profiler timing each stage of every turn, or None if this game is not profiled
+        - progress: which winning items are at their targets (the items whose target is one of the goals the game
+        was started with; by default, the items that must be brought to the Exam Centre)
+        - oracle: the distances between the locations of the world, or None if this game does not end early when
+        winning is impossible and has no hints
+
+    Representation Invariants:
+        - self.allowed_moves >= 0
+    """
+    world: World
+    player: Player
+    allowed_moves: int
+    over: bool
+    prompt: str
+    transcript: list[str]
+    profiler: Optional[Profiler]
+    progress: Progress
+    oracle: Optional[DistanceOracle]
+
+    # Private Instance Attributes:
+    #   - _write: the output sink every message is written to
+    #   - _choice: the last action chosen by the player
+    #   - _pending: '' when waiting for an action, otherwise '[menu]', 'pick up' or 'drop' when waiting
+    #       for the answer to that follow-up question
+    #   - _quit: True if the player quit (or ran out of commands)
+    #   - _unwinnable: True if the game ended because winning had become impossible
+    #   - _menu: the options listed by the [menu] command
+    _write: Callable[[str], None]
+    _choice: str
+    _pending: str
+    _quit: bool
+    _unwinnable: bool
+    _menu: list[str]
+
+    def __init__(self, world: World, write: Optional[Callable[[str], None]] = None,
+                 allowed_moves: int = ALLOWED_MOVES, player: Optional[Player] = None,
+                 profiler: Optional[Profiler] = None, goals: Iterable[int] = GOALS,
+                 oracle: Optional[DistanceOracle] = None, track_state: bool = False, intro: bool = True) -> None:
+        """Start a new game in world, writing all output to write (or discarding it if write is None) and timing
+        every stage of every turn with profiler, if given. The game is won once every item whose target position is
+        one of goals is at its target. If oracle is given, the game ends early once winning is impossible and the
+        player can ask for hints. If track_state is True, the player's tracker keeps the state of the game and its
+        hash up to date (see game_data.StateTracker). If intro is False, the introduction is not written (because
+        the caller already showed it, see intro_text).
+        """
+        self.world = world
+        self.player = player if player is not None else Player(START_X, START_Y)
+        self.allowed_moves = allowed_moves
+        self.over = False
+        self.prompt = ACTION_PROMPT
+        self.transcript = []
+        self.profiler = profiler
+
+        self.progress = Progress(world, goals, self.player.inventory)
+        self.player.progress = self.progress
+        if track_state:
+            self.player.tracker = StateTracker(world, self.player)
+        self.oracle = oracle
+
+        self._write = write if write is not None else _discard
+        self._choice = ''
+        self._pending = ''
+        self._quit = False
+        self._unwinnable = False
+        self._menu = MENU + ['hint'] if oracle is not None else MENU
+
+        if intro:
+            self._write(intro_text(allowed_moves))
+        self._begin_turn()
+
+    def step(self, command: str) -> None:
+        """Feed the player's next line of input to this game.
+
+        Preconditions:
+            - not self.over
+        """
+        self.transcript.append(command)
+        if BATCH_SEPARATOR in command and self._pending not in ('pick up', 'drop'):
+            self._run_batch([part.strip() for part in command.split(BATCH_SEPARATOR) if part.strip()])
+        else:
+            self._dispatch(command)
+
+    def _dispatch(self, command: str) -> bool:
+        """Carry out one command, and return whether it could be done.
+        """
+        p = self.player
+        prof = self.profiler
+        start = perf_counter_ns() if prof is not None else 0
+        location = self.world.get_location(p.x, p.y)
+        if prof is not None:
+            prof.record('location', perf_counter_ns() - start)
+
+        if self._pending in ('pick up', 'drop'):
+            start = perf_counter_ns() if prof is not None else 0
+            if self._pending == 'pick up':
+                done = p.pick_up_item(location, command, self._write)
+            else:
+                done = p.drop_item(location, command, self._write)
+            if prof is not None:
+                prof.record(self._pending.replace(' ', '_'), perf_counter_ns() - start)
+            if done:
+                self._end_action()
+            return done
+
+        choice = command.lower()
+
+        if self._pending == '' and choice == "[menu]":
+            self._write("Menu Options: \n")
+            for option in self._menu:
+                self._write(option)
+            self._pending = '[menu]'
+            self.prompt = MENU_PROMPT
+            return True
+
+        self._pending = ''
+        self._choice = choice
+        start = perf_counter_ns() if prof is not None else 0
+
+        if choice == "quit":
+            self._quit = True
+            self._finish()
+            if prof is not None:
+                prof.record('dispatch', perf_counter_ns() - start, choice)
+
+        elif choice == 'pick up' and choice in self.world.valid_actions(p, location):
+            self._write(f"You found: {[thing.name.lower() for thing in location.location_items]}")
+            self._pending = 'pick up'
+            self.prompt = PICK_UP_PROMPT
+            if prof is not None:
+                prof.record('dispatch', perf_counter_ns() - start, choice)
+
+        elif choice == 'drop' and choice in self.world.valid_actions(p, location):
+            self._write(f"You have: {[thing.name.lower() for thing in p.inventory]}")
+            self._pending = 'drop'
+            self.prompt = DROP_PROMPT
+            if prof is not None:
+                prof.record('dispatch', perf_counter_ns() - start, choice)
+
+        elif choice == 'hint' and self.oracle is not None:
+            self._hint(location)
+            if prof is not None:
+                prof.record('dispatch', perf_counter_ns() - start, choice)
+            self._end_action()
+
+        elif choice.startswith(PICK_UP_COMMAND) or choice.startswith(DROP_COMMAND):
+            # Pick up or drop an item named in the same line
+            action = 'pick up' if choice.startswith(PICK_UP_COMMAND) else 'drop'
+            name = choice[len(action) + 1:]
+            if action not in self.world.valid_actions(p, location):
+                self._write("Invalid option. Please try again.\n")
+                done = False
+            elif action == 'pick up':
+                done = p.pick_up_item(location, name, self._write)
+            else:
+                done = p.drop_item(location, name, self._write)
+            if prof is not None:
+                prof.record('dispatch', perf_counter_ns() - start, action)
+            self._end_action()
+            return done
+
+        else:
+            self.world.do_actions(p, location, choice, write=self._write)
+            if prof is not None:
+                prof.record('dispatch', perf_counter_ns() - start,
+                            choice if choice in _PROFILED_COMMANDS else OTHER_COMMAND)
+            self._end_action()
+
+        return True
+
+    def _run_batch(self, steps: list[str]) -> None:
+        """Carry out the steps of a batch command in order, stopping at the first one that cannot be done.
+        """
+        valid = self._validate_batch(steps)
+        for i in range(valid):
+            if not self._dispatch(steps[i]):
+                if not self.over:
+                    self._write(f"Stopped at step {i + 1} of {len(steps)}: {steps[i]}")
+                return
+            if self.over:
+                return
+
+        if valid < len(steps):
+            self._write(f"Stopped at step {valid + 1} of {len(steps)}, which is not possible from there: "
+                        f"{steps[valid]}")
+
+    def _validate_batch(self, steps: list[str]) -> int:
+        """Return the number of steps at the start of steps that can be carried out in a row, as far as can be told
+        before doing any of them: every move must follow an exit of the cell the player will be at, and every other
+        step must be a command that needs no follow-up answer. Whether an item can be picked up or dropped is only
+        known once the steps before it are done.
+        """
+        x, y = self.player.x, self.player.y
+        exits_at = self.world.exits_at
+        for i, step in enumerate(steps):
+            choice = step.lower()
+            if choice in _MOVES:
+                name, dx, dy = _MOVES[choice]
+                if name not in exits_at(x, y):
+                    return i
+                x, y = x + dx, y + dy
+            elif not (choice in self._menu or choice.startswith(PICK_UP_COMMAND) or choice.startswith(DROP_COMMAND)):
+                return i
+        return len(steps)
+
+    def abandon(self) -> None:
+        """End this game early because there is no more input, the same way as if the player had quit.
+        """
+        if not self.over:
+            self._quit = True
+            self._finish()
+
+    def save_state(self) -> dict:
+        """Return everything needed to rebuild this game at this point with Game.from_state, as plain values:
+        the player, where every item is (by index in self.world.items), which locations have been visited,
+        which SpecialItems are unlocked, the goals of the game and where the game loop is.
+        """
+        p = self.player
+        world = self.world
+        index = {id(item): i for i, item in enumerate(world.items)}
+        return {
+            'player': (p.x, p.y, p.score, p.moves, p.movement_mod, p.victory),
+            'inventory': [index[id(item)] for item in p.inventory],
+            'placement': [(location.position, [index[id(item)] for item in location.location_items])
+                          for location in world.locations if location.location_items],
+            'visited': [location.position for location in world.locations if location.visited],
+            'unlocked': [i for i, item in enumerate(world.items) if isinstance(item, SpecialItem) and item.status],
+            'goals': sorted(self.progress.goals),
+            'game': (self.allowed_moves, self.over, self.prompt, self._choice, self._pending, self._quit),
+        }
+
+    @classmethod
+    def from_state(cls, world: World, state: dict, write: Optional[Callable[[str], None]] = None,
+                   oracle: Optional[DistanceOracle] = None, track_state: bool = False) -> 'Game':
+        """Return the game saved in state by Game.save_state, played in world (which is reset first) with oracle
+        and track_state (see Game.__init__). Nothing is written to write until the game is stepped.
+
+        Preconditions:
+            - state was saved from a game played in a world loaded from the same files as world
+        """
+        world.reset()
+        items = world.items
+        for location in world.locations:
+            location.location_items = ItemCollection()
+        for position, item_indexes in state['placement']:
+            for i in item_indexes:
+                world.locations[position].location_items.add(items[i])
+        for position in state['visited']:
+            world.locations[position].visited = True
+        for i in state['unlocked']:
+            items[i].status = True
+
+        x, y, score, moves, movement_mod, victory = state['player']
+        player = Player(x, y)
+        player.score, player.moves, player.movement_mod, player.victory = score, moves, movement_mod, victory
+        for i in state['inventory']:
+            player.inventory.add(items[i])
+
+        allowed_moves, over, prompt, choice, pending, quit_ = state['game']
+        game = cls.__new__(cls)
+        game.world = world
+        game.player = player
+        game.allowed_moves = allowed_moves
+        game.over = over
+        game.prompt = prompt
+        game.transcript = []
+        game.profiler = None
+        game.progress = Progress(world, state.get('goals', GOALS), player.inventory)
+        player.progress = game.progress
+        if track_state:
+            places = [CARRIED] * len(items)
+            for position, item_indexes in state['placement']:
+                for i in item_indexes:
+                    places[i] = position
+            player.tracker = StateTracker(world, player, places, state['visited'], state['unlocked'])
+        game.oracle = oracle
+        game._write = write if write is not None else _discard
+        game._choice = choice
+        game._pending = pending
+        game._quit = quit_
+        game._unwinnable = False
+        game._menu = MENU + ['hint'] if oracle is not None else MENU
+        return game
+
+    def set_output(self, write: Optional[Callable[[str], None]]) -> None:
+        """Send everything this game writes from now on to write (or nowhere if write is None).
+        """
+        self._write = write if write is not None else _discard
+
+    def remind(self) -> None:
+        """Write where the player is and what they can do, e.g. after a saved game is resumed.
+        """
+        if self.over:
+            return
+        location = self.world.get_location(self.player.x, self.player.y)
+        self._write(f"Time remaining to test: {int((self.allowed_moves - self.player.moves) * 5)} minutes")
+        self._write(location.brief_description)
+        self._list_actions(location)
+
+    def result(self) -> GameResult:
+        """Return the result of this game so far.
+        """
+        p = self.player
+        return GameResult(p.victory, self._quit, p.score, p.moves, int((self.allowed_moves - p.moves) * 5),
+                          list(self.transcript))
+
+    def _end_action(self) -> None:
+        """Finish the current turn after the player's action and start the next one.
+        """
+        self._pending = ''
+        self.prompt = ACTION_PROMPT
+        self._begin_turn()
+
+    def _begin_turn(self) -> None:
+        """Check whether the game is over; if not, describe the player's location and list their options.
+        """
+        p = self.player
+        if p.victory or p.moves > self.allowed_moves:
+            self._finish()
+            return
+
+        prof = self.profiler
+        start = perf_counter_ns() if prof is not None else 0
+        location = self.world.get_location(p.x, p.y)
+        if prof is not None:
+            prof.record('location', perf_counter_ns() - start)
+
+        # Check if the player has won
+        if self.progress.won:
+            p.victory = True
+            self._finish()
+            return
+
+        if self.oracle is not None and not self._can_still_win(location):
+            self._unwinnable = True
+            self._finish()
+            return
+
+        write = self._write
+        start = perf_counter_ns() if prof is not None else 0
+        write(f"Time remaining to test: {int((self.allowed_moves - p.moves) * 5)} minutes")
+
+        # Depending on whether it's been visited before,
+        # print either full description (first time visit) or brief description (every subsequent visit)
+        if self._choice == 'look':
+            pass
+
+        elif location.visited:
+            write(location.brief_description)
+
+        else:
+            write(location.long_description)
+            location.visited = True
+
+            if location.position == SKATEBOARD_POSITION:
+                p.movement_mod = 0.5
+                write("At the end of a long alleyway, you find an abandoned skateboard resting against the wall.\n"
+                      "You figure that four wheels are probably more efficient than two feet, and grab it.\n"
+                      "You feel that you can now move twice as fast.\n")
+
+            if location.visit_points != 0:
+                p.score += location.visit_points
+                write(f"You got {location.visit_points} points for visiting this location!")
+
+            if p.tracker is not None:
+                p.tracker.visit(location.position)
+                p.tracker.sync(p)
+
+        if prof is not None:
+            prof.record('describe', perf_counter_ns() - start)
+            start = perf_counter_ns()
+        self._list_actions(location)
+        if prof is not None:
+            prof.record('available_actions', perf_counter_ns() - start)
+
+    def _can_still_win(self, location: Location) -> bool:
+        """Return whether the player at location could still bring every winning item to its target in the moves
+        left, going by the oracle's distances (and assuming the skateboard, if the player has it or can still reach
+        it, is used all the way).
+        """
+        needed = self.oracle.moves_to_win(self.progress, location.position)
+        if needed == UNREACHABLE:
+            return False
+        move_cost = self.player.movement_mod
+        if move_cost > 0.5 and self._can_reach_skateboard(location):
+            move_cost = 0.5
+        return self.player.moves + needed * move_cost <= self.allowed_moves
+
+    def _can_reach_skateboard(self, location: Location) -> bool:
+        """Return whether the world has a location at SKATEBOARD_POSITION (where the skateboard is found) and a player
+        at location can reach it.
+        """
+        return SKATEBOARD_POSITION < self.oracle.num_positions and \
+            self.oracle.distance(location.position, SKATEBOARD_POSITION) != UNREACHABLE
+
+    def _hint(self, location: Location) -> None:
+        """Write where the nearest winning item still to be moved, or the target of one the player carries, is.
+        """
+        nearest = self.oracle.nearest_goal(self.progress, location.position)
+        if nearest is None:
+            self._write("Hint: there is nothing left to find that you can reach.")
+            return
+        item, goal, moves = nearest
+        if goal == item.target_position:
+            where = f"The {item.name} belongs"
+        else:
+            where = f"The {item.name} is"
+        if moves == 0:
+            self._write(f"Hint: {where} right here.")
+        else:
+            direction = self.oracle.first_step(location.position, goal)
+            self._write(f"Hint: {where} {moves} {'move' if moves == 1 else 'moves'} away. "
+                        f"Head {direction.lower()}.")
+
+    def _list_actions(self, location: Location) -> None:
+        """Write the actions the player can choose from at location.
+        """
+        self._write("What to do? \n")
+        self._write("[menu]")
+        for action in self.player.available_actions(self.world, location):
+            self._write(action)
+
+    def _finish(self) -> None:
+        """End the game and write the ending the player earned.
+        """
+        self.over = True
+        p = self.player
+        write = self._write
+
+        # Player wins the game
+        if p.victory:
+            write(VICTORY_TEXT)
+            write(f'You had {int((self.allowed_moves - p.moves) * 5)} minutes remaining.\n'
+                  f'You scored a {p.score}% on your exam.')
+
+        # Player loses the game
+        elif p.moves > self.allowed_moves:
+            write(OUT_OF_TIME_TEXT)
+
+        elif self._unwinnable:
+            write(UNWINNABLE_TEXT)
+
+        # Player quits
+        else:
+            write(QUIT_TEXT)
+
+
+def play(world: World, commands: Iterable[str], output: Optional[Callable[[str], None]] = None,
+         allowed_moves: int = ALLOWED_MOVES, profiler: Optional[Profiler] = None,
+         goals: Iterable[int] = GOALS, oracle: Optional[DistanceOracle] = None) -> GameResult:
+    """Play a whole game in world, reading the player's input from commands, and return the result of the game.
+
+    Everything the game prints is sent to output once per turn, as one piece of text ending with the prompt (see
+    renderer.Renderer); if output is None, nothing is rendered at all.
+
+    If profiler is given, every stage of every turn is timed with it. The game is won once every item whose target
+    position is one of goals is at its target. If oracle is given, the game ends early once winning is impossible.
+
+    The game ends as if the player quit if commands runs out first. world is mutated; call world.reset() before
+    reusing it for another game.
+    """
+    out = Renderer(output)
+    game = Game(world, out if output is not None else None, allowed_moves, profiler=profiler, goals=goals,
+                oracle=oracle)
+    for command in commands:
+        if game.over:
+            break
+        out.flush(game.prompt)
+        game.step(command.rstrip('\n'))
+    game.abandon()
+    out.flush()
+    return game.result()
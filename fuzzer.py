@@ -0,0 +1,378 @@
+"""CSC111 Project 1: Text Adventure Game Invariant Fuzzer
+
+Module Description
+==================
+
+Plays the game with random streams of commands and checks the representation invariants of the game's classes
+after every step. Each case is one game in a fresh session.WorldOverlay, fed commands drawn from its seed: legal
+ones (the actions available where the player stands, the names of items that are there or in the bag) and illegal
+ones (moves into walls, items that are not there, misspelled or mis-cased commands, empty lines and batches of
+several commands separated by ";").
+
+A case fails if a step raises an exception or leaves an invariant broken (see check_invariants). A failing case is
+then shrunk: commands are removed, and batches split into their steps, for as long as the same invariant still
+breaks, so the reported transcript is one that can be read and replayed by hand.
+
+Cases are spread over a pool of worker processes, each of which loads the world once when it starts.
+
+    python fuzzer.py                              # the shipped campus, 100,000 cases of up to 200 steps
+    python fuzzer.py --cases 1000000 --jobs 8 --seed 3
+    python fuzzer.py --world big_map.txt big_locations.txt big_items.txt --steps 1000
+
+Copyright and Usage Information
+===============================
+
+This file is provided solely for the personal and private use of students
+taking CSC111 at the University of Toronto St. George campus. All forms of
+distribution of this code, whether as given or with any changes, are
+expressly prohibited. For more information on copyright for CSC111 materials,
+please consult our Course Syllabus.
+
+This file is Copyright (c) 2024 CSC111 Teaching Team
+"""
+import multiprocessing
+import os
+import random
+import time
+from typing import Callable, Optional
+
+from engine import (ACTION_PROMPT, MENU_PROMPT, PICK_UP_PROMPT, DROP_PROMPT, MENU, BATCH_SEPARATOR, PICK_UP_COMMAND,
+                    DROP_COMMAND, Game)
+from game_data import DIRECTIONS, CARRIED, World, Item, SpecialItem
+from session import WorldOverlay
+from world_cache import load_world
+
+# The most steps of one case
+STEPS_PER_CASE = 200
+# Cases handed to a worker at a time
+CASES_PER_TASK = 500
+# The chance that a command is one of the actions available where the player stands
+LEGAL_CHANCE = 0.6
+# The chance that a command is a batch of several commands
+BATCH_CHANCE = 0.08
+# The chance that a command is "quit" (every other draw skips it, so cases are not cut short)
+QUIT_CHANCE = 0.002
+# Commands that are never valid
+GARBAGE = ['', ' ', 'fly', 'xyzzy', 'pick', 'pick up ', 'drop ', 'go north', 'NORTH ', 'n', ';', ';;', '[MENU]',
+           'menu', 'pick up nothing', 'drop nothing', '\t', 'quit now', 'score;', 'north;;south', 'ñ', '-1']
+PROMPTS = (ACTION_PROMPT, MENU_PROMPT, PICK_UP_PROMPT, DROP_PROMPT)
+
+
+def vocabulary(world: World) -> list[str]:
+    """Return the commands the fuzzer draws from besides the actions available at the player's location: every
+    direction, menu option and item name, in several spellings, and the one-line pick up and drop commands.
+    """
+    words = ['[menu]', 'pick up', 'drop', 'hint'] + [option for option in MENU if option != 'quit']
+    for name, _, _ in DIRECTIONS:
+        words.extend([name.lower(), name, name.upper()])
+    for item in world.items:
+        words.extend([item.name, item.name.lower(), item.name.upper(), PICK_UP_COMMAND + item.name.lower(),
+                      DROP_COMMAND + item.name.lower(), PICK_UP_COMMAND + item.name.upper()])
+    return words + GARBAGE
+
+
+def next_command(rng: random.Random, game: Game, words: list[str]) -> str:
+    """Return a random next command for game, drawn from words or from what the player can do right now.
+    """
+    if rng.random() < QUIT_CHANCE:
+        return 'quit'
+    if rng.random() < BATCH_CHANCE:
+        return (BATCH_SEPARATOR + ' ').join(rng.choice(words) for _ in range(rng.randint(2, 4)))
+    if rng.random() >= LEGAL_CHANCE:
+        return rng.choice(words)
+
+    player = game.player
+    if game.prompt in (PICK_UP_PROMPT, DROP_PROMPT):
+        items = game.world.get_location(player.x, player.y).location_items if game.prompt == PICK_UP_PROMPT \
+            else player.inventory
+        names = [item.name for item in items]
+        return rng.choice(names) if names else rng.choice(words)
+    if game.prompt == MENU_PROMPT:
+        return rng.choice(MENU[:-1])
+    location = game.world.get_location(player.x, player.y)
+    return rng.choice(player.available_actions(game.world, location) + MENU[:-1] + ['[menu]']).lower()
+
+
+def check_invariants(game: Game, items: bool = True) -> Optional[tuple[str, str]]:
+    """Return the first representation invariant game breaks, as (invariant, details), or None if it keeps them
+    all. game must be played in a session.WorldOverlay.
+
+    The invariants of the items (where each one is and what Progress records about them) take time proportional to
+    the number of items and the locations visited; they are skipped unless items is True.
+    """
+    world = game.world
+    player = game.player
+    num_positions = len(world.template.locations)
+
+    if not (player.x >= 0 and player.y >= 0):
+        return 'Player: self.x >= 0 and self.y >= 0', f'player at ({player.x}, {player.y})'
+    if world.position_at(player.x, player.y) == -1:
+        return 'Player: stands on a location', f'player at ({player.x}, {player.y})'
+    if not player.score >= 0:
+        return 'Player: self.score >= 0', f'score is {player.score}'
+    if not player.moves >= 0:
+        return 'Player: self.moves >= 0', f'moves is {player.moves}'
+    if not game.over and player.moves > game.allowed_moves:
+        return 'Game: the game is over once the moves run out', f'{player.moves} moves of {game.allowed_moves}'
+    if not game.over and game.prompt not in PROMPTS:
+        return 'Game: a game that is not over waits on a prompt', repr(game.prompt)
+    result = game.result()
+    if result.victory and result.quit:
+        return 'GameResult: not (self.victory and self.quit)', ''
+    tracker = player.tracker
+    if tracker is not None and (tracker.cell, tracker.movement_mod, tracker.moves, tracker.score) != \
+            (player.y * world.width + player.x, player.movement_mod, player.moves, player.score):
+        return "StateTracker: the player's cell, movement_mod, moves and score are the player's", \
+            f'{(tracker.cell, tracker.movement_mod, tracker.moves, tracker.score)}'
+
+    # The map lookups around the player, including off the edges of the map
+    for _, dx, dy in DIRECTIONS:
+        x, y = player.x + dx, player.y + dy
+        row = world.map[y] if 0 <= y < len(world.map) else ()
+        expected = row[x] if 0 <= x < len(row) else -1
+        location = world.get_location(x, y)
+        if (location is None) != (expected == -1) or location is not None and location.position != expected:
+            return 'World: get_location(x, y) is the location at (x, y) or None', f'({x}, {y})'
+    if not items:
+        return None
+
+    # Every item is in exactly one place: the bag, a location the session has looked up, or its untouched start
+    places: dict[int, list[int]] = {}
+    for item in player.inventory:
+        places.setdefault(id(item), []).append(CARRIED)
+    touched = set()
+    for location in world.touched_locations():
+        touched.add(location.position)
+        for item in location.location_items:
+            places.setdefault(id(item), []).append(location.position)
+    for item in world.items:
+        if item.start_position not in touched:
+            places.setdefault(id(item), []).append(item.start_position)
+        if len(places.get(id(item), ())) != 1:
+            return 'World: every item is in exactly one place', f'{item.name} at {places.get(id(item), [])}'
+        error = _check_item(item, num_positions)
+        if error is not None:
+            return error
+
+    progress = game.progress
+    placed = 0
+    for item in progress.winning:
+        if progress.places[id(item)] != places[id(item)][0]:
+            return 'Progress: self.places is where each winning item is', \
+                f'{item.name} at {places[id(item)][0]}, recorded at {progress.places[id(item)]}'
+        placed += progress.places[id(item)] == item.target_position
+    if not 0 <= progress.num_placed <= len(progress.winning) or progress.num_placed != placed:
+        return 'Progress: self.num_placed is the number of winning items at their targets', \
+            f'{progress.num_placed} recorded, {placed} placed'
+    return None if tracker is None else _check_tracker(game, places, touched)
+
+
+def _check_tracker(game: Game, places: dict[int, list[int]], touched: set[int]) -> Optional[tuple[str, str]]:
+    """Return the first representation invariant the tracker of game's player breaks, as (invariant, details), or
+    None. places is where each item is, by id of the item, and touched the positions of the locations the session
+    has looked up (no other location can have been visited).
+    """
+    tracker = game.player.tracker
+    world = game.world
+    for i, item in enumerate(world.items):
+        if tracker.places[i] != places[id(item)][0]:
+            return 'StateTracker: self.places is where each item is', \
+                f'{item.name} at {places[id(item)][0]}, recorded at {tracker.places[i]}'
+        if isinstance(item, SpecialItem) and item.status != bool(tracker.unlocked >> i & 1):
+            return 'StateTracker: self.unlocked is the unlocked SpecialItems', f'{item.name}: {item.status}'
+    visited = sum(1 << position for position in touched if world.location_at(position).visited)
+    if tracker.visited != visited:
+        return 'StateTracker: self.visited is the visited locations', f'{tracker.visited:b} != {visited:b}'
+    if tracker.hash != tracker.full_hash():
+        return 'StateTracker: self.hash == self.full_hash()', f'{tracker.hash:x} != {tracker.full_hash():x}'
+    return None
+
+
+def _check_item(item: Item, num_positions: int) -> Optional[tuple[str, str]]:
+    """Return the first representation invariant item breaks, as (invariant, details), or None.
+    """
+    if item.name == '':
+        return "Item: self.name != ''", ''
+    if not (0 <= item.curr_position < num_positions and 0 <= item.target_position < num_positions):
+        return 'Item: self.curr_position and self.target_position are positions of locations', \
+            f'{item.name}: {item.curr_position}, {item.target_position} of {num_positions}'
+    return None
+
+
+def play_case(world: World, seed: int, steps: int = STEPS_PER_CASE,
+              words: Optional[list[str]] = None) -> tuple[list[str], Optional[tuple[str, str]]]:
+    """Play one random case in a fresh session of world, drawing up to steps commands from seed, and return the
+    commands played and the first invariant broken (see check_invariants), or None if the case passed.
+    """
+    rng = random.Random(seed)
+    words = words if words is not None else vocabulary(world)
+    commands = []
+
+    def source(game: Game) -> Optional[str]:
+        """Return the next random command for game, or None once the case has played steps commands."""
+        return next_command(rng, game, words) if len(commands) < steps else None
+
+    return commands, _play(world, source, commands)
+
+
+def replay(world: World, commands: list[str]) -> Optional[tuple[str, str]]:
+    """Play commands in a fresh session of world, checking the invariants after every step, and return the first
+    one broken, or None.
+    """
+    remaining = iter(commands)
+    return _play(world, lambda _: next(remaining, None), [])
+
+
+def _play(world: World, source: Callable[[Game], Optional[str]], played: list[str]) -> Optional[tuple[str, str]]:
+    """Play a game in a fresh session of world with the commands source gives for it until the game is over or
+    source returns None, appending each to played, and return the first invariant broken, or None.
+
+    Items only ever move through the player's bag, so the invariants of the items are checked after the steps that
+    changed what the player carries (and after every batch, which can pick up and drop again), and at the end.
+    """
+    try:
+        game = Game(WorldOverlay(world), track_state=True)
+        failure = check_invariants(game)
+        bag = list(game.player.inventory)
+        while failure is None and not game.over:
+            command = source(game)
+            if command is None:
+                break
+            played.append(command)
+            game.step(command)
+            new_bag = list(game.player.inventory)
+            failure = check_invariants(game, new_bag != bag or BATCH_SEPARATOR in command)
+            bag = new_bag
+        if failure is None:
+            failure = check_invariants(game)
+    except Exception as error:  # a crash is a failure like any other, to be shrunk and reported
+        failure = f'raises {type(error).__name__}', str(error)
+    return failure
+
+
+def shrink(world: World, commands: list[str], invariant: str) -> list[str]:
+    """Return a shortest version of commands found that still breaks invariant: batches are split into their steps
+    where that keeps the failure, then runs of commands (halving in length down to single commands) are removed.
+    """
+    def fails(candidate: list[str]) -> bool:
+        """Return whether candidate still breaks the invariant."""
+        failure = replay(world, candidate)
+        return failure is not None and failure[0] == invariant
+
+    i = 0
+    while i < len(commands):
+        if BATCH_SEPARATOR in commands[i]:
+            steps = [step.strip() for step in commands[i].split(BATCH_SEPARATOR) if step.strip()]
+            candidate = commands[:i] + steps + commands[i + 1:]
+            if fails(candidate):
+                commands = candidate
+        i += 1
+
+    chunk = max(1, len(commands) // 2)
+    while True:
+        removed = False
+        i = 0
+        while i < len(commands):
+            candidate = commands[:i] + commands[i + chunk:]
+            if fails(candidate):
+                commands = candidate
+                removed = True
+            else:
+                i += chunk
+        if chunk == 1 and not removed:
+            return commands
+        chunk = max(1, chunk // 2) if not removed else chunk
+
+
+# The world loaded by this worker process (see _start_worker), or by the main process when there is one worker
+_worker_world: Optional[World] = None
+_worker_words: list[str] = []
+
+
+def _start_worker(paths: tuple[str, str, str]) -> None:
+    """Load the world of paths once for every case this worker process will play.
+    """
+    global _worker_world, _worker_words
+    _worker_world = load_world(*paths)
+    _worker_words = vocabulary(_worker_world)
+
+
+def _run_task(task: tuple[int, int, int]) -> tuple[int, int, list[tuple[int, str, str, list[str]]]]:
+    """Play the cases of task, (first seed, number of cases, steps per case), in this worker's world and return
+    the number of cases and of steps played, and every failure as (seed, invariant, details, shrunk commands).
+
+    Only the first failing case of each invariant in the task is shrunk and reported.
+    """
+    first, cases, steps = task
+    played = 0
+    failures = []
+    seen = set()
+    for seed in range(first, first + cases):
+        commands, failure = play_case(_worker_world, seed, steps, _worker_words)
+        played += len(commands)
+        if failure is not None and failure[0] not in seen:
+            seen.add(failure[0])
+            failures.append((seed, failure[0], failure[1], shrink(_worker_world, commands, failure[0])))
+    return cases, played, failures
+
+
+def fuzz(paths: tuple[str, str, str] = ('map.txt', 'locations.txt', 'items.txt'), cases: int = 100_000,
+         steps: int = STEPS_PER_CASE, seed: int = 0, jobs: Optional[int] = None) -> dict:
+    """Play cases random cases of up to steps commands each in the world stored in paths, with seeds counting up
+    from seed * cases, over a pool of jobs worker processes (os.cpu_count() if jobs is None; with jobs == 1, in
+    this process). Return the number of cases and steps played, the time taken and, for every invariant broken,
+    the shortest shrunk failing case found, as {invariant: (seed, details, commands)}.
+    """
+    start = time.perf_counter()
+    first = seed * cases
+    tasks = [(first + i, min(CASES_PER_TASK, cases - i), steps) for i in range(0, cases, CASES_PER_TASK)]
+    jobs = jobs if jobs is not None else os.cpu_count() or 1
+    if jobs == 1 or len(tasks) <= 1:
+        _start_worker(paths)
+        outcomes = map(_run_task, tasks)
+        pool = None
+    else:
+        pool = multiprocessing.Pool(min(jobs, len(tasks)), _start_worker, (paths,))
+        outcomes = pool.imap_unordered(_run_task, tasks)
+
+    played_cases = played_steps = 0
+    failures = {}
+    try:
+        for task_cases, task_steps, task_failures in outcomes:
+            played_cases += task_cases
+            played_steps += task_steps
+            for case_seed, invariant, details, commands in task_failures:
+                best = failures.get(invariant)
+                if best is None or (len(commands), case_seed) < (len(best[2]), best[0]):
+                    failures[invariant] = (case_seed, details, commands)
+    finally:
+        if pool is not None:
+            pool.terminate()
+
+    return {'cases': played_cases, 'steps': played_steps, 'elapsed': time.perf_counter() - start,
+            'failures': failures}
+
+
+if __name__ == '__main__':
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description='Fuzz the text adventure game and check its invariants.')
+    parser.add_argument('--world', nargs=3, default=['map.txt', 'locations.txt', 'items.txt'],
+                        metavar=('MAP', 'LOCATIONS', 'ITEMS'))
+    parser.add_argument('--cases', type=int, default=100_000)
+    parser.add_argument('--steps', type=int, default=STEPS_PER_CASE, help='the most commands of one case')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--jobs', type=int, default=None, help='worker processes (default: one per core)')
+    args = parser.parse_args()
+
+    report = fuzz(tuple(args.world), args.cases, args.steps, args.seed, args.jobs)
+    for broken, (failing_seed, failure_details, transcript) in sorted(report['failures'].items()):
+        print(f'{broken} ({failure_details}), seed {failing_seed}, {len(transcript)} commands:')
+        for line in transcript:
+            print(f'    {line!r}')
+    elapsed = report['elapsed']
+    print(f'{report["cases"]:,} cases, {report["steps"]:,} steps in {elapsed:.1f} s '
+          f'({report["steps"] / elapsed * 60:,.0f} steps/min), {len(report["failures"])} invariants broken',
+          file=sys.stderr)
+    sys.exit(1 if report['failures'] else 0)
@@ -0,0 +1,368 @@
+"""CSC111 Project 1: Text Adventure Game Leaderboard
+
+Module Description
+==================
+
+Keeps every finished game in a local SQLite database: who played (the player), which world they played (the
+world_cache.world_digest of its files), when the game ended, and how it ended (victory, quit, score, moves and
+minutes remaining). From it, the best runs of a world and the history of a player can be read back.
+
+Games from many sessions at once (the threads or the asyncio tasks of server.py) never wait on the database:
+Leaderboard.record only puts the run in a queue. One writer thread owns the only connection that writes, takes
+everything that has been queued (up to BATCH_SIZE runs) and inserts it in a single transaction, so the cost of a
+commit is shared by every run of the batch. If writing fails, the writer stops and the error is raised by every
+later flush and close, so a caller waiting for its runs never waits forever.
+
+Reads use their own connection per thread, and the database is in WAL mode so they never wait for the writer. The
+runs table refers to worlds by a small integer id (the worlds table holds their digests), which keeps its indexes
+small, and is indexed for its two queries:
+
+    - runs_top (world, victory DESC, score DESC, minutes_remaining DESC, ended): top(world, n) reads the first n
+      entries of the world's part of the index, without sorting, however many runs are recorded
+    - runs_history (player, ended): history(player, n) reads the player's most recent n entries
+
+Run this module to show the top runs of the shipped campus, or with --benchmark N to record N random runs from
+several threads into a scratch database and time the inserts and the queries.
+
+Copyright and Usage Information
+===============================
+
+This file is provided solely for the personal and private use of students
+taking CSC111 at the University of Toronto St. George campus. All forms of
+distribution of this code, whether as given or with any changes, are
+expressly prohibited. For more information on copyright for CSC111 materials,
+please consult our Course Syllabus.
+
+This file is Copyright (c) 2024 CSC111 Teaching Team
+"""
+import queue
+import sqlite3
+import threading
+import time
+from typing import Optional, Union
+
+from engine import GameResult
+
+LEADERBOARD_PATH = 'leaderboard.db'
+# The most runs inserted in one transaction
+BATCH_SIZE = 4096
+# The page cache of the writer's connection, in KiB: big enough to keep the hot pages of both indexes, so that
+# inserting into them does not rewrite the same pages over and over
+WRITER_CACHE_KB = 65536
+# The size the write-ahead log grows to (in pages) before it is copied back into the database
+CHECKPOINT_PAGES = 16384
+# How long (in seconds) flush waits for the writer before checking that it is still running
+FLUSH_TIMEOUT = 1.0
+# The schema of the database (every statement can be run again on an existing database)
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS worlds (
+    id INTEGER PRIMARY KEY,
+    digest TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS runs (
+    player TEXT NOT NULL,
+    world INTEGER NOT NULL REFERENCES worlds (id),
+    ended REAL NOT NULL,
+    victory INTEGER NOT NULL,
+    quit INTEGER NOT NULL,
+    score INTEGER NOT NULL,
+    moves REAL NOT NULL,
+    minutes_remaining INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_top ON runs (world, victory DESC, score DESC, minutes_remaining DESC, ended);
+CREATE INDEX IF NOT EXISTS runs_history ON runs (player, ended);
+'''
+COLUMNS = ('player', 'world', 'ended', 'victory', 'quit', 'score', 'moves', 'minutes_remaining')
+INSERT = f'INSERT INTO runs ({", ".join(COLUMNS)}) VALUES ({", ".join("?" * len(COLUMNS))})'
+SELECT = ('SELECT player, digest, ended, victory, quit, score, moves, minutes_remaining '
+          'FROM runs JOIN worlds ON world = id')
+TOP = f'{SELECT} WHERE digest = ? ORDER BY victory DESC, score DESC, minutes_remaining DESC, ended LIMIT ?'
+HISTORY = f'{SELECT} WHERE player = ? ORDER BY ended DESC LIMIT ?'
+
+
+class Run:
+    """One finished game, as recorded in the leaderboard.
+
+    Instance Attributes:
+        - player: the name of the player
+        - world: the digest of the files of the world the game was played in (see world_cache.world_digest)
+        - ended: when the game ended, in seconds since the epoch
+        - victory: True if the player won
+        - quit: True if the player quit (or ran out of input)
+        - score: the player's final score
+        - moves: the number of moves the player used
+        - minutes_remaining: the minutes left until the exam when the game ended
+
+    Representation Invariants:
+        - not (self.victory and self.quit)
+    """
+    player: str
+    world: str
+    ended: float
+    victory: bool
+    quit: bool
+    score: int
+    moves: float
+    minutes_remaining: int
+
+    def __init__(self, player: str, world: str, ended: float, victory: bool, quit_: bool, score: int,
+                 moves: float, minutes_remaining: int) -> None:
+        """Initialize a new run.
+        """
+        self.player = player
+        self.world = world
+        self.ended = ended
+        self.victory = bool(victory)
+        self.quit = bool(quit_)
+        self.score = score
+        self.moves = moves
+        self.minutes_remaining = minutes_remaining
+
+    def __repr__(self) -> str:
+        """Return a string representation of this run.
+        """
+        return (f'Run(player={self.player!r}, ended={self.ended:.3f}, victory={self.victory}, score={self.score}, '
+                f'moves={self.moves}, minutes_remaining={self.minutes_remaining})')
+
+
+class Leaderboard:
+    """A leaderboard and run history stored in a SQLite database, written through a single writer thread.
+
+    Instance Attributes:
+        - path: the path of the database
+        - recorded: the number of runs written to the database by this leaderboard
+        - batches: the number of transactions they were written in
+
+    Representation Invariants:
+        - self.recorded >= self.batches >= 0
+    """
+    path: str
+    recorded: int
+    batches: int
+
+    # Private Instance Attributes:
+    #   - _queue: the runs waiting to be written (as rows of COLUMNS, with the digest of the world), and the
+    #       events of flush calls waiting for them, ending with None once the leaderboard is closed
+    #   - _writer: the writer thread
+    #   - _error: the error that stopped the writer thread, or None
+    #   - _readers: the read connection of each thread that has queried this leaderboard
+    #   - _reader_connections: every read connection opened, for close to close
+    #   - _readers_lock: guards _reader_connections
+    _queue: queue.SimpleQueue
+    _writer: threading.Thread
+    _error: Optional[Exception]
+    _readers: threading.local
+    _reader_connections: list[sqlite3.Connection]
+    _readers_lock: threading.Lock
+
+    def __init__(self, path: str = LEADERBOARD_PATH) -> None:
+        """Open (creating it if necessary) the leaderboard database at path and start its writer thread.
+        """
+        self.path = path
+        self.recorded = 0
+        self.batches = 0
+        connection = sqlite3.connect(path, check_same_thread=False)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')  # in WAL mode, a crash can only lose the last batches
+        connection.execute(f'PRAGMA cache_size={-WRITER_CACHE_KB}')
+        connection.execute(f'PRAGMA wal_autocheckpoint={CHECKPOINT_PAGES}')
+        connection.executescript(SCHEMA)
+        connection.commit()
+        self._queue = queue.SimpleQueue()
+        self._error = None
+        self._readers = threading.local()
+        self._reader_connections = []
+        self._readers_lock = threading.Lock()
+        self._writer = threading.Thread(target=self._write, args=(connection,), name='leaderboard-writer',
+                                        daemon=True)
+        self._writer.start()
+
+    def record(self, player: str, world: str, result: GameResult, ended: Optional[float] = None) -> None:
+        """Queue the result of a game played by player in the world with digest world, which ended at ended
+        (seconds since the epoch; now if None). The run is written to the database by the writer thread soon
+        after; this method never waits for it.
+        """
+        self._queue.put((player, world, time.time() if ended is None else ended, int(result.victory),
+                         int(result.quit), result.score, result.moves, result.minutes_remaining))
+
+    def flush(self) -> None:
+        """Wait until every run recorded so far has been written to the database.
+
+        If the writer thread stopped because writing failed, raise the error it stopped with instead (the runs of
+        the failed batch and every run recorded after it are not written).
+        """
+        if self._error is not None:
+            raise self._error
+        done = threading.Event()
+        self._queue.put(done)
+        while self._writer.is_alive() and not done.wait(FLUSH_TIMEOUT):
+            pass
+        if self._error is not None:
+            raise self._error
+
+    def close(self) -> None:
+        """Write every run recorded so far, then stop the writer thread and close the read connections of every
+        thread.
+
+        If the writer thread stopped because writing failed, raise the error it stopped with.
+        """
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+        with self._readers_lock:
+            for connection in self._reader_connections:
+                connection.close()
+            self._reader_connections.clear()
+        if self._error is not None:
+            raise self._error
+
+    def top(self, world: str, n: int = 10) -> list[Run]:
+        """Return the n best runs recorded in the world with digest world: victories first, then by score, then
+        by minutes remaining, then the earliest.
+        """
+        return [Run(*row) for row in self._reader().execute(TOP, (world, n))]
+
+    def history(self, player: str, n: int = 10) -> list[Run]:
+        """Return the n most recent runs of player, most recent first.
+        """
+        return [Run(*row) for row in self._reader().execute(HISTORY, (player, n))]
+
+    def count(self) -> int:
+        """Return the number of runs in the database.
+        """
+        return self._reader().execute('SELECT COUNT(*) FROM runs').fetchone()[0]
+
+    def _reader(self) -> sqlite3.Connection:
+        """Return the read connection of the calling thread, opening it first if necessary.
+
+        The connection is only used by the calling thread, but close closes it from whichever thread calls it.
+        """
+        connection = getattr(self._readers, 'connection', None)
+        if connection is None:
+            connection = self._readers.connection = sqlite3.connect(self.path, check_same_thread=False)
+            with self._readers_lock:
+                self._reader_connections.append(connection)
+        return connection
+
+    def _write(self, connection: sqlite3.Connection) -> None:
+        """Write the queued runs to the database in batches of up to BATCH_SIZE runs, one transaction per batch,
+        until None is queued.
+
+        If writing a batch fails, the error is kept for flush and close to raise, the flush calls waiting for the
+        batch are woken and the thread stops.
+        """
+        world_ids = {}  # the id of each world digest in the worlds table
+        flushes: list[threading.Event] = []
+        try:
+            self._write_batches(connection, world_ids, flushes)
+        except Exception as error:
+            self._error = error
+            for done in flushes:
+                done.set()
+        finally:
+            connection.close()
+
+    def _write_batches(self, connection: sqlite3.Connection, world_ids: dict[str, int],
+                       flushes: list[threading.Event]) -> None:
+        """Write the queued runs as _write does, until None is queued, collecting the events of the flush calls
+        waiting for the batch being written in flushes.
+        """
+        running = True
+        while running:
+            rows: list[tuple] = []
+            flushes.clear()
+            entry: Union[tuple, threading.Event, None] = self._queue.get()
+            while True:
+                if entry is None:
+                    running = False
+                elif isinstance(entry, threading.Event):
+                    flushes.append(entry)
+                else:
+                    rows.append(entry)
+                if not running or len(rows) >= BATCH_SIZE:
+                    break
+                try:
+                    entry = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            if rows:
+                with connection:
+                    for i, row in enumerate(rows):
+                        world = world_ids.get(row[1])
+                        if world is None:
+                            connection.execute('INSERT OR IGNORE INTO worlds (digest) VALUES (?)', (row[1],))
+                            world = world_ids[row[1]] = connection.execute(
+                                'SELECT id FROM worlds WHERE digest = ?', (row[1],)).fetchone()[0]
+                        rows[i] = (row[0], world) + row[2:]
+                    connection.executemany(INSERT, rows)
+                self.recorded += len(rows)
+                self.batches += 1
+            for done in flushes:
+                done.set()
+
+
+if __name__ == '__main__':
+    import argparse
+    import os
+    import random
+    import tempfile
+
+    from world_cache import world_digest
+
+    parser = argparse.ArgumentParser(description='Show or benchmark the text adventure leaderboard.')
+    parser.add_argument('--database', default=LEADERBOARD_PATH)
+    parser.add_argument('--world', nargs=3, default=['map.txt', 'locations.txt', 'items.txt'],
+                        metavar=('MAP', 'LOCATIONS', 'ITEMS'))
+    parser.add_argument('-n', type=int, default=10, help='the number of runs to show')
+    parser.add_argument('--player', default=None, help='show the history of this player instead')
+    parser.add_argument('--benchmark', type=int, default=0, metavar='RUNS',
+                        help='record this many random runs into a scratch database and time it')
+    parser.add_argument('--threads', type=int, default=8, help='recording threads for --benchmark')
+    args = parser.parse_args()
+
+    if not args.benchmark:
+        board = Leaderboard(args.database)
+        runs = board.history(args.player, args.n) if args.player is not None else \
+            board.top(world_digest(*args.world), args.n)
+        for rank, run in enumerate(runs, 1):
+            print(f'{rank:>3}. {run.player:<16} {"WON " if run.victory else "    "}score {run.score:>4}  '
+                  f'{run.minutes_remaining:>4} min left  {time.strftime("%Y-%m-%d %H:%M", time.localtime(run.ended))}')
+        board.close()
+    else:
+        with tempfile.TemporaryDirectory() as directory:
+            board = Leaderboard(os.path.join(directory, 'leaderboard.db'))
+            worlds = [f'{i:064x}' for i in range(20)]
+
+            def play_many(seed: int, count: int) -> None:
+                """Record count random runs, as one server session after another would."""
+                rng = random.Random(seed)
+                for _ in range(count):
+                    victory = rng.random() < 0.3
+                    moves = rng.randint(8, 30)
+                    board.record(f'player{rng.randrange(100_000)}', rng.choice(worlds),
+                                 GameResult(victory, not victory, rng.randrange(0, 120, 5), moves, (30 - moves) * 5,
+                                            []))
+
+            start = time.perf_counter()
+            threads = [threading.Thread(target=play_many, args=(i, args.benchmark // args.threads))
+                       for i in range(args.threads)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            queued = time.perf_counter() - start
+            board.flush()
+            elapsed = time.perf_counter() - start
+            print(f'{board.recorded:,} runs from {args.threads} threads: queued in {queued:.2f} s, written in '
+                  f'{elapsed:.2f} s ({board.recorded / elapsed:,.0f} runs/s, {board.batches:,} transactions)')
+
+            for title, query in (('top 10 of a world', lambda: board.top(worlds[0], 10)),
+                                 ('history of a player', lambda: board.history('player123', 10))):
+                start = time.perf_counter()
+                for _ in range(1000):
+                    query()
+                print(f'{title}: {(time.perf_counter() - start) * 1000:.1f} us per query')
+            plan = board._reader().execute(f'EXPLAIN QUERY PLAN {TOP}', (worlds[0], 10)).fetchall()
+            print('top query plan:', '; '.join(row[-1] for row in plan))
+            board.close()
@@ -0,0 +1,135 @@
+"""CSC111 Project 1: Text Adventure Game Server Load Test
+
+Module Description
+==================
+
+A load-test client for server.py. It opens many concurrent sessions, each replaying a transcript (solution.txt by
+default) one line per prompt, and measures the latency of every turn: the time from sending a line to receiving the
+server's complete response. At the end it reports completed sessions per second (per server core) and the p50 /
+p99 turn latencies.
+
+Run this module against a running server with --port (or --unix), or without either to start a server in this
+process on a free port. In that case the client and the server share one core, so the figures are a lower bound.
+
+Copyright and Usage Information
+===============================
+
+This file is provided solely for the personal and private use of students
+taking CSC111 at the University of Toronto St. George campus. All forms of
+distribution of this code, whether as given or with any changes, are
+expressly prohibited. For more information on copyright for CSC111 materials,
+please consult our Course Syllabus.
+
+This file is Copyright (c) 2024 CSC111 Teaching Team
+"""
+import asyncio
+import time
+from typing import Optional
+
+from engine import ACTION_PROMPT, MENU_PROMPT, PICK_UP_PROMPT, DROP_PROMPT
+
+PROMPTS = tuple(prompt.encode('utf-8') for prompt in (ACTION_PROMPT, MENU_PROMPT, PICK_UP_PROMPT, DROP_PROMPT))
+
+
+async def read_response(reader: asyncio.StreamReader) -> bytes:
+    """Return the next complete response from the server: everything up to and including a prompt, or up to the
+    end of the connection.
+    """
+    data = b''
+    while not data.endswith(PROMPTS):
+        chunk = await reader.read(65536)
+        if not chunk:
+            break
+        data += chunk
+    return data
+
+
+async def run_session(commands: list[str], latencies: list[float], host: str, port: int,
+                      unix_path: Optional[str]) -> None:
+    """Play one game with commands, appending the latency of each turn (in seconds) to latencies.
+    """
+    if unix_path is not None:
+        reader, writer = await asyncio.open_unix_connection(unix_path)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+
+    await read_response(reader)
+    for command in commands:
+        start = time.perf_counter()
+        writer.write(command.encode('utf-8') + b'\n')
+        await writer.drain()
+        response = await read_response(reader)
+        latencies.append(time.perf_counter() - start)
+        if not response.endswith(PROMPTS):
+            break
+
+    writer.close()
+
+
+async def load_test(commands: list[str], sessions: int, concurrency: int, host: str = '127.0.0.1',
+                    port: Optional[int] = None, unix_path: Optional[str] = None) -> dict[str, float]:
+    """Run sessions games of commands, at most concurrency at a time, and return the measurements.
+
+    If neither port nor unix_path is given, a server is started in this process for the duration of the test.
+    """
+    server = None
+    if port is None and unix_path is None:
+        from server import GameServer
+        from world_cache import load_world
+        server = await GameServer(load_world()).start(host, 0)
+        port = server.sockets[0].getsockname()[1]
+
+    latencies = []
+    limit = asyncio.Semaphore(concurrency)
+
+    async def one_session() -> None:
+        """Run one session once a concurrency slot is free."""
+        async with limit:
+            await run_session(commands, latencies, host, port, unix_path)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one_session() for _ in range(sessions)))
+    elapsed = time.perf_counter() - start
+
+    if server is not None:
+        server.close()
+        await server.wait_closed()
+
+    latencies.sort()
+    return {
+        'sessions': sessions,
+        'concurrency': concurrency,
+        'seconds': elapsed,
+        'sessions_per_second_per_core': sessions / elapsed,  # the server runs on a single event loop
+        'turns': len(latencies),
+        'p50_turn_ms': _percentile(latencies, 0.50) * 1000,
+        'p99_turn_ms': _percentile(latencies, 0.99) * 1000,
+    }
+
+
+def _percentile(values: list[float], fraction: float) -> float:
+    """Return the value at fraction of the sorted list values (0.0 if it is empty).
+    """
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Load test the text adventure server.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=None)
+    parser.add_argument('--unix', default=None)
+    parser.add_argument('--sessions', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=200)
+    parser.add_argument('--transcript', default='solution.txt')
+    args = parser.parse_args()
+
+    with open(args.transcript) as transcript_file:
+        transcript = transcript_file.read().splitlines()
+
+    results = asyncio.run(load_test(transcript, args.sessions, args.concurrency, args.host, args.port, args.unix))
+    for name, value in results.items():
+        print(f'{name}: {value:,.3f}' if isinstance(value, float) else f'{name}: {value}')
@@ -0,0 +1,138 @@
+"""CSC111 Project 1: Text Adventure Game Profiling
+
+Module Description
+==================
+
+Opt-in instrumentation of the game loop. When a Game is given a Profiler, it records the wall time and number of
+calls of each stage of every turn:
+
+    - location: looking up the player's location
+    - describe: writing the description of the location (and first-visit effects)
+    - available_actions: listing the player's actions
+    - dispatch: carrying out the chosen action (World.do_actions, or asking which item for pick up / drop)
+    - pick_up / drop: carrying out the answer to "which item?"
+
+Dispatch time is also recorded per command, with every command the game does not know counted together (see
+engine.OTHER_COMMAND). A game without a Profiler only pays for one `is None` check per stage.
+
+At the end, the counters can be exported as JSON (to_json) or as a text summary with a histogram of the
+durations of every stage (summary).
+
+Copyright and Usage Information
+===============================
+
+This file is provided solely for the personal and private use of students
+taking CSC111 at the University of Toronto St. George campus. All forms of
+distribution of this code, whether as given or with any changes, are
+expressly prohibited. For more information on copyright for CSC111 materials,
+please consult our Course Syllabus.
+
+This file is Copyright (c) 2024 CSC111 Teaching Team
+"""
+# Histogram buckets: bucket i counts durations below 2 ** i microseconds (the last bucket counts everything else)
+BUCKETS = 16
+
+
+class StageStats:
+    """The timings recorded for one stage (or command).
+
+    Instance Attributes:
+        - calls: the number of times the stage ran
+        - total_ns: the total time spent in the stage, in nanoseconds
+        - max_ns: the longest single run of the stage, in nanoseconds
+        - histogram: the number of runs in each power-of-two bucket of microseconds
+
+    Representation Invariants:
+        - self.calls == sum(self.histogram)
+        - 0 <= self.max_ns <= self.total_ns
+    """
+    calls: int
+    total_ns: int
+    max_ns: int
+    histogram: list[int]
+
+    def __init__(self) -> None:
+        """Initialize empty stage statistics.
+        """
+        self.calls = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.histogram = [0] * BUCKETS
+
+    def add(self, elapsed_ns: int) -> None:
+        """Record one run of the stage that took elapsed_ns nanoseconds.
+        """
+        self.calls += 1
+        self.total_ns += elapsed_ns
+        if elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+        self.histogram[min(BUCKETS - 1, (elapsed_ns // 1000).bit_length())] += 1
+
+    def as_dict(self) -> dict:
+        """Return these statistics as a JSON-compatible dictionary.
+        """
+        return {
+            'calls': self.calls,
+            'total_ms': self.total_ns / 1e6,
+            'mean_us': self.total_ns / self.calls / 1e3 if self.calls else 0.0,
+            'max_us': self.max_ns / 1e3,
+            'histogram_us': {f'<{2 ** i}' if i < BUCKETS - 1 else f'>={2 ** (i - 1)}': count
+                             for i, count in enumerate(self.histogram) if count},
+        }
+
+
+class Profiler:
+    """Per-stage and per-command timing counters for one or more games.
+
+    Instance Attributes:
+        - stages: the statistics of each stage of the game loop, by stage name
+        - commands: the statistics of dispatching each command, by command
+    """
+    stages: dict[str, StageStats]
+    commands: dict[str, StageStats]
+
+    def __init__(self) -> None:
+        """Initialize a profiler with no recordings.
+        """
+        self.stages = {}
+        self.commands = {}
+
+    def record(self, stage: str, elapsed_ns: int, command: str = '') -> None:
+        """Record that stage took elapsed_ns nanoseconds, while carrying out command if one is given.
+        """
+        stats = self.stages.get(stage)
+        if stats is None:
+            stats = self.stages[stage] = StageStats()
+        stats.add(elapsed_ns)
+
+        if command:
+            stats = self.commands.get(command)
+            if stats is None:
+                stats = self.commands[command] = StageStats()
+            stats.add(elapsed_ns)
+
+    def as_dict(self) -> dict:
+        """Return all recordings as a JSON-compatible dictionary.
+        """
+        return {
+            'stages': {name: stats.as_dict() for name, stats in self.stages.items()},
+            'commands': {name: stats.as_dict() for name, stats in self.commands.items()},
+        }
+
+    def to_json(self) -> str:
+        """Return all recordings as JSON.
+        """
+        import json  # not at the top: a game that is not profiled never needs it
+        return json.dumps(self.as_dict(), indent=2)
+
+    def summary(self) -> str:
+        """Return a human-readable table of the recordings, with a histogram of each stage's durations.
+        """
+        lines = [f'{"stage":<20}{"calls":>8}{"total ms":>12}{"mean us":>10}{"max us":>10}  histogram (us)']
+        for title, table in (('', self.stages), ('command: ', self.commands)):
+            for name, stats in sorted(table.items(), key=lambda pair: -pair[1].total_ns):
+                data = stats.as_dict()
+                bars = ' '.join(f'{bucket}:{count}' for bucket, count in data['histogram_us'].items())
+                lines.append(f'{title + name:<20}{stats.calls:>8}{data["total_ms"]:>12.3f}'
+                             f'{data["mean_us"]:>10.1f}{data["max_us"]:>10.1f}  {bars}')
+        return '\n'.join(lines)
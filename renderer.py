@@ -0,0 +1,90 @@
+"""CSC111 Project 1: Text Adventure Game Output Rendering
+
+Module Description
+==================
+
+The game writes many short messages every turn. Printing each of them costs a write (and often a system call) per
+line, which dominates headless replays and network sessions. A Renderer collects a turn's messages in a buffer
+instead and hands them to its sink as one piece of text when flushed, normally once per turn together with the
+prompt. In quiet mode it keeps nothing at all.
+
+A sink is any function taking a string: terminal_sink() for the terminal, socket_sink(sock) for a socket, or the
+append method of a list to keep the output in memory.
+
+Copyright and Usage Information
+===============================
+
+This file is provided solely for the personal and private use of students
+taking CSC111 at the University of Toronto St. George campus. All forms of
+distribution of this code, whether as given or with any changes, are
+expressly prohibited. For more information on copyright for CSC111 materials,
+please consult our Course Syllabus.
+
+This file is Copyright (c) 2024 CSC111 Teaching Team
+"""
+import sys
+from typing import TYPE_CHECKING, Callable, Optional, TextIO
+
+if TYPE_CHECKING:  # importing socket takes a good part of the game's start-up, and only the server needs it
+    import socket
+
+
+class Renderer:
+    """Buffers game output and sends it to a sink in one piece per flush.
+
+    A Renderer is called like print with a single argument (renderer(text)), so it can be passed anywhere the
+    game takes a write function.
+
+    Instance Attributes:
+        - sink: the function the buffered text is sent to, or None in quiet mode
+
+    Representation Invariants:
+        - self.sink is not None or self._parts == []
+    """
+    sink: Optional[Callable[[str], None]]
+
+    # Private Instance Attributes:
+    #   - _parts: the messages written since the last flush
+    _parts: list[str]
+
+    def __init__(self, sink: Optional[Callable[[str], None]] = None) -> None:
+        """Initialize a renderer sending its output to sink, or discarding it if sink is None.
+        """
+        self.sink = sink
+        self._parts = []
+
+    def __call__(self, text: str) -> None:
+        """Buffer text as one line of output (like print(text)).
+        """
+        if self.sink is not None:
+            self._parts.append(text)
+
+    def flush(self, prompt: str = '') -> None:
+        """Send everything buffered since the last flush, followed by prompt, to the sink in a single call.
+        """
+        if self.sink is None or not (self._parts or prompt):
+            return
+        text = '\n'.join(self._parts) + '\n' if self._parts else ''
+        self._parts = []
+        self.sink(text + prompt)
+
+
+def terminal_sink(stream: TextIO = sys.stdout) -> Callable[[str], None]:
+    """Return a sink writing to stream (the terminal by default) and flushing it straight away.
+    """
+    def write(text: str) -> None:
+        """Write text to the stream."""
+        stream.write(text)
+        stream.flush()
+
+    return write
+
+
+def socket_sink(sock: 'socket.socket') -> Callable[[str], None]:
+    """Return a sink sending its text, encoded as UTF-8, through the connected socket sock.
+    """
+    def send(text: str) -> None:
+        """Send text through the socket."""
+        sock.sendall(text.encode('utf-8'))
+
+    return send
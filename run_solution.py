@@ -1,4 +1,9 @@
 import sys
-import subprocess
-p = subprocess.getoutput("{} ./adventure.py < solution.txt".format(sys.executable))
-print(p)
+
+from engine import play
+from world_cache import load_world
+
+w = load_world("map.txt", "locations.txt", "items.txt")
+
+with open("solution.txt") as solution_file:
+    play(w, solution_file, sys.stdout.write)
@@ -0,0 +1,211 @@
+"""CSC111 Project 1: Text Adventure Game Saving and Resuming
+
+Module Description
+==================
+
+A saved game is a journal plus a snapshot, both stored next to each other under a save name:
+
+    - NAME.journal: every line of input the game was given (actions as well as the item named after pick up or
+      drop), appended as it is entered. Each record is the length of the line as a varint followed by the line
+      in UTF-8.
+    - NAME.snapshot: the full state of the game (see engine.Game.save_state) as of some record of the journal,
+      rewritten every SNAPSHOT_INTERVAL lines of input.
+
+Resuming loads the snapshot and replays only the records of the journal written after it, so resuming takes the
+same time however long the game has been going.
+
+Copyright and Usage Information
+===============================
+
+This file is provided solely for the personal and private use of students
+taking CSC111 at the University of Toronto St. George campus. All forms of
+distribution of this code, whether as given or with any changes, are
+expressly prohibited. For more information on copyright for CSC111 materials,
+please consult our Course Syllabus.
+
+This file is Copyright (c) 2024 CSC111 Teaching Team
+"""
+import os
+import pickle
+from typing import BinaryIO, Callable, Optional
+
+from distances import DistanceOracle
+from engine import Game
+from game_data import World
+from profiling import Profiler
+
+JOURNAL_MAGIC = b'TAJ1'
+SNAPSHOT_MAGIC = b'TAS1'
+SNAPSHOT_INTERVAL = 32
+
+
+class SavedGame:
+    """A Game whose every line of input is journaled to disk, with a snapshot of its state taken regularly.
+
+    Instance Attributes:
+        - game: the game being played
+        - name: the save name (the journal and snapshot paths without their extensions)
+        - commands: the number of lines of input journaled so far, over the whole life of the game
+
+    Representation Invariants:
+        - self.commands >= 0
+    """
+    game: Game
+    name: str
+    commands: int
+
+    # Private Instance Attributes:
+    #   - _journal: the journal file, opened for appending
+    #   - _since_snapshot: the number of lines of input journaled since the last snapshot
+    _journal: BinaryIO
+    _since_snapshot: int
+
+    def __init__(self, game: Game, name: str, commands: int, journal: BinaryIO) -> None:
+        """Initialize a saved game. Use SavedGame.open instead of calling this directly.
+        """
+        self.game = game
+        self.name = name
+        self.commands = commands
+        self._journal = journal
+        self._since_snapshot = 0
+
+    @classmethod
+    def open(cls, world: World, name: str, write: Optional[Callable[[str], None]] = None,
+             oracle: Optional[DistanceOracle] = None, profiler: Optional[Profiler] = None) -> 'SavedGame':
+        """Resume the game saved under name in world, or start a new one if there is no such save. world must be
+        loaded from the same files as when the game was saved. Output of the replayed input is discarded; output
+        from then on goes to write. The game is played with oracle and profiled with profiler, if given (see
+        engine.Game); replaying the saved input is not profiled.
+        """
+        journal_path = name + '.journal'
+        snapshot = read_snapshot(name + '.snapshot')
+
+        if not os.path.exists(journal_path):
+            with open(journal_path, 'wb') as journal_file:
+                journal_file.write(JOURNAL_MAGIC)
+            return cls(Game(world, write, profiler=profiler, oracle=oracle), name, 0, open(journal_path, 'ab'))
+
+        if snapshot is None:
+            commands, offset = 0, len(JOURNAL_MAGIC)
+            world.reset()
+            game = Game(world, oracle=oracle)
+        else:
+            commands, offset, state = snapshot
+            game = Game.from_state(world, state, oracle=oracle)
+
+        with open(journal_path, 'rb') as journal_file:
+            if journal_file.read(len(JOURNAL_MAGIC)) != JOURNAL_MAGIC:
+                raise ValueError(f'{journal_path} is not a game journal')
+            journal_file.seek(offset)
+            records, end = read_records(journal_file)
+        for command in records:
+            if not game.over:
+                game.step(command)
+            commands += 1
+
+        # Drop a record cut short by a crash, so that new records follow the last complete one (and tell() gives the
+        # end of the journal before anything new is written, for snapshots)
+        journal = open(journal_path, 'ab')
+        journal.truncate(end)
+        journal.seek(end)
+        game.set_output(write)
+        game.profiler = profiler
+        return cls(game, name, commands, journal)
+
+    def step(self, command: str) -> None:
+        """Journal command, then feed it to the game, taking a snapshot every SNAPSHOT_INTERVAL commands.
+        """
+        data = command.encode('utf-8')
+        self._journal.write(_varint(len(data)) + data)
+        self._journal.flush()
+        self.commands += 1
+
+        self.game.step(command)
+
+        self._since_snapshot += 1
+        if self._since_snapshot >= SNAPSHOT_INTERVAL:
+            self.snapshot()
+
+    def snapshot(self) -> None:
+        """Write a snapshot of the game as of the last journaled command.
+        """
+        write_snapshot(self.name + '.snapshot', self.commands, self._journal.tell(), self.game.save_state())
+        self._since_snapshot = 0
+
+    def close(self) -> None:
+        """Take a final snapshot and close the journal.
+        """
+        self.snapshot()
+        self._journal.close()
+
+    def discard(self) -> None:
+        """Close the journal and delete the save, e.g. once the game is over.
+        """
+        self._journal.close()
+        for path in (self.name + '.journal', self.name + '.snapshot'):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def read_records(journal_file: BinaryIO) -> tuple[list[str], int]:
+    """Return the commands stored in journal_file from its current position, and the offset in the file where the
+    last complete record ends. A record cut short at the end of the file (e.g. by a crash while it was written) is
+    ignored, and starts at that offset.
+    """
+    start = journal_file.tell()
+    data = journal_file.read()
+    commands = []
+    end = 0
+    while end < len(data):
+        i = end
+        length = 0
+        shift = 0
+        while i < len(data):
+            byte = data[i]
+            i += 1
+            length |= (byte & 0x7F) << shift
+            shift += 7
+            if byte < 0x80:
+                break
+        else:
+            break
+        if i + length > len(data):
+            break
+        commands.append(data[i:i + length].decode('utf-8'))
+        end = i + length
+    return commands, start + end
+
+
+def read_snapshot(path: str) -> Optional[tuple[int, int, dict]]:
+    """Return the (number of commands, journal offset, game state) stored in the snapshot at path, or None if
+    there is no valid snapshot there.
+    """
+    try:
+        with open(path, 'rb') as snapshot_file:
+            data = snapshot_file.read()
+    except OSError:
+        return None
+    if not data.startswith(SNAPSHOT_MAGIC):
+        return None
+    return pickle.loads(data[len(SNAPSHOT_MAGIC):])
+
+
+def write_snapshot(path: str, commands: int, offset: int, state: dict) -> None:
+    """Atomically replace the snapshot at path with state, taken after commands commands, which end at byte
+    offset of the journal.
+    """
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    with open(temp_path, 'wb') as snapshot_file:
+        snapshot_file.write(SNAPSHOT_MAGIC + pickle.dumps((commands, offset, state), protocol=pickle.HIGHEST_PROTOCOL))
+    os.replace(temp_path, path)
+
+
+def _varint(value: int) -> bytes:
+    """Return value (>= 0) encoded as a little-endian base-128 varint.
+    """
+    data = bytearray()
+    while value >= 0x80:
+        data.append((value & 0x7F) | 0x80)
+        value >>= 7
+    data.append(value)
+    return bytes(data)
@@ -0,0 +1,188 @@
+"""CSC111 Project 1: Text Adventure Game Server
+
+Module Description
+==================
+
+An asyncio server hosting many concurrent games over TCP (or a Unix socket). The world is loaded once and shared,
+read-only, by every session; each session plays in its own WorldOverlay (see session.py), so a new session costs
+a Player and the few locations it actually touches.
+
+The protocol is plain text: the server sends each turn's output followed by its current prompt in a single write
+(see renderer.Renderer), and the client answers with one line per prompt, exactly like typing into adventure.py.
+The connection is closed when the game ends.
+
+Back-pressure: the server waits for each response to drain before reading the next line of a session, every
+session has a maximum line length, and at most max_sessions games run at once (further clients wait in line).
+Sessions that send nothing for idle_timeout seconds are ended and disconnected.
+
+Given a Leaderboard, the server records every game that ends (including games whose client disconnected or idled
+out, as if the player quit) under the address of its client.
+
+Run this module to start a server: python server.py [--host HOST] [--port PORT | --unix PATH]
+
+Copyright and Usage Information
+===============================
+
+This file is provided solely for the personal and private use of students
+taking CSC111 at the University of Toronto St. George campus. All forms of
+distribution of this code, whether as given or with any changes, are
+expressly prohibited. For more information on copyright for CSC111 materials,
+please consult our Course Syllabus.
+
+This file is Copyright (c) 2024 CSC111 Teaching Team
+"""
+import asyncio
+from typing import Optional
+
+from engine import Game
+from game_data import World
+from leaderboard import Leaderboard
+from renderer import Renderer
+from session import WorldOverlay
+
+DEFAULT_PORT = 4111
+MAX_SESSIONS = 10000
+IDLE_TIMEOUT = 300.0
+LINE_LIMIT = 1024
+
+IDLE_MESSAGE = "\nYou dozed off on a bench and the session timed out. Goodbye!\n"
+
+
+class GameServer:
+    """A server running one Game per connection against a shared World.
+
+    Instance Attributes:
+        - world: the shared template World (never modified)
+        - max_sessions: the maximum number of games running at once
+        - idle_timeout: the number of seconds a session may wait for input before it is evicted
+        - active_sessions: the number of games currently running
+        - completed_sessions: the number of games that have ended
+        - evicted_sessions: the number of sessions ended for being idle
+        - leaderboard: the leaderboard every finished game is recorded in, or None
+        - world_digest: the digest of the files of world, under which games are recorded in the leaderboard
+
+    Representation Invariants:
+        - self.max_sessions > 0 and self.idle_timeout > 0
+        - 0 <= self.active_sessions <= self.max_sessions
+    """
+    world: World
+    max_sessions: int
+    idle_timeout: float
+    active_sessions: int
+    completed_sessions: int
+    evicted_sessions: int
+    leaderboard: Optional[Leaderboard]
+    world_digest: str
+
+    # Private Instance Attributes:
+    #   - _slots: limits the number of games running at once to max_sessions
+    _slots: asyncio.Semaphore
+
+    def __init__(self, world: World, max_sessions: int = MAX_SESSIONS, idle_timeout: float = IDLE_TIMEOUT,
+                 leaderboard: Optional[Leaderboard] = None, world_digest: str = '') -> None:
+        """Initialize a new server for world, recording finished games in leaderboard (if given) under
+        world_digest.
+        """
+        self.world = world
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.active_sessions = 0
+        self.completed_sessions = 0
+        self.evicted_sessions = 0
+        self.leaderboard = leaderboard
+        self.world_digest = world_digest
+        self._slots = asyncio.Semaphore(max_sessions)
+
+    async def start(self, host: str = '127.0.0.1', port: int = DEFAULT_PORT,
+                    unix_path: Optional[str] = None) -> asyncio.AbstractServer:
+        """Start listening on host and port, or on the Unix socket unix_path if given, and return the server.
+        """
+        if unix_path is not None:
+            return await asyncio.start_unix_server(self.handle, path=unix_path, limit=LINE_LIMIT)
+        return await asyncio.start_server(self.handle, host, port, limit=LINE_LIMIT)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Play one game with the client connected through reader and writer.
+        """
+        async with self._slots:
+            self.active_sessions += 1
+            try:
+                await self._play(reader, writer)
+            except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+                pass  # the client went away or sent a line that is far too long
+            finally:
+                self.active_sessions -= 1
+                self.completed_sessions += 1
+                writer.close()
+                try:
+                    await writer.wait_closed()
+                except ConnectionError:
+                    pass  # the client is already gone
+
+    async def _play(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Run the game loop of one session until the game ends, the client disconnects or it idles out. However the
+        session ends, the game is recorded (a game that did not end is abandoned first, as if the player quit).
+        """
+        out = Renderer(lambda text: writer.write(text.encode('utf-8')))
+        game = Game(WorldOverlay(self.world), out)
+
+        try:
+            while not game.over:
+                out.flush(game.prompt)
+                await writer.drain()
+
+                try:
+                    line = await asyncio.wait_for(reader.readline(), self.idle_timeout)
+                except asyncio.TimeoutError:
+                    self.evicted_sessions += 1
+                    writer.write(IDLE_MESSAGE.encode('utf-8'))
+                    await writer.drain()
+                    return
+
+                if not line:  # the client closed the connection
+                    return
+                game.step(line.decode('utf-8', errors='replace').rstrip('\r\n'))
+
+            out.flush()
+            await writer.drain()
+        finally:
+            game.abandon()  # its ending stays in out, unsent
+            self._record(game, writer)
+
+    def _record(self, game: Game, writer: asyncio.StreamWriter) -> None:
+        """Queue the result of the finished game in the leaderboard, if there is one, under the client's address.
+        """
+        if self.leaderboard is not None:
+            peer = writer.get_extra_info('peername')
+            player = peer[0] if isinstance(peer, tuple) else 'local'
+            self.leaderboard.record(player, self.world_digest, game.result())
+
+
+async def serve(world: World, host: str = '127.0.0.1', port: int = DEFAULT_PORT,
+                unix_path: Optional[str] = None, leaderboard: Optional[Leaderboard] = None,
+                world_digest: str = '') -> None:
+    """Serve games in world until cancelled, recording them in leaderboard (if given) under world_digest.
+    """
+    server = await GameServer(world, leaderboard=leaderboard, world_digest=world_digest).start(host, port, unix_path)
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == '__main__':
+    import argparse
+    from world_cache import load_world, world_digest as digest_of
+
+    parser = argparse.ArgumentParser(description='Host text adventure games over the network.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--unix', default=None, help='listen on this Unix socket instead of TCP')
+    parser.add_argument('--leaderboard', default=None, help='record every game in this leaderboard database')
+    args = parser.parse_args()
+
+    board = Leaderboard(args.leaderboard) if args.leaderboard is not None else None
+    try:
+        asyncio.run(serve(load_world(), args.host, args.port, args.unix, board,
+                          digest_of('map.txt', 'locations.txt', 'items.txt') if board is not None else ''))
+    finally:
+        if board is not None:
+            board.close()
@@ -0,0 +1,158 @@
+"""CSC111 Project 1: Text Adventure Game Session Overlays
+
+Module Description
+==================
+
+A World mixes data that never changes during a game (the map, descriptions, visit points, item names) with data
+every game changes (which locations were visited, where the items are, which SpecialItems are unlocked). To host
+many games against one loaded World, each game plays in a WorldOverlay instead: the template World is only read,
+and the overlay keeps the session's own copy of a location's mutable state, created the first time the session
+touches that location.
+
+Copyright and Usage Information
+===============================
+
+This file is provided solely for the personal and private use of students
+taking CSC111 at the University of Toronto St. George campus. All forms of
+distribution of this code, whether as given or with any changes, are
+expressly prohibited. For more information on copyright for CSC111 materials,
+please consult our Course Syllabus.
+
+This file is Copyright (c) 2024 CSC111 Teaching Team
+"""
+import copy
+from typing import Optional
+
+from game_data import World, Location, Item, SpecialItem, ItemCollection
+
+
+class LocationOverlay(Location):
+    """One session's view of a Location of a shared template World.
+
+    The position, descriptions and visit points are read from the template location; visited and location_items
+    belong to this overlay.
+    """
+    __slots__ = ('_template',)
+
+    # Private Instance Attributes:
+    #   - _template: the location of the template World this overlay stands for
+    _template: Location
+
+    def __init__(self, template: Location, items: ItemCollection) -> None:
+        """Initialize a new, unvisited overlay of template holding items.
+        """
+        # Location.__init__ is not called: everything but the mutable state is read from the template.
+        self._template = template
+        self.position = template.position
+        self.visit_points = template.visit_points
+        self.location_items = items
+        self.visited = False
+
+    @property
+    def brief_description(self) -> str:
+        """Return the brief description of the template location.
+        """
+        return self._template.brief_description
+
+    @property
+    def long_description(self) -> str:
+        """Return the long description of the template location.
+        """
+        return self._template.long_description
+
+
+class WorldOverlay(World):
+    """One session's copy-on-write view of a shared template World.
+
+    The map, its exits and the item registry are shared with the template. A LocationOverlay is only created for
+    a location the first time the session looks it up, and SpecialItems (whose status changes when they are
+    unlocked) are copied for the session the first time they are seen. Normal Items are never changed by a game,
+    so they are shared as they are.
+
+    Instance Attributes:
+        - template: the shared World this overlay is based on
+    """
+    template: World
+
+    # Private Instance Attributes:
+    #   - _overlays: the LocationOverlay created so far for each position
+    #   - _specials: this session's copy of each SpecialItem of the template, keyed by id of the template item
+    #   - _items: this session's view of template.items, or None until it is first needed
+    _overlays: dict[int, LocationOverlay]
+    _specials: dict[int, SpecialItem]
+    _items: Optional[list[Item]]
+
+    def __init__(self, template: World) -> None:
+        """Initialize a fresh session view of template.
+        """
+        # World.__init__ is not called: nothing is parsed, the immutable data is shared with the template.
+        self.template = template
+        self.map = template.map
+        self._cells = template._cells
+        self.width = template.width
+        self.height = template.height
+        self.exits = template.exits
+        self.item_registry = template.item_registry
+        self._overlays = {}
+        self._specials = {}
+        self._items = None
+
+    @property
+    def items(self) -> list[Item]:
+        """Return the items of this session, in the same order as the template's items.
+        """
+        if self._items is None:
+            self._items = [self._own(item) for item in self.template.items]
+        return self._items
+
+    @property
+    def locations(self) -> list[Location]:
+        """Return this session's view of every location of the template, creating any that are missing.
+        """
+        return [self.location_at(position) for position in range(len(self.template.locations))]
+
+    def location_at(self, position: int) -> LocationOverlay:
+        """Return this session's view of the location at position, creating it on first use.
+        """
+        overlay = self._overlays.get(position)
+        if overlay is None:
+            template = self.template.locations[position]
+            items = ItemCollection(self._own(item) for item in template.location_items)
+            overlay = LocationOverlay(template, items)
+            self._overlays[position] = overlay
+        return overlay
+
+    def touched_locations(self) -> list[LocationOverlay]:
+        """Return this session's view of every location it has looked up so far. Every other location is still
+        exactly as it is in the template.
+        """
+        return list(self._overlays.values())
+
+    def get_location(self, x: int, y: int) -> Optional[Location]:
+        """Return this session's view of the location at (x, y), or None if there is no location there.
+        """
+        position = self.position_at(x, y)
+        if position == -1:
+            return None
+        return self.location_at(position)
+
+    def reset(self) -> None:
+        """Drop everything this session changed, so the next game starts from the template again.
+        """
+        self._overlays = {}
+        self._specials = {}
+        self._items = None
+
+    def _own(self, item: Item) -> Item:
+        """Return this session's version of the template item: a private copy if it is a SpecialItem (whose key is
+        also this session's version), otherwise the shared item itself.
+        """
+        if not isinstance(item, SpecialItem):
+            return item
+        special = self._specials.get(id(item))
+        if special is None:
+            special = copy.copy(item)
+            special.status = False
+            self._specials[id(item)] = special
+            special.key = self._own(item.key)
+        return special
@@ -0,0 +1,667 @@
+"""CSC111 Project 1: Text Adventure Game Sharded Worlds
+
+Module Description
+==================
+
+A ShardedWorld plays a very large campus without holding its whole map or every Location in memory. The map is
+cut into square shards of SHARD_SIZE x SHARD_SIZE cells, and each shard is stored on its own in one shard file
+(see SHARDS_NAME) with its cells, their exits, the visit points and descriptions of its locations and which items
+start at each of them. A shard is read the first time a cell of it is looked up and kept in a least recently used
+cache of MAX_SHARDS shards (the shard the player is in is never evicted).
+
+The shard file starts with a fixed header, then the shards one after the other (each as the descriptions of its
+locations followed by the rest of the shard), then a catalogue: the key of the world files it was built from, where
+every shard starts and ends (so any shard is a single read), the shard of every position, and the items of the
+world. Only the catalogue and the items are always resident: about 4 bytes per location for the shard of each
+position, and every Item.
+
+While the player walks, a background thread reads the shards around them into the cache before they reach them:
+after every move, the shard PREFETCH_MARGIN cells ahead in the direction of travel is queued first, then the ones
+that far away in the other directions. A move only reads a shard itself if the player got there before the thread
+started on it, and only waits for the thread if it is reading that very shard. If the thread fails to read a shard,
+or stops, the game reads the shard itself.
+
+Descriptions stay in the shard file and are read when shown. A location the game looks up lives in its shard;
+when the shard is evicted, only what the game changed is kept: a bit per position for whether it was visited, and
+the items of the locations whose items are not the ones they started with. So memory is bounded by MAX_SHARDS
+shards, the catalogue and these two, however long the game goes on.
+
+    python shards.py                              # a generated 1000 x 1000 campus, 5000 random moves
+    python shards.py --size 2000 --moves 20000 --shard-size 32 --max-shards 16
+
+Copyright and Usage Information
+===============================
+
+This file is provided solely for the personal and private use of students
+taking CSC111 at the University of Toronto St. George campus. All forms of
+distribution of this code, whether as given or with any changes, are
+expressly prohibited. For more information on copyright for CSC111 materials,
+please consult our Course Syllabus.
+
+This file is Copyright (c) 2024 CSC111 Teaching Team
+"""
+import os
+import pickle
+import queue
+import struct
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Iterator, Optional
+
+from game_data import EXIT_NAMES, World, Location, Item, SpecialItem
+from world_cache import source_key, parse_world
+
+SHARDS_NAME = 'world.shards'
+SHARDS_MAGIC = b'TAW2'
+# magic, width, height, shard size, number of locations, catalogue offset, catalogue length
+HEADER = struct.Struct('<4sIIIIQQ')
+# The width and height of a shard, in cells
+SHARD_SIZE = 32
+# The most shards kept in memory at once
+MAX_SHARDS = 16
+# How far from the player (in cells) the shards around them are prefetched
+PREFETCH_MARGIN = 16
+# How long (in seconds) a lookup waits for the prefetch thread before checking that it is still running
+PREFETCH_TIMEOUT = 1.0
+
+
+class Shard:
+    """The cells of one square tile of a world's map, and the locations on them.
+
+    Instance Attributes:
+        - cells: the position on the map of every cell of the tile, row by row (-1 where there is no location,
+        including the cells of a tile at the edge of the map that are off the map)
+        - exits: the bitmask of the exits of every cell of the tile, in the same order (see World.exits)
+        - records: the visit points of each location of the tile and where its descriptions are in the shard file
+        (the offsets of the start of its brief description, the start of its long one and the end of that), by
+        position
+        - placements: the indices (in the world's items) of the items that start at each location of the tile
+        that has any, by position
+        - locations: the locations of the tile the game has looked up while the shard was in memory, by position
+
+    Representation Invariants:
+        - len(self.cells) == len(self.exits)
+    """
+    __slots__ = ('cells', 'exits', 'records', 'placements', 'locations')
+
+    cells: array
+    exits: bytes
+    records: dict[int, tuple[int, int, int, int]]
+    placements: dict[int, list[int]]
+    locations: dict[int, Location]
+
+    def __init__(self, cells: array, exits: bytes, records: dict[int, tuple[int, int, int, int]],
+                 placements: dict[int, list[int]]) -> None:
+        """Initialize a new shard, with no location looked up yet.
+        """
+        self.cells = cells
+        self.exits = exits
+        self.records = records
+        self.placements = placements
+        self.locations = {}
+
+
+def shards_path(map_path: str) -> str:
+    """Return the path of the shard file for the world whose map is stored at map_path.
+    """
+    return os.path.join(os.path.dirname(os.path.abspath(map_path)), SHARDS_NAME)
+
+
+def write_shards(world: World, path: str, key: tuple, shard_size: int = SHARD_SIZE) -> None:
+    """Write world (in its loaded state) to a shard file at path, tagged with key, with shards of shard_size x
+    shard_size cells.
+
+    Each shard is stored as the descriptions of its locations (UTF-8 text) followed by the shard itself. The file
+    is written to a temporary file first and then moved into place, so a reader never sees a half-written shard
+    file.
+    """
+    across = -(-world.width // shard_size)
+    down = -(-world.height // shard_size)
+    item_index = {id(item): i for i, item in enumerate(world.items)}
+    shard_of = array('i', [-1]) * len(world.locations)
+    offsets = array('Q')
+
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    with open(temp_path, 'wb') as shard_file:
+        shard_file.write(bytes(HEADER.size))
+        for shard_id in range(across * down):
+            left, top = shard_id % across * shard_size, shard_id // across * shard_size
+            cells = array('i', [-1]) * (shard_size * shard_size)
+            exits = bytearray(shard_size * shard_size)
+            records, placements = {}, {}
+            for y in range(top, min(top + shard_size, world.height)):
+                for x in range(left, min(left + shard_size, world.width)):
+                    position = world.position_at(x, y)
+                    if position == -1:
+                        continue
+                    i = (y - top) * shard_size + x - left
+                    cells[i] = position
+                    exits[i] = world.exits[y * world.width + x]
+                    location = world.location_at(position)
+                    brief = location.brief_description.encode('utf-8')
+                    long = location.long_description.encode('utf-8')
+                    brief_start = shard_file.tell()
+                    shard_file.write(brief + long)
+                    records[position] = (location.visit_points, brief_start, brief_start + len(brief),
+                                         brief_start + len(brief) + len(long))
+                    if location.location_items:
+                        placements[position] = [item_index[id(item)] for item in location.location_items]
+                    shard_of[position] = shard_id
+            offsets.append(shard_file.tell())
+            shard_file.write(pickle.dumps((cells, bytes(exits), records, placements),
+                                          protocol=pickle.HIGHEST_PROTOCOL))
+            offsets.append(shard_file.tell())
+
+        items = [(item.name, item.start_position, item.target_position, item.target_points,
+                  item_index[id(item.key)] if isinstance(item, SpecialItem) else -1,
+                  item.hint if isinstance(item, SpecialItem) else '')
+                 for item in world.items]
+        catalogue = pickle.dumps((key, offsets, shard_of, items), protocol=pickle.HIGHEST_PROTOCOL)
+        catalogue_offset = shard_file.tell()
+        shard_file.write(catalogue)
+        shard_file.seek(0)
+        shard_file.write(HEADER.pack(SHARDS_MAGIC, world.width, world.height, shard_size, len(world.locations),
+                                     catalogue_offset, len(catalogue)))
+    os.replace(temp_path, path)
+
+
+class ShardedWorld(World):
+    """A World whose map and locations are read from a shard file a shard at a time, as the game needs them.
+
+    A ShardedWorld is played directly (not through a session.WorldOverlay): it keeps the state of the locations
+    the game has changed itself, and reset() forgets it. Call close() when done with it.
+
+    A location looked up by the game lives in its shard until the shard is evicted. Then what the game changed
+    about it is saved: whether it was visited (one bit per position) and, if its items are not the ones it started
+    with, the items now in it. Descriptions are read from the shard file each time they are needed.
+
+    Instance Attributes:
+        - key: the key of the world files the shard file was built from (see world_cache.source_key)
+        - shard_size: the width and height of a shard, in cells
+        - max_shards: the most shards kept in memory at once
+        - hits: the number of shard lookups answered from memory
+        - misses: the number of shards read while the game waited on them
+        - waits: the number of shards the game had to wait on the prefetch thread for
+        - prefetched: the number of shards read ahead by the prefetch thread
+        - prefetch_errors: the number of shards the prefetch thread failed to read (the game reads them itself)
+        - evictions: the number of shards dropped from memory to make room for others
+
+    Representation Invariants:
+        - self.max_shards >= 2
+    """
+    key: tuple
+    shard_size: int
+    max_shards: int
+    hits: int
+    misses: int
+    waits: int
+    prefetched: int
+    prefetch_errors: int
+    evictions: int
+
+    # Private Instance Attributes:
+    #   - _fd: the file descriptor of the open shard file
+    #   - _offsets: the start and end offsets in the shard file of every shard, one after the other
+    #   - _shard_of: the shard holding each position
+    #   - _across: the number of shards in a row of the map
+    #   - _num_positions: the number of locations of the world
+    #   - _item_index: the index of every item in self.items, by id of the item
+    #   - _shards: the shards in memory, least recently used first
+    #   - _lock: guards _shards, _pending, _recent_id, the saved state and the counters shared with the prefetch
+    #       thread
+    #   - _ready: notified (with _lock) whenever the prefetch thread has finished with a shard
+    #   - _pending: the shards queued for, or being read by, the prefetch thread
+    #   - _reading: the shard the prefetch thread is reading, or -1
+    #   - _generation: the number of times reset was called, so that a shard the prefetch thread was reading during a
+    #       reset is not kept
+    #   - _recent_id, _recent: the last shard looked up (checked before taking the lock, and never evicted, since
+    #       the game may be changing its locations), or -1 and None
+    #   - _visited: a bitset of the positions of the visited locations of evicted shards
+    #   - _moved: the indices of the items now in each location of an evicted shard whose items changed
+    #   - _last: the cell of the last get_location call, or None
+    #   - _queue: the shards the prefetch thread should read, or None if there is no prefetch thread
+    #   - _thread: the prefetch thread, or None
+    _fd: int
+    _offsets: array
+    _shard_of: array
+    _across: int
+    _num_positions: int
+    _item_index: dict[int, int]
+    _shards: OrderedDict
+    _lock: threading.Lock
+    _ready: threading.Condition
+    _pending: set[int]
+    _reading: int
+    _generation: int
+    _recent_id: int
+    _recent: Optional[Shard]
+    _visited: bytearray
+    _moved: dict[int, list[int]]
+    _last: Optional[tuple[int, int]]
+    _queue: Optional[queue.SimpleQueue]
+    _thread: Optional[threading.Thread]
+
+    def __init__(self, path: str, max_shards: int = MAX_SHARDS, prefetch: bool = True) -> None:
+        """Open the shard file at path, keeping at most max_shards (at least 2) shards in memory, and start the
+        prefetch thread unless prefetch is False.
+        """
+        # World.__init__ is not called: nothing is parsed, everything is read from the shard file.
+        self._fd = os.open(path, os.O_RDONLY)
+        magic, self.width, self.height, self.shard_size, self._num_positions, offset, length = \
+            HEADER.unpack(os.pread(self._fd, HEADER.size, 0))
+        if magic != SHARDS_MAGIC:
+            os.close(self._fd)
+            raise ValueError(f'{path} is not a shard file')
+        self.key, self._offsets, self._shard_of, items = pickle.loads(os.pread(self._fd, length, offset))
+        self._across = -(-self.width // self.shard_size)
+        self.max_shards = max(2, max_shards)
+        self.hits = self.misses = self.waits = self.prefetched = self.prefetch_errors = self.evictions = 0
+
+        self.items = []
+        self.item_registry = {}
+        for name, start, target, points, key, hint in items:
+            item = Item(name, start, target, points) if key == -1 else \
+                SpecialItem(name, start, target, points, self.items[key], hint)
+            self.items.append(item)
+            self.item_registry[name] = item
+        self._item_index = {id(item): i for i, item in enumerate(self.items)}
+
+        self.map = _ShardedMap(self)
+        self.exits = _ShardedExits(self)
+        self._cells = None
+        self._shards = OrderedDict()
+        self._lock = threading.Lock()
+        self._ready = threading.Condition(self._lock)
+        self._pending = set()
+        self._reading = -1
+        self._generation = 0
+        self._recent_id, self._recent = -1, None
+        self._visited = bytearray((self._num_positions + 7) // 8)
+        self._moved = {}
+        self._last = None
+        self._queue = queue.SimpleQueue() if prefetch else None
+        self._thread = None
+        if prefetch:
+            self._thread = threading.Thread(target=self._prefetch, name='shard-prefetch', daemon=True)
+            self._thread.start()
+
+    def close(self) -> None:
+        """Stop the prefetch thread and close the shard file.
+        """
+        if self._thread is not None:
+            self._queue.put(-1)
+            self._thread.join()
+            self._thread = None
+        if self._fd != -1:
+            os.close(self._fd)
+            self._fd = -1
+
+    @property
+    def locations(self) -> '_ShardedLocations':
+        """Return every location of this world, as a sequence indexed by position that looks each one up only
+        when it is read.
+        """
+        return _ShardedLocations(self)
+
+    @property
+    def resident_shards(self) -> int:
+        """Return the number of shards in memory.
+        """
+        return len(self._shards)
+
+    def reset(self) -> None:
+        """Return this world to the state it was in right after loading (see World.reset). Shards queued for the
+        prefetch thread are dropped, and so is the one it is reading, if any.
+        """
+        with self._lock:
+            self._shards.clear()
+            self._pending.clear()
+            self._generation += 1
+            self._recent_id, self._recent = -1, None
+            self._visited = bytearray(len(self._visited))
+            self._moved = {}
+        self._last = None
+        for item in self.items:
+            item.curr_position = item.start_position
+            if isinstance(item, SpecialItem):
+                item.status = False
+
+    def position_at(self, x: int, y: int) -> int:
+        """Return the number on the map at (x, y): the position of the location there, or -1 if there is no
+        location there or (x, y) is off the map.
+        """
+        if not (0 <= y < self.height and 0 <= x < self.width):
+            return -1
+        size = self.shard_size
+        return self._shard(y // size * self._across + x // size).cells[y % size * size + x % size]
+
+    def exits_at(self, x: int, y: int) -> tuple[str, ...]:
+        """Return the directions a player at (x, y) can move in, in the order they are listed to the player.
+
+        Preconditions:
+            - 0 <= x < self.width and 0 <= y < self.height
+        """
+        size = self.shard_size
+        return EXIT_NAMES[self._shard(y // size * self._across + x // size).exits[y % size * size + x % size]]
+
+    def location_at(self, position: int) -> Location:
+        """Return the location at position, building it from its shard (and what was saved about it when its shard
+        was last evicted) the first time it is looked up while its shard is in memory.
+        """
+        shard = self._shard(self._shard_of[position])
+        location = shard.locations.get(position)
+        if location is None:
+            location = Location(position, '', '', shard.records[position][0], self, position)
+            with self._lock:
+                location.visited = bool(self._visited[position >> 3] >> (position & 7) & 1)
+                placement = self._moved.get(position, shard.placements.get(position, ()))
+            for i in placement:
+                location.location_items.add(self.items[i])
+            shard.locations[position] = location
+        return location
+
+    def get_location(self, x: int, y: int) -> Optional[Location]:
+        """Return the location at (x, y), or None if there is no location there. Looking up the cell next to the
+        previous one looked up counts as a move, and prefetches the shards around it.
+        """
+        position = self.position_at(x, y)
+        if self._queue is not None:
+            self._look_ahead(x, y)
+        if position == -1:
+            return None
+        return self.location_at(position)
+
+    def brief(self, position: int) -> str:
+        """Return the brief description of the location at position, read from the shard file (this world is the
+        description store of its locations; see Location).
+        """
+        _, start, end, _ = self._shard(self._shard_of[position]).records[position]
+        return os.pread(self._fd, end - start, start).decode('utf-8')
+
+    def long(self, position: int) -> str:
+        """Return the long description of the location at position, read from the shard file.
+        """
+        _, _, start, end = self._shard(self._shard_of[position]).records[position]
+        return os.pread(self._fd, end - start, start).decode('utf-8')
+
+    def _look_ahead(self, x: int, y: int) -> None:
+        """Queue the shards PREFETCH_MARGIN cells away from (x, y) that are not in memory for prefetching, starting
+        with the one in the direction of travel if (x, y) is one move away from the last cell looked up.
+        """
+        last, self._last = self._last, (x, y)
+        if last == (x, y):
+            return
+        if last is not None and abs(x - last[0]) + abs(y - last[1]) == 1:
+            dx, dy = x - last[0], y - last[1]
+        else:
+            dx, dy = 1, 0  # no direction of travel yet
+        size = self.shard_size
+        with self._lock:
+            for ahead_x, ahead_y in ((dx, dy), (dy, dx), (-dy, -dx), (-dx, -dy)):
+                ahead_x, ahead_y = x + ahead_x * PREFETCH_MARGIN, y + ahead_y * PREFETCH_MARGIN
+                if 0 <= ahead_x < self.width and 0 <= ahead_y < self.height:
+                    shard_id = ahead_y // size * self._across + ahead_x // size
+                    if shard_id not in self._shards and shard_id not in self._pending:
+                        self._pending.add(shard_id)
+                        self._queue.put(shard_id)
+
+    def _shard(self, shard_id: int) -> Shard:
+        """Return the shard shard_id, reading it if it is not in memory (or waiting for the prefetch thread if it is
+        reading it right now; a shard still queued for it is read here instead).
+
+        A shard the prefetch thread could not read, or is reading when it has stopped, is read here too, so an error
+        reading it is raised here.
+        """
+        if shard_id == self._recent_id:
+            return self._recent
+        with self._lock:
+            if shard_id == self._reading:
+                self.waits += 1
+                while shard_id == self._reading:
+                    if not self._ready.wait(PREFETCH_TIMEOUT) and not self._thread.is_alive():
+                        self._reading = -1
+            self._pending.discard(shard_id)
+            shard = self._shards.get(shard_id)
+            if shard is not None:
+                self._shards.move_to_end(shard_id)
+                self.hits += 1
+                self._recent_id, self._recent = shard_id, shard
+                return shard
+        shard = self._read(shard_id)
+        with self._lock:
+            self.misses += 1
+            shard = self._keep(shard_id, shard)
+            self._recent_id, self._recent = shard_id, shard
+        return shard
+
+    def _read(self, shard_id: int) -> Shard:
+        """Return the shard shard_id, read from the shard file.
+        """
+        start, end = self._offsets[2 * shard_id], self._offsets[2 * shard_id + 1]
+        return Shard(*pickle.loads(os.pread(self._fd, end - start, start)))
+
+    def _keep(self, shard_id: int, shard: Shard) -> Shard:
+        """Add shard to the shards in memory as the most recently used one (unless a copy of it was added in the
+        meantime, which is kept instead) and return the shard in memory, evicting the least recently used shard
+        other than the last one looked up if there are too many. The caller holds self._lock.
+        """
+        shard = self._shards.setdefault(shard_id, shard)
+        self._shards.move_to_end(shard_id)
+        if len(self._shards) > self.max_shards:
+            victim = next(victim for victim in self._shards if victim != self._recent_id)
+            self._save(self._shards.pop(victim))
+            self.evictions += 1
+        return shard
+
+    def _save(self, shard: Shard) -> None:
+        """Save what the game changed about the locations of shard, which is being evicted. The caller holds
+        self._lock.
+        """
+        for position, location in shard.locations.items():
+            if location.visited:
+                self._visited[position >> 3] |= 1 << (position & 7)
+            placement = [self._item_index[id(item)] for item in location.location_items]
+            if placement == shard.placements.get(position, []):
+                self._moved.pop(position, None)
+            else:
+                self._moved[position] = placement
+
+    def _prefetch(self) -> None:
+        """Read the shards queued by _look_ahead into memory, until -1 is queued. A shard that cannot be read is
+        left for the game to read (and fail on) itself.
+        """
+        while True:
+            shard_id = self._queue.get()
+            if shard_id == -1:
+                return
+            with self._lock:
+                if shard_id not in self._pending:
+                    continue  # the game read it itself, or the world was reset since it was queued
+                self._reading, generation = shard_id, self._generation
+            try:
+                shard = self._read(shard_id)
+            except Exception:  # the game reads the shard itself, and gets the error, when it needs it
+                shard = None
+            with self._lock:
+                if generation == self._generation:  # otherwise the world was reset while the shard was read
+                    if shard is None:
+                        self.prefetch_errors += 1
+                    elif shard_id not in self._shards:
+                        self.prefetched += 1
+                        self._keep(shard_id, shard)
+                    self._pending.discard(shard_id)
+                self._reading = -1
+                self._ready.notify_all()
+
+
+class _ShardedMap:
+    """The map of a ShardedWorld, read as a list of rows of positions (each row is read from its shards when it is
+    asked for).
+    """
+    _world: ShardedWorld
+
+    def __init__(self, world: ShardedWorld) -> None:
+        """Initialize the map of world.
+        """
+        self._world = world
+
+    def __len__(self) -> int:
+        """Return the number of rows of the map.
+        """
+        return self._world.height
+
+    def __getitem__(self, y: int) -> list[int]:
+        """Return row y of the map, read from the shards it crosses.
+        """
+        if not 0 <= y < self._world.height:
+            raise IndexError(y)
+        return [self._world.position_at(x, y) for x in range(self._world.width)]
+
+    def __iter__(self) -> Iterator[list[int]]:
+        """Return an iterator over the rows of the map, each read only when it is reached.
+        """
+        return (self[y] for y in range(self._world.height))
+
+
+class _ShardedExits:
+    """The exit bitmasks of a ShardedWorld, indexed by y * width + x as World.exits is.
+    """
+    _world: ShardedWorld
+
+    def __init__(self, world: ShardedWorld) -> None:
+        """Initialize the exits of world.
+        """
+        self._world = world
+
+    def __len__(self) -> int:
+        """Return the number of cells of the map.
+        """
+        return self._world.width * self._world.height
+
+    def __getitem__(self, i: int) -> int:
+        """Return the exit bitmask of cell i, read from its shard.
+        """
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        world = self._world
+        x, y, size = i % world.width, i // world.width, world.shard_size
+        return world._shard(y // size * world._across + x // size).exits[y % size * size + x % size]
+
+
+class _ShardedLocations:
+    """The locations of a ShardedWorld, indexed by position as World.locations is.
+    """
+    _world: ShardedWorld
+
+    def __init__(self, world: ShardedWorld) -> None:
+        """Initialize the locations of world.
+        """
+        self._world = world
+
+    def __len__(self) -> int:
+        """Return the number of locations of the world.
+        """
+        return self._world._num_positions
+
+    def __getitem__(self, position: int) -> Location:
+        """Return the location at position (see ShardedWorld.location_at).
+        """
+        if not 0 <= position < len(self):
+            raise IndexError(position)
+        return self._world.location_at(position)
+
+    def __iter__(self) -> Iterator[Location]:
+        """Return an iterator over the locations in order of position, each looked up only when it is reached.
+        """
+        return (self._world.location_at(position) for position in range(len(self)))
+
+
+def load_sharded_world(map_path: str = 'map.txt', locations_path: str = 'locations.txt',
+                       items_path: str = 'items.txt', shard_size: int = SHARD_SIZE, max_shards: int = MAX_SHARDS,
+                       prefetch: bool = True) -> ShardedWorld:
+    """Return the world stored in the given files as a ShardedWorld, (re)building its shard file first if it is
+    missing, was built from other files or uses another shard size.
+
+    Building the shard file parses the whole world once (as a compact World); playing it afterwards never does.
+    """
+    key = source_key(map_path, locations_path, items_path, True) + (shard_size,)
+    path = shards_path(map_path)
+    try:
+        world = ShardedWorld(path, max_shards, prefetch)
+        if world.key == key:
+            return world
+        world.close()
+    except (OSError, ValueError, struct.error, pickle.UnpicklingError, EOFError):
+        pass
+
+    write_shards(parse_world(map_path, locations_path, items_path, compact=True), path, key, shard_size)
+    return ShardedWorld(path, max_shards, prefetch)
+
+
+if __name__ == '__main__':
+    import argparse
+    import random
+    import tempfile
+    import time
+    import tracemalloc
+
+    import worldgen
+    from engine import Game
+    from world_cache import load_world
+
+    parser = argparse.ArgumentParser(description='Measure playing a generated campus from a shard file.')
+    parser.add_argument('--size', type=int, default=1000, help='the width and height of the campus')
+    parser.add_argument('--moves', type=int, default=5000, help='random moves to play')
+    parser.add_argument('--shard-size', type=int, default=SHARD_SIZE)
+    parser.add_argument('--max-shards', type=int, default=MAX_SHARDS)
+    parser.add_argument('--pause', type=float, default=0.0, help='seconds the player thinks before each move')
+    parser.add_argument('--seed', type=int, default=111)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = worldgen.generate(directory, args.size, args.size, 1000, 10, seed=args.seed)
+
+        start_time = time.perf_counter()
+        load_sharded_world(*paths, shard_size=args.shard_size, max_shards=args.max_shards).close()
+        print(f'build shard file: {time.perf_counter() - start_time:.2f} s, '
+              f'{os.path.getsize(shards_path(paths[0])) / 1e6:.1f} MB')
+
+        for title, sharded in (('full compact world', False), ('sharded world', True)):
+            tracemalloc.start()
+            start_time = time.perf_counter()
+            if sharded:
+                w = load_sharded_world(*paths, shard_size=args.shard_size, max_shards=args.max_shards)
+            else:
+                w = load_world(*paths, use_snapshot=False, compact=True)
+            load_time = time.perf_counter() - start_time
+
+            rng = random.Random(args.seed)
+            game = Game(w, allowed_moves=args.moves)
+            misses_before = w.misses if sharded else 0  # starting the game looks up where the winning items are
+            # Walk in straight runs, as a player crossing a campus would
+            direction, steps = 'east', []
+            start_time = time.perf_counter()
+            for _ in range(args.moves):
+                exits = [name.lower() for name in w.exits_at(game.player.x, game.player.y)]
+                if direction not in exits or rng.random() < 0.05:
+                    direction = rng.choice(exits)
+                if args.pause:
+                    time.sleep(args.pause)
+                step_start = time.perf_counter()
+                game.step(direction)
+                steps.append(time.perf_counter() - step_start)
+            play_time = time.perf_counter() - start_time - args.moves * args.pause
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            steps.sort()
+            print(f'{title}: load {load_time:.2f} s, {args.moves:,} moves in {play_time:.2f} s '
+                  f'(99th percentile {steps[len(steps) * 99 // 100] * 1000:.2f} ms, '
+                  f'slowest {steps[-1] * 1000:.2f} ms), '
+                  f'peak memory {peak / 1e6:.1f} MB')
+            if sharded:
+                print(f'    shards: {w.resident_shards} resident, {w.hits:,} hits, {misses_before:,} read on demand '
+                      f'to start the game and {w.misses - misses_before:,} while moving, {w.waits:,} waited for, '
+                      f'{w.prefetched:,} prefetched ({w.prefetch_errors} failed), {w.evictions:,} evicted')
+                w.close()
@@ -0,0 +1,599 @@
+"""CSC111 Project 1: Text Adventure Game Monte Carlo Simulator
+
+Module Description
+==================
+
+Balancing allowed_moves, visit_points and target_points by hand means playing the game over and over. This module
+plays it thousands or millions of times at once instead: every agent's state is a row of a few NumPy arrays, and
+each turn advances all agents that are still playing with array operations over the map.
+
+The simulation follows the rules of engine.Game:
+
+    - a move costs 1 move, or 0.5 once the agent has visited the skateboard at position 12
+    - the first visit of a location (including the start) earns its visit_points
+    - dropping an item at its target earns its target_points
+    - a SpecialItem can only be picked up while its key is in the agent's bag
+    - the agent wins as soon as every winning item (by default, every item that belongs in the Exam Centre) is at
+      its target, and loses once it has used more than allowed_moves moves
+
+Agents automatically pick up every tracked item they find (unless it already sits at its target) and drop every
+item they carry at its target, keeping a key until everything it unlocks has been picked up. Only the items that
+can affect winning are tracked (see solver.relevant_items). Agents move according to a policy:
+
+    - random: a uniformly random exit every turn
+    - greedy: towards the nearest item to collect or target to reach, or a random exit with probability epsilon
+
+Run this module to simulate the world in map.txt, locations.txt and items.txt:
+
+    python simulator.py --agents 1000000
+    python simulator.py --policy greedy --epsilon 0.2 --allowed-moves 15 20 25 30
+    python simulator.py --compare 20000               # also play 20000 agents through Player.go, for comparison
+
+This module needs NumPy.
+
+Copyright and Usage Information
+===============================
+
+This file is provided solely for the personal and private use of students
+taking CSC111 at the University of Toronto St. George campus. All forms of
+distribution of this code, whether as given or with any changes, are
+expressly prohibited. For more information on copyright for CSC111 materials,
+please consult our Course Syllabus.
+
+This file is Copyright (c) 2024 CSC111 Teaching Team
+"""
+import random
+import time
+from typing import Iterable, Optional
+
+import numpy as np
+
+from distances import UNREACHABLE as NO_PATH, DistanceOracle
+from engine import ALLOWED_MOVES, START_X, START_Y, GOALS, SKATEBOARD_POSITION
+from game_data import DIRECTIONS, World, Player, SpecialItem, Progress, index_of
+from solver import WALK_COST, SKATE_COST, relevant_items
+
+POLICIES = ('random', 'greedy')
+BATCH_SIZE = 250_000
+BATCH_MEMORY = 1 << 28
+
+# The place of an item that is in an agent's bag
+IN_BAG = -2
+# The distance of an unreachable cell
+UNREACHABLE = np.iinfo(np.int32).max
+
+# NTH_EXIT[mask * len(DIRECTIONS) + r] is the index in DIRECTIONS of the r-th open direction of an exits bitmask
+NTH_EXIT = np.zeros((1 << len(DIRECTIONS)) * len(DIRECTIONS), dtype=np.int64)
+for _mask in range(1 << len(DIRECTIONS)):
+    for _r, _bit in enumerate(bit for bit in range(len(DIRECTIONS)) if _mask & (1 << bit)):
+        NTH_EXIT[_mask * len(DIRECTIONS) + _r] = _bit
+EXIT_COUNT = np.array([bin(mask).count('1') for mask in range(1 << len(DIRECTIONS))], dtype=np.int8)
+
+
+class SimulationWorld:
+    """The parts of a World the simulator needs, as NumPy arrays. Cells are numbered y * width + x.
+
+    Instance Attributes:
+        - width: the width of the map
+        - positions: the position of the location at each cell, or -1
+        - exits: the exits bitmask of each cell (see game_data.EXIT_NAMES)
+        - neighbours: the cell in each direction of DIRECTIONS from each cell (at cell * len(DIRECTIONS) plus the
+        index of the direction), or -1 if there is no exit that way
+        - visit_points: the visit points of the location at each cell
+        - words: the number of 64-bit words of visited flags each agent needs
+        - slot_words: the word of the visited flag of each cell
+        - slot_bits: the bit of the visited flag of each cell in its word, or 0 if visiting it has no effect
+        - skateboard_cell: the cell of the skateboard's location, or -1 if there is none
+        - start_cell: the cell every agent starts at
+        - item_start: the position each tracked item starts at
+        - item_target: the target position of each tracked item
+        - item_points: the target points of each tracked item
+        - item_key: the index of the tracked item that unlocks each tracked item, or -1 if it is not locked
+        - winning: the indexes of the tracked items that must be at their targets to win
+        - oracle: the distances between the locations of the world
+        - fields: the distance from every cell to the start of each tracked item, followed by the distance from
+        every cell to the target of each tracked item, or None until needed by the greedy policy or pruning
+        - item_distances: the distance from the start of each tracked item to its target, or None until the fields
+        are computed
+
+    Representation Invariants:
+        - len(self.neighbours) == len(self.positions) * len(DIRECTIONS)
+    """
+    width: int
+    positions: np.ndarray
+    exits: np.ndarray
+    neighbours: np.ndarray
+    visit_points: np.ndarray
+    words: int
+    slot_words: np.ndarray
+    slot_bits: np.ndarray
+    skateboard_cell: int
+    start_cell: int
+    item_start: np.ndarray
+    item_target: np.ndarray
+    item_points: np.ndarray
+    item_key: np.ndarray
+    winning: np.ndarray
+    oracle: DistanceOracle
+    fields: Optional[np.ndarray]
+    item_distances: Optional[np.ndarray]
+
+    def __init__(self, world: World, start: tuple[int, int] = (START_X, START_Y),
+                 goals: Iterable[int] = GOALS, oracle: Optional[DistanceOracle] = None) -> None:
+        """Compile world (in its loaded or reset state) for simulation, with agents starting at start and winning
+        once every item whose target position is one of goals is at its target. oracle is the DistanceOracle of
+        world, if one has already been loaded.
+        """
+        self.width = world.width
+        num_cells = world.width * world.height
+
+        grid = np.full((world.height, world.width), -1, dtype=np.int32)
+        for y, row in enumerate(world.map):
+            grid[y, :len(row)] = row
+        self.positions = grid.reshape(-1)
+        self.exits = np.frombuffer(bytes(world.exits), dtype=np.uint8)
+
+        cells = np.arange(num_cells, dtype=np.int32)
+        neighbours = np.empty((num_cells, len(DIRECTIONS)), dtype=np.int64)
+        for bit, (_, dx, dy) in enumerate(DIRECTIONS):
+            neighbours[:, bit] = np.where(self.exits & (1 << bit), cells + dy * world.width + dx, -1)
+        self.neighbours = neighbours.reshape(-1)
+
+        # Everything a first visit depends on is looked up by cell, so arriving agents need no position lookup
+        walkable = np.flatnonzero(self.positions >= 0)
+        points = np.array([location.visit_points for location in world.locations], dtype=np.int64)
+        self.visit_points = np.zeros(num_cells, dtype=np.int64)
+        self.visit_points[walkable] = points[self.positions[walkable]]
+        skateboard = np.flatnonzero(self.positions == SKATEBOARD_POSITION)
+        self.skateboard_cell = int(skateboard[0]) if len(skateboard) else -1
+        tracked = np.flatnonzero((self.visit_points != 0) | (cells == self.skateboard_cell))
+        self.words = max(1, (len(tracked) + 63) // 64)
+        self.slot_words = np.zeros(num_cells, dtype=np.int64)
+        self.slot_words[tracked] = np.arange(len(tracked)) // 64
+        self.slot_bits = np.zeros(num_cells, dtype=np.uint64)
+        self.slot_bits[tracked] = np.left_shift(np.uint64(1), (np.arange(len(tracked)) % 64).astype(np.uint64))
+        self.start_cell = start[1] * world.width + start[0]
+
+        goals = frozenset(goals)
+        items = relevant_items(world, goals)
+        self.item_start = np.array([item.start_position for item in items], dtype=np.int32)
+        self.item_target = np.array([item.target_position for item in items], dtype=np.int32)
+        self.item_points = np.array([item.target_points for item in items], dtype=np.int64)
+        self.item_key = np.array([index_of(items, item.key) if isinstance(item, SpecialItem) else -1
+                                  for item in items], dtype=np.int32)
+        self.winning = np.flatnonzero([item.target_position in goals for item in items])
+        self.oracle = oracle if oracle is not None else DistanceOracle(world)
+        self.fields = None
+        self.item_distances = None
+
+    def distance_fields(self) -> np.ndarray:
+        """Return self.fields, computing it (and self.item_distances) from the oracle first if necessary.
+        """
+        if self.fields is None:
+            walkable = np.flatnonzero(self.positions >= 0)
+            goals = np.concatenate([self.item_start, self.item_target])
+            self.fields = np.full((len(goals), len(self.positions)), UNREACHABLE, dtype=np.int32)
+            for k, goal in enumerate(goals):
+                row = np.frombuffer(self.oracle.row(int(goal)), dtype=np.uint32)[self.positions[walkable]]
+                self.fields[k, walkable] = np.where(row == NO_PATH, UNREACHABLE, row)
+            self.item_distances = np.array([min(self.oracle.distance(int(start), int(target)), UNREACHABLE)
+                                            for start, target in zip(self.item_start, self.item_target)],
+                                           dtype=np.int64)
+        return self.fields
+
+
+class SimulationResult:
+    """The outcome of every agent of a simulation.
+
+    Instance Attributes:
+        - policy: the policy the agents followed
+        - allowed_moves: the move budget of every agent
+        - won: whether each agent won
+        - score: the final score of each agent
+        - moves_remaining: allowed_moves minus the moves each agent used (negative if it ran out of time)
+        - elapsed: the time the simulation took, in seconds
+        - steps: the number of turns simulated over all agents
+
+    Representation Invariants:
+        - len(self.won) == len(self.score) == len(self.moves_remaining)
+    """
+    policy: str
+    allowed_moves: float
+    won: np.ndarray
+    score: np.ndarray
+    moves_remaining: np.ndarray
+    elapsed: float
+    steps: int
+
+    def __init__(self, policy: str, allowed_moves: float, won: np.ndarray, score: np.ndarray,
+                 moves_remaining: np.ndarray, elapsed: float, steps: int) -> None:
+        """Initialize a new simulation result.
+        """
+        self.policy = policy
+        self.allowed_moves = allowed_moves
+        self.won = won
+        self.score = score
+        self.moves_remaining = moves_remaining
+        self.elapsed = elapsed
+        self.steps = steps
+
+    @property
+    def agents(self) -> int:
+        """Return the number of agents simulated.
+        """
+        return len(self.won)
+
+    @property
+    def win_rate(self) -> float:
+        """Return the fraction of agents that won.
+        """
+        return float(self.won.mean()) if self.agents else 0.0
+
+    @property
+    def agents_per_second(self) -> float:
+        """Return the number of agents simulated per second.
+        """
+        return self.agents / self.elapsed if self.elapsed > 0 else 0.0
+
+    def as_dict(self) -> dict:
+        """Return the distributions of this result as a JSON-compatible dictionary.
+        """
+        return {
+            'policy': self.policy,
+            'allowed_moves': self.allowed_moves,
+            'agents': self.agents,
+            'win_rate': self.win_rate,
+            'score': _distribution(self.score),
+            'score_of_winners': _distribution(self.score[self.won]),
+            'moves_remaining_of_winners': _distribution(self.moves_remaining[self.won]),
+            'elapsed_s': self.elapsed,
+            'agents_per_s': self.agents_per_second,
+            'steps_per_s': self.steps / self.elapsed if self.elapsed > 0 else 0.0,
+        }
+
+    def summary(self) -> str:
+        """Return a human-readable report of the distributions of this result.
+        """
+        lines = [f'{self.policy} agents: {self.agents:,}, allowed moves: {self.allowed_moves}, '
+                 f'win rate: {self.win_rate:.2%}',
+                 f'{"":<28}{"mean":>10}{"std":>10}{"p5":>8}{"p25":>8}{"p50":>8}{"p75":>8}{"p95":>8}']
+        for title, values in (('score', self.score), ('score of winners', self.score[self.won]),
+                              ('moves remaining of winners', self.moves_remaining[self.won])):
+            data = _distribution(values)
+            if data['count']:
+                lines.append(f'{title:<28}{data["mean"]:>10.2f}{data["std"]:>10.2f}'
+                             + ''.join(f'{data["percentiles"][p]:>8g}' for p in ('5', '25', '50', '75', '95')))
+        scores, counts = np.unique(self.score, return_counts=True)
+        top = np.argsort(-counts)[:8]
+        lines.append('most common scores: ' + ', '.join(f'{scores[i]}: {counts[i] / self.agents:.1%}'
+                                                       for i in sorted(top, key=lambda i: scores[i])))
+        lines.append(f'{self.elapsed:.3f} s, {self.agents_per_second:,.0f} agents/s, '
+                     f'{self.steps / self.elapsed if self.elapsed > 0 else 0.0:,.0f} agent-turns/s')
+        return '\n'.join(lines)
+
+
+def simulate(world: World, agents: int, policy: str = 'random', allowed_moves: float = ALLOWED_MOVES,
+             epsilon: float = 0.1, seed: Optional[int] = None, compiled: Optional[SimulationWorld] = None,
+             batch_size: int = BATCH_SIZE, goals: Iterable[int] = GOALS, prune: bool = False) -> SimulationResult:
+    """Return the outcome of agents games of world, each played by an agent following policy and winning once every
+    item whose target position is one of goals is at its target. With prune, an agent stops as soon as the
+    distances of the world show it can no longer win in time, as the game itself does with a DistanceOracle.
+
+    Agents are simulated at most batch_size at a time, and fewer if their state would take more than
+    BATCH_MEMORY bytes (an agent takes about one bit per location with visit points, plus a few bytes per tracked
+    item). Pass compiled to reuse the arrays of an earlier simulation of the same world (goals are then taken from
+    compiled). world is only read.
+
+    Preconditions:
+        - policy in POLICIES
+        - agents >= 0 and batch_size > 0
+        - 0 <= epsilon <= 1
+    """
+    start_time = time.perf_counter()
+    sim = compiled if compiled is not None else SimulationWorld(world, goals=goals)
+    rng = np.random.default_rng(seed)
+    agent_bytes = 8 * sim.words + 4 * len(sim.item_start) + 48
+    batch_size = max(1, min(batch_size, BATCH_MEMORY // agent_bytes))
+    won, score, remaining = [], [], []
+    steps = 0
+    for first in range(0, agents, batch_size):
+        batch = _simulate_batch(sim, min(batch_size, agents - first), policy, allowed_moves, epsilon, rng, prune)
+        won.append(batch[0])
+        score.append(batch[1])
+        remaining.append(batch[2])
+        steps += batch[3]
+
+    return SimulationResult(policy, allowed_moves,
+                            np.concatenate(won) if won else np.zeros(0, dtype=bool),
+                            np.concatenate(score) if score else np.zeros(0, dtype=np.int64),
+                            np.concatenate(remaining) if remaining else np.zeros(0),
+                            time.perf_counter() - start_time, steps)
+
+
+def _simulate_batch(sim: SimulationWorld, n: int, policy: str, allowed_moves: float, epsilon: float,
+                    rng: np.random.Generator, prune: bool = False) -> tuple[np.ndarray, np.ndarray, np.ndarray, int]:
+    """Simulate n agents and return whether each won, their scores, their moves remaining and the number of
+    turns simulated.
+
+    Only the agents still playing are kept in the state arrays: whenever agents finish, their results are
+    recorded and their rows are dropped, so every array operation works on contiguous arrays of live agents.
+    Moves are counted in half-moves (see solver.WALK_COST) so they stay integers.
+    """
+    num_items = len(sim.item_start)
+    budget = allowed_moves * WALK_COST
+    fields = sim.distance_fields() if policy == 'greedy' or prune else None
+    unit = SKATE_COST if sim.skateboard_cell >= 0 else WALK_COST
+    # Which items each item is the key of (a key is kept until all of them have been picked up)
+    locks = [np.flatnonzero(sim.item_key == i) for i in range(num_items)]
+
+    won = np.zeros(n, dtype=bool)
+    final_score = np.zeros(n, dtype=np.int64)
+    final_moves = np.zeros(n, dtype=np.int64)
+
+    ids = np.arange(n)
+    cell = np.full(n, sim.start_cell, dtype=np.int64)
+    moves = np.zeros(n, dtype=np.int64)
+    cost = np.full(n, WALK_COST, dtype=np.int64)
+    score = np.zeros(n, dtype=np.int64)
+    visited = np.zeros((sim.words, n), dtype=np.uint64)
+    places = [np.full(n, start, dtype=np.int32) for start in sim.item_start]
+
+    def retire(done: np.ndarray, victory: np.ndarray) -> None:
+        """Record the results of the agents marked in done and drop them from the state arrays."""
+        nonlocal ids, cell, moves, cost, score, visited, places
+        finished = ids[done]
+        won[finished] = victory[done]
+        final_score[finished] = score[done]
+        final_moves[finished] = moves[done]
+        keep = ~done
+        ids, cell, moves, cost, score = ids[keep], cell[keep], moves[keep], cost[keep], score[keep]
+        visited = visited[:, keep]
+        places = [place[keep] for place in places]
+
+    doomed = _cannot_win(sim, cell, moves, places, budget, unit) if prune else np.zeros(n, dtype=bool)
+    _arrive(sim, cell, visited, score, cost, ~doomed)
+    if doomed.any():
+        retire(doomed, np.zeros(n, dtype=bool))
+    steps = 0
+    while len(ids):
+        steps += len(ids)
+        here = sim.positions[cell]
+
+        # Pick up every item found (unless it is at its target), then drop every item at its target
+        for i in range(num_items):
+            take = (places[i] == here) & (here != sim.item_target[i])
+            if sim.item_key[i] >= 0:
+                take &= places[sim.item_key[i]] == IN_BAG
+            places[i][take] = IN_BAG
+        for i in range(num_items):
+            put = (places[i] == IN_BAG) & (here == sim.item_target[i])
+            for locked in locks[i]:
+                put &= places[locked] != sim.item_start[locked]
+            places[i][put] = sim.item_target[i]
+            score[put] += sim.item_points[i]
+
+        victory = np.ones(len(ids), dtype=bool)
+        for i in sim.winning:
+            victory &= places[i] == sim.item_target[i]
+
+        # Move
+        masks = sim.exits[cell]
+        counts = EXIT_COUNT[masks]
+        directions = NTH_EXIT[masks * len(DIRECTIONS) + (rng.random(len(ids), dtype=np.float32) * counts)
+                              .astype(np.int64)]
+        if policy == 'greedy':
+            chosen = _greedy_directions(sim, fields, cell, places)
+            use = (chosen >= 0) & (rng.random(len(ids), dtype=np.float32) >= epsilon)
+            directions = np.where(use, chosen, directions)
+        going = ~victory & (counts > 0)
+        cell = np.where(going, sim.neighbours[cell * len(DIRECTIONS) + directions], cell)
+        moves += np.where(going, cost, 0)
+        done = ~going | (moves > budget)
+        if prune:
+            done |= _cannot_win(sim, cell, moves, places, budget, unit)
+        _arrive(sim, cell, visited, score, cost, ~done)
+
+        if done.any():
+            retire(done, victory)
+
+    return won, final_score, allowed_moves - final_moves / WALK_COST, steps
+
+
+def _arrive(sim: SimulationWorld, cell: np.ndarray, visited: np.ndarray, score: np.ndarray, cost: np.ndarray,
+            arriving: Optional[np.ndarray] = None) -> None:
+    """Apply the first-visit effects of the location at each agent's cell (only for the agents marked in arriving,
+    if given): visit points and the skateboard.
+    """
+    bits = sim.slot_bits[cell]
+    if len(visited) == 1:
+        seen = visited[0]
+    else:
+        words = sim.slot_words[cell]
+        seen = visited[words, np.arange(len(cell))]
+    first = ((seen & bits) == 0) & (bits != 0)
+    if arriving is not None:
+        first &= arriving
+    seen = seen | np.where(first, bits, np.uint64(0))
+    if len(visited) == 1:
+        visited[0] = seen
+    else:
+        visited[words, np.arange(len(cell))] = seen
+    score += np.where(first, sim.visit_points[cell], 0)
+    cost[first & (cell == sim.skateboard_cell)] = SKATE_COST
+
+
+def _cannot_win(sim: SimulationWorld, cell: np.ndarray, moves: np.ndarray, places: list[np.ndarray], budget: float,
+                unit: int) -> np.ndarray:
+    """Return which agents cannot win within budget half-moves: those for which some winning item is further from
+    its target (through the agent, if it is not carried) than the half-moves they have left, at unit half-moves
+    per move.
+    """
+    num_items = len(sim.item_start)
+    needed = np.zeros(len(cell), dtype=np.int64)
+    for i in sim.winning:
+        to_target = sim.fields[num_items + i, cell].astype(np.int64)
+        via_item = sim.fields[i, cell].astype(np.int64) + sim.item_distances[i]
+        at_target = places[i] == sim.item_target[i]
+        needed = np.maximum(needed, np.where(places[i] == IN_BAG, to_target, np.where(at_target, 0, via_item)))
+    return moves + needed * unit > budget
+
+
+def _greedy_directions(sim: SimulationWorld, fields: np.ndarray, cells: np.ndarray,
+                       places: list[np.ndarray]) -> np.ndarray:
+    """Return, for each agent at cells with its items at places, the index in DIRECTIONS of the move towards its
+    nearest goal (an item it can pick up or the target of an item it can drop), or -1 if it has no reachable goal.
+    """
+    num_items = len(sim.item_start)
+    n = len(cells)
+    goal_distances = np.full((n, 2 * num_items), UNREACHABLE, dtype=np.int64)
+    for i in range(num_items):
+        can_take = (places[i] == sim.item_start[i]) & (sim.item_start[i] != sim.item_target[i])
+        if sim.item_key[i] >= 0:
+            can_take &= places[sim.item_key[i]] == IN_BAG
+        goal_distances[can_take, i] = fields[i, cells[can_take]]
+        can_put = places[i] == IN_BAG
+        for locked in np.flatnonzero(sim.item_key == i):
+            can_put &= places[locked] != sim.item_start[locked]
+        goal_distances[can_put, num_items + i] = fields[num_items + i, cells[can_put]]
+
+    goals = goal_distances.argmin(axis=1)
+    reachable = goal_distances[np.arange(n), goals] < UNREACHABLE
+    targets = sim.neighbours[cells[:, None] * len(DIRECTIONS) + np.arange(len(DIRECTIONS))]
+    distances = np.where(targets >= 0, fields[goals[:, None], np.maximum(targets, 0)], UNREACHABLE)
+    return np.where(reachable, distances.argmin(axis=1), -1)
+
+
+def scalar_simulate(world: World, agents: int, allowed_moves: float = ALLOWED_MOVES,
+                    seed: Optional[int] = None, goals: Iterable[int] = GOALS,
+                    oracle: Optional[DistanceOracle] = None) -> SimulationResult:
+    """Return the outcome of agents games of world played one at a time by random agents, with the same rules as
+    simulate but carried out by the game itself: Player.go, Player.pick_up_item and Player.drop_item in a fresh
+    session.WorldOverlay of world for every agent. With oracle, an agent stops as soon as it can no longer win in
+    time (simulate with prune).
+
+    This is the slow way simulate replaces; it is kept to check simulate's rules and measure its speed-up.
+    """
+    from session import WorldOverlay
+
+    rng = random.Random(seed)
+    start_time = time.perf_counter()
+    relevant = relevant_items(world, goals)
+    tracked = [i for i, item in enumerate(world.items) if any(item is other for other in relevant)]
+    won, score, remaining = [], [], []
+    steps = 0
+    unit = 0.5 if oracle is not None and oracle.num_positions > SKATEBOARD_POSITION else 1
+
+    def discard(_: str) -> None:
+        """Throw away the game's messages."""
+
+    for _ in range(agents):
+        session = WorldOverlay(world)
+        items = [session.items[i] for i in tracked]
+        player = Player(START_X, START_Y)
+        player.progress = Progress(session, goals)
+        location = session.get_location(player.x, player.y)
+        victory = False
+
+        while True:
+            steps += 1
+            if oracle is not None:
+                needed = oracle.moves_to_win(player.progress, location.position)
+                if needed == NO_PATH or player.moves + needed * unit > allowed_moves:
+                    break
+            if not location.visited:
+                location.visited = True
+                player.score += location.visit_points
+                if location.position == SKATEBOARD_POSITION:
+                    player.movement_mod = 0.5
+
+            for item in items:
+                if item in location.location_items and item.target_position != location.position and \
+                        (not isinstance(item, SpecialItem) or item.key in player.inventory):
+                    player.pick_up_item(location, item.name, discard)
+            for item in items:
+                if item in player.inventory and item.target_position == location.position and \
+                        all(other not in session.location_at(other.start_position).location_items
+                            for other in items if isinstance(other, SpecialItem) and other.key is item):
+                    player.drop_item(location, item.name, discard)
+
+            if player.progress.won:
+                victory = True
+                break
+            exits = session.exits_at(player.x, player.y)
+            if not exits:
+                break
+            player.go(rng.choice(exits).lower())
+            if player.moves > allowed_moves:
+                break
+            location = session.get_location(player.x, player.y)
+
+        won.append(victory)
+        score.append(player.score)
+        remaining.append(allowed_moves - player.moves)
+
+    return SimulationResult('random (scalar)', allowed_moves, np.array(won, dtype=bool),
+                            np.array(score, dtype=np.int64), np.array(remaining), time.perf_counter() - start_time,
+                            steps)
+
+
+def _distribution(values: np.ndarray) -> dict:
+    """Return the count, mean, standard deviation and percentiles of values.
+    """
+    if not len(values):
+        return {'count': 0}
+    percentiles = np.percentile(values, [5, 25, 50, 75, 95])
+    return {
+        'count': int(len(values)),
+        'mean': float(values.mean()),
+        'std': float(values.std()),
+        'min': float(values.min()),
+        'max': float(values.max()),
+        'percentiles': {str(p): float(v) for p, v in zip((5, 25, 50, 75, 95), percentiles)},
+    }
+
+
+if __name__ == '__main__':
+    import argparse
+    import json
+    from world_cache import load_world, load_distances
+
+    parser = argparse.ArgumentParser(description='Simulate many playthroughs of the text adventure game.')
+    parser.add_argument('files', nargs='*', help='map, locations and items files (default: the shipped campus)')
+    parser.add_argument('--agents', type=int, default=100_000)
+    parser.add_argument('--policy', choices=POLICIES, default='random')
+    parser.add_argument('--epsilon', type=float, default=0.1, help='chance of a random move for greedy agents')
+    parser.add_argument('--allowed-moves', type=float, nargs='*', default=[ALLOWED_MOVES],
+                        help='simulate each of these move budgets')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--output', default=None, help='write the distributions to this JSON file')
+    parser.add_argument('--compare', type=int, default=0,
+                        help='also play this many random agents through the game itself, for comparison')
+    parser.add_argument('--prune', action='store_true', help='stop agents as soon as they can no longer win')
+    args = parser.parse_args()
+
+    paths = args.files[:3] if len(args.files) >= 3 else ['map.txt', 'locations.txt', 'items.txt']
+    w = load_world(*paths)
+    distance_oracle = load_distances(w, *paths)
+    compiled_world = SimulationWorld(w, oracle=distance_oracle)
+    results = []
+    for budget in args.allowed_moves:
+        result = simulate(w, args.agents, args.policy, budget, args.epsilon, args.seed, compiled_world,
+                          prune=args.prune)
+        results.append(result.as_dict())
+        print(result.summary())
+        print()
+
+    if args.compare:
+        scalar = scalar_simulate(w, args.compare, args.allowed_moves[0], args.seed,
+                                 oracle=distance_oracle if args.prune else None)
+        vector = simulate(w, args.compare, 'random', args.allowed_moves[0], seed=args.seed, compiled=compiled_world,
+                          prune=args.prune)
+        print(scalar.summary())
+        print()
+        print(f'{args.compare:,} random agents: game loop {scalar.agents_per_second:,.0f} agents/s, '
+              f'simulator {vector.agents_per_second:,.0f} agents/s '
+              f'({vector.agents_per_second / scalar.agents_per_second:.0f}x)')
+
+    if args.output is not None:
+        with open(args.output, 'w') as output_file:
+            json.dump(results, output_file, indent=2)
@@ -0,0 +1,314 @@
+"""CSC111 Project 1: Text Adventure Game Solver
+
+Module Description
+==================
+
+This module finds the fewest moves needed to win a world, and the commands that do it. It runs an A* search over
+the full state of a game: the player's cell, whether they have found the skateboard, where every relevant item is
+(at a location or in the inventory) and which SpecialItems have been unlocked. SpecialItem locks, the skateboard's
+movement_mod of 0.5 and the allowed_moves budget are all respected. Only the items that can matter for winning
+(the winning items and, recursively, the keys of the SpecialItems among them) are part of the state.
+
+Moves are counted in half-moves internally so that skateboard moves stay integers. The heuristic is the distance
+the player must still cover for the furthest winning item (to pick it up and bring it to its target), which never
+overestimates the real cost: the Manhattan distance, or the true shortest path when a DistanceOracle is given.
+States whose heuristic shows they cannot win within the allowed moves are pruned.
+Every state is packed into one integer (see StateCodec) and the best cost found for it is kept in a
+transposition table.
+
+Run this module to solve the world in map.txt, locations.txt and items.txt and print a solution.txt-compatible
+list of commands, or give the three files (and optionally an output file) on the command line.
+
+Copyright and Usage Information
+===============================
+
+This file is provided solely for the personal and private use of students
+taking CSC111 at the University of Toronto St. George campus. All forms of
+distribution of this code, whether as given or with any changes, are
+expressly prohibited. For more information on copyright for CSC111 materials,
+please consult our Course Syllabus.
+
+This file is Copyright (c) 2024 CSC111 Teaching Team
+"""
+import heapq
+import time
+from typing import Iterable, Optional
+
+from distances import UNREACHABLE, DistanceOracle
+from engine import ALLOWED_MOVES, START_X, START_Y, GOALS, SKATEBOARD_POSITION
+from game_data import DIRECTIONS, World, Item, SpecialItem, index_of
+
+# The cost of one move in half-moves, without and with the skateboard
+WALK_COST = 2
+SKATE_COST = 1
+
+
+class SolverResult:
+    """The outcome of a solver search.
+
+    Instance Attributes:
+        - commands: the commands that win the game in the fewest moves, or None if the game cannot be won within
+        the allowed moves
+        - moves: the number of moves those commands use, or None if there is no solution
+        - nodes_expanded: the number of states the search expanded
+        - elapsed: the time the search took, in seconds
+
+    Representation Invariants:
+        - (self.commands is None) == (self.moves is None)
+        - self.nodes_expanded >= 0 and self.elapsed >= 0
+    """
+    commands: Optional[list[str]]
+    moves: Optional[float]
+    nodes_expanded: int
+    elapsed: float
+
+    def __init__(self, commands: Optional[list[str]], moves: Optional[float], nodes_expanded: int,
+                 elapsed: float) -> None:
+        """Initialize a new solver result.
+        """
+        self.commands = commands
+        self.moves = moves
+        self.nodes_expanded = nodes_expanded
+        self.elapsed = elapsed
+
+    @property
+    def nodes_per_second(self) -> float:
+        """Return the number of states expanded per second of search.
+        """
+        return self.nodes_expanded / self.elapsed if self.elapsed > 0 else 0.0
+
+
+class StateCodec:
+    """Packs solver states into single integers and back.
+
+    A state is a tuple (cell, skateboard, unlocked, places) where cell is y * width + x, skateboard is 0 or 1,
+    unlocked is a bitmask of the unlocked SpecialItems among the tracked items and places[i] is the position of
+    the location tracked item i is at, or num_positions if it is in the inventory.
+
+    Instance Attributes:
+        - num_cells: the number of cells of the map
+        - num_positions: the number of locations in the world
+        - num_items: the number of tracked items
+
+    Representation Invariants:
+        - self.num_cells > 0 and self.num_positions > 0 and self.num_items >= 0
+    """
+    num_cells: int
+    num_positions: int
+    num_items: int
+
+    def __init__(self, num_cells: int, num_positions: int, num_items: int) -> None:
+        """Initialize a codec for the given world dimensions.
+        """
+        self.num_cells = num_cells
+        self.num_positions = num_positions
+        self.num_items = num_items
+
+    def encode(self, state: tuple[int, int, int, tuple[int, ...]]) -> int:
+        """Return the integer encoding of state.
+        """
+        cell, skateboard, unlocked, places = state
+        code = 0
+        for place in reversed(places):
+            code = code * (self.num_positions + 1) + place
+        code = (code << self.num_items) | unlocked
+        return (code * 2 + skateboard) * self.num_cells + cell
+
+    def decode(self, code: int) -> tuple[int, int, int, tuple[int, ...]]:
+        """Return the state encoded as code.
+        """
+        code, cell = divmod(code, self.num_cells)
+        code, skateboard = divmod(code, 2)
+        unlocked = code & ((1 << self.num_items) - 1)
+        code >>= self.num_items
+        places = []
+        for _ in range(self.num_items):
+            code, place = divmod(code, self.num_positions + 1)
+            places.append(place)
+        return cell, skateboard, unlocked, tuple(places)
+
+
+def relevant_items(world: World, goals: Iterable[int] = GOALS) -> list[Item]:
+    """Return the items of world that can affect whether the game is won: the winning items (whose target position
+    is one of goals) and every item needed (directly or through other keys) to unlock one of them.
+    """
+    goals = frozenset(goals)
+    relevant = []
+    to_visit = [item for item in world.items if item.target_position in goals]
+    while to_visit:
+        item = to_visit.pop()
+        if all(item is not other for other in relevant):
+            relevant.append(item)
+            if isinstance(item, SpecialItem):
+                to_visit.append(item.key)
+    return [item for item in world.items if any(item is other for other in relevant)]
+
+
+def solve(world: World, allowed_moves: int = ALLOWED_MOVES, start: tuple[int, int] = (START_X, START_Y),
+          goals: Iterable[int] = GOALS, oracle: Optional[DistanceOracle] = None) -> SolverResult:
+    """Return the shortest way to win a fresh game in world, starting from start with allowed_moves moves, where
+    winning means bringing every item whose target position is one of goals to its target. With oracle, the
+    search is guided (and pruned) by true distances instead of Manhattan distances.
+
+    world is only read, so it should be in its loaded (or reset) state. Raise ValueError if there is no location
+    at start, or some item that matters for winning starts or belongs at a position that is not on the map.
+    """
+    start_time = time.perf_counter()
+    width = world.width
+    cells = world.width * world.height
+
+    # Where each location is, and the walkable neighbours of every cell
+    coordinates = {}
+    neighbours = []
+    for y in range(world.height):
+        for x in range(world.width):
+            if world.is_walkable(x, y):
+                coordinates[world.position_at(x, y)] = (x, y)
+            exits = world.exits_at(x, y)
+            neighbours.append([(name.lower(), (y + dy) * width + x + dx)
+                               for name, dx, dy in DIRECTIONS if name in exits])
+
+    def position_of(cell: int) -> int:
+        """Return the position of the location at cell."""
+        return world.position_at(cell % width, cell // width)
+
+    goals = frozenset(goals)
+    items = relevant_items(world, goals)
+    for item in items:
+        for position in (item.start_position, item.target_position):
+            if position not in coordinates:
+                raise ValueError(f'{item.name} starts or belongs at position {position}, which is not on the map')
+    if not world.is_walkable(*start):
+        raise ValueError(f'there is no location at the start {start}')
+    num_positions = len(world.locations)
+    in_bag = num_positions
+    winning = [i for i, item in enumerate(items) if item.target_position in goals]
+    targets = [item.target_position for item in items]
+    keys = [index_of(items, item.key) if isinstance(item, SpecialItem) else -1 for item in items]
+    has_skateboard = SKATEBOARD_POSITION in coordinates
+
+    codec = StateCodec(cells, num_positions, len(items))
+    budget = int(allowed_moves * WALK_COST)
+
+    def distance(start: int, end: int) -> int:
+        """Return a lower bound on the moves from position start to position end."""
+        if oracle is not None:
+            return oracle.distance(start, end)
+        start_x, start_y = coordinates[start]
+        end_x, end_y = coordinates[end]
+        return abs(start_x - end_x) + abs(start_y - end_y)
+
+    def heuristic(state: tuple[int, int, int, tuple[int, ...]]) -> int:
+        """Return a lower bound on the half-moves still needed to win from state (UNREACHABLE if it cannot win)."""
+        cell, skateboard, _, places = state
+        here = position_of(cell)
+        unit = SKATE_COST if skateboard or has_skateboard else WALK_COST
+        best = 0
+        for i in winning:
+            place = places[i]
+            if place == in_bag:
+                moves = distance(here, targets[i])
+            elif place != targets[i]:
+                to_item, to_target = distance(here, place), distance(place, targets[i])
+                moves = UNREACHABLE if UNREACHABLE in (to_item, to_target) else to_item + to_target
+            else:
+                moves = 0
+            if moves == UNREACHABLE:
+                return UNREACHABLE
+            best = max(best, moves)
+        return best * unit
+
+    def is_won(places: tuple[int, ...]) -> bool:
+        """Return whether every winning item is at its target."""
+        return all(places[i] == targets[i] for i in winning)
+
+    start_cell = start[1] * width + start[0]
+    start_state = (start_cell, int(position_of(start_cell) == SKATEBOARD_POSITION), 0,
+                   tuple(item.start_position for item in items))
+    start_code = codec.encode(start_state)
+
+    best_cost = {start_code: 0}  # the transposition table
+    parents = {start_code: (None, [])}
+    frontier = [(heuristic(start_state), 0, start_code)]
+    expanded = 0
+
+    while frontier:
+        _, cost, code = heapq.heappop(frontier)
+        if cost > best_cost[code]:
+            continue
+        state = codec.decode(code)
+        cell, skateboard, unlocked, places = state
+
+        if is_won(places):
+            commands = _commands_to(parents, code)
+            return SolverResult(commands, cost / WALK_COST, expanded, time.perf_counter() - start_time)
+
+        expanded += 1
+        successors = []
+
+        # Moves
+        step = SKATE_COST if skateboard else WALK_COST
+        if cost + step <= budget:
+            for direction, target in neighbours[cell]:
+                new_skateboard = skateboard or int(position_of(target) == SKATEBOARD_POSITION)
+                successors.append(((target, new_skateboard, unlocked, places), cost + step, [direction]))
+
+        # Picking up and dropping items take no time
+        here = position_of(cell)
+        for i, place in enumerate(places):
+            name = items[i].name.lower()
+            if place == here:
+                new_unlocked = unlocked
+                if keys[i] != -1 and not unlocked & (1 << i):
+                    if places[keys[i]] != in_bag:
+                        continue  # still locked
+                    new_unlocked |= 1 << i
+                new_places = places[:i] + (in_bag,) + places[i + 1:]
+                successors.append(((cell, skateboard, new_unlocked, new_places), cost, ['pick up', name]))
+            elif place == in_bag:
+                new_places = places[:i] + (here,) + places[i + 1:]
+                successors.append(((cell, skateboard, unlocked, new_places), cost, ['drop', name]))
+
+        for new_state, new_cost, commands in successors:
+            new_code = codec.encode(new_state)
+            if new_cost < best_cost.get(new_code, budget + 1):
+                estimate = heuristic(new_state)
+                if estimate == UNREACHABLE or new_cost + estimate > budget:
+                    continue  # cannot win in time from here
+                best_cost[new_code] = new_cost
+                parents[new_code] = (code, commands)
+                heapq.heappush(frontier, (new_cost + estimate, new_cost, new_code))
+
+    return SolverResult(None, None, expanded, time.perf_counter() - start_time)
+
+
+def _commands_to(parents: dict[int, tuple[Optional[int], list[str]]], code: int) -> list[str]:
+    """Return the commands that lead from the start state to the state encoded as code.
+    """
+    steps = []
+    while parents[code][0] is not None:
+        previous, commands = parents[code]
+        steps.append(commands)
+        code = previous
+    return [command for commands in reversed(steps) for command in commands]
+
+
+if __name__ == '__main__':
+    import sys
+    from world_cache import load_world, load_distances
+
+    args = sys.argv[1:]
+    paths = args[:3] if len(args) >= 3 else ['map.txt', 'locations.txt', 'items.txt']
+    w = load_world(*paths)
+    result = solve(w, oracle=load_distances(w, *paths))
+
+    if result.commands is None:
+        print(f'No way to win within {ALLOWED_MOVES} moves.', file=sys.stderr)
+    elif len(args) >= 4:
+        with open(args[3], 'w') as output_file:
+            output_file.write('\n'.join(result.commands) + '\n')
+    else:
+        print('\n'.join(result.commands))
+
+    print(f'moves: {result.moves}, nodes expanded: {result.nodes_expanded}, '
+          f'{result.nodes_per_second:,.0f} nodes/s', file=sys.stderr)
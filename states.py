@@ -0,0 +1,155 @@
+"""CSC111 Project 1: Text Adventure Game State Store
+
+Module Description
+==================
+
+A StateStore keeps every distinct game state added to it once, so that tools that meet the same state again and
+again (a search, the fuzzer, a batch of simulated or replayed games) can tell new states from old ones and store
+each only once. States come from game_data.StateTracker (see Game's track_state): a state is looked up by its
+Zobrist hash first, and its encoding is only built and compared when a state with the same hash is already stored
+or the state is new.
+
+Run this module to measure it: random games are played in the default world with their state tracked, and every
+state they pass through is added to one store.
+
+    python states.py
+    python states.py --games 2000 --steps 300 --world big_map.txt big_locations.txt big_items.txt
+
+Copyright and Usage Information
+===============================
+
+This file is provided solely for the personal and private use of students
+taking CSC111 at the University of Toronto St. George campus. All forms of
+distribution of this code, whether as given or with any changes, are
+expressly prohibited. For more information on copyright for CSC111 materials,
+please consult our Course Syllabus.
+
+This file is Copyright (c) 2024 CSC111 Teaching Team
+"""
+from typing import Optional
+
+from game_data import StateTracker
+
+
+class StateStore:
+    """Every distinct game state added to this store, each kept once as its encoding.
+
+    Every state gets an id, the number of distinct states added before it, which never changes.
+
+    Instance Attributes:
+        - added: the number of times a state was added, new or not
+        - collisions: the number of times a state was added whose hash was already stored for a different state
+
+    Representation Invariants:
+        - len(self) <= self.added
+    """
+    added: int
+    collisions: int
+
+    # Private Instance Attributes:
+    #   - _states: the encoding of every stored state, by id
+    #   - _ids: the id of every stored state by its hash, or a list of ids for a hash shared by several states
+    _states: list[bytes]
+    _ids: dict[int, int | list[int]]
+
+    def __init__(self) -> None:
+        """Initialize a new, empty store.
+        """
+        self.added = 0
+        self.collisions = 0
+        self._states = []
+        self._ids = {}
+
+    def __len__(self) -> int:
+        """Return the number of distinct states in this store.
+        """
+        return len(self._states)
+
+    def __contains__(self, tracker: StateTracker) -> bool:
+        """Return whether the current state of tracker is in this store.
+        """
+        return self.find(tracker) is not None
+
+    def find(self, tracker: StateTracker) -> Optional[int]:
+        """Return the id of the current state of tracker, or None if it is not in this store.
+        """
+        ids = self._ids.get(tracker.hash)
+        if ids is None:
+            return None
+        encoding = tracker.encode()
+        for state_id in ids if isinstance(ids, list) else (ids,):
+            if self._states[state_id] == encoding:
+                return state_id
+        return None
+
+    def add(self, tracker: StateTracker) -> tuple[int, bool]:
+        """Add the current state of tracker to this store, unless it is already there, and return (id of the
+        state, whether it was new).
+        """
+        self.added += 1
+        encoding = tracker.encode()
+        ids = self._ids.get(tracker.hash)
+        if ids is not None:
+            for state_id in ids if isinstance(ids, list) else (ids,):
+                if self._states[state_id] == encoding:
+                    return state_id, False
+            self.collisions += 1
+
+        state_id = len(self._states)
+        self._states.append(encoding)
+        if ids is None:
+            self._ids[tracker.hash] = state_id
+        elif isinstance(ids, list):
+            ids.append(state_id)
+        else:
+            self._ids[tracker.hash] = [ids, state_id]
+        return state_id, True
+
+    def encoding(self, state_id: int) -> bytes:
+        """Return the encoding of the state with state_id (see StateTracker.encode).
+        """
+        return self._states[state_id]
+
+    def num_bytes(self) -> int:
+        """Return the total length of the encodings of the states in this store.
+        """
+        return sum(len(state) for state in self._states)
+
+
+if __name__ == '__main__':
+    import argparse
+    import random
+    import time
+
+    from engine import Game
+    from fuzzer import next_command, vocabulary
+    from session import WorldOverlay
+    from world_cache import load_world
+
+    parser = argparse.ArgumentParser(description='Add the states of random games to a StateStore and time it.')
+    parser.add_argument('--world', nargs=3, default=['map.txt', 'locations.txt', 'items.txt'],
+                        metavar=('MAP', 'LOCATIONS', 'ITEMS'))
+    parser.add_argument('--games', type=int, default=500)
+    parser.add_argument('--steps', type=int, default=200, help='commands per game')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    w = load_world(*args.world)
+    words = vocabulary(w)
+    rng = random.Random(args.seed)
+    store = StateStore()
+    elapsed = 0.0
+    for _ in range(args.games):
+        game = Game(WorldOverlay(w), track_state=True)
+        tracker = game.player.tracker
+        for _ in range(args.steps):
+            if game.over:
+                break
+            game.step(next_command(rng, game, words))
+            start = time.perf_counter()
+            store.add(tracker)
+            elapsed += time.perf_counter() - start
+
+    print(f'{store.added:,} states added in {elapsed:.3f} s ({store.added / elapsed:,.0f} states/s): '
+          f'{len(store):,} distinct ({store.added - len(store):,} repeats), {store.collisions} hash collisions, '
+          f'{store.num_bytes() / max(1, len(store)):.0f} bytes per state')
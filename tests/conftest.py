@@ -0,0 +1,29 @@
+"""Shared fixtures for the tests of the text adventure game.
+
+The game's modules live at the root of the repository and read their data files (map.txt, locations.txt, items.txt,
+solution.txt) from there, so the root is put on sys.path and the paths of the data files are made absolute.
+"""
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from world_cache import parse_world  # noqa: E402
+
+WORLD_PATHS = tuple(os.path.join(ROOT, name) for name in ('map.txt', 'locations.txt', 'items.txt'))
+
+
+@pytest.fixture
+def world():
+    """Return the shipped campus, freshly parsed from its files."""
+    return parse_world(*WORLD_PATHS)
+
+
+@pytest.fixture
+def solution() -> list[str]:
+    """Return the commands of solution.txt."""
+    with open(os.path.join(ROOT, 'solution.txt')) as solution_file:
+        return solution_file.read().splitlines()
@@ -0,0 +1,131 @@
+"""Tests for distances.DistanceOracle and the parts of engine.Game that use it: hints and ending the game early once
+winning is impossible.
+"""
+import random
+from collections import deque
+
+from distances import UNREACHABLE, DistanceOracle
+from engine import SKATEBOARD_POSITION, UNWINNABLE_TEXT, Game, play
+from fuzzer import next_command, vocabulary
+from game_data import DIRECTIONS, World
+from test_engine import SOLUTION_TRANSCRIPT
+
+
+def _cells(world) -> dict[int, tuple[int, int]]:
+    """Return the cell of every position of world."""
+    return {position: (x, y) for y, row in enumerate(world.map) for x, position in enumerate(row) if position != -1}
+
+
+def _search(world, start: int) -> dict[int, int]:
+    """Return the fewest moves from start to every position reachable from it, by breadth-first search."""
+    cells = _cells(world)
+    moves, queue = {start: 0}, deque([start])
+    while queue:
+        position = queue.popleft()
+        x, y = cells[position]
+        for name, dx, dy in DIRECTIONS:
+            if name in world.exits_at(x, y):
+                neighbour = world.position_at(x + dx, y + dy)
+                if neighbour not in moves:
+                    moves[neighbour] = moves[position] + 1
+                    queue.append(neighbour)
+    return moves
+
+
+def test_distances_match_search(world) -> None:
+    oracle = DistanceOracle(world)
+    for start in range(len(world.locations)):
+        expected = _search(world, start)
+        for end in range(len(world.locations)):
+            assert oracle.distance(start, end) == expected.get(end, UNREACHABLE)
+
+
+def test_first_step_is_on_a_shortest_path(world) -> None:
+    oracle = DistanceOracle(world)
+    cells = _cells(world)
+    for start in range(len(world.locations)):
+        for end in range(len(world.locations)):
+            direction = oracle.first_step(start, end)
+            if start == end or oracle.distance(start, end) == UNREACHABLE:
+                assert direction is None
+                continue
+            _, dx, dy = next(step for step in DIRECTIONS if step[0] == direction)
+            x, y = cells[start]
+            assert oracle.distance(world.position_at(x + dx, y + dy), end) == oracle.distance(start, end) - 1
+
+
+def test_hint_points_to_the_nearest_winning_item(world) -> None:
+    output = []
+    game = Game(world, output.append, oracle=DistanceOracle(world))
+    output.clear()
+    game.step('hint')
+    t_card = world.items[0]
+    assert output[0] == f'Hint: The T-Card is {game.oracle.distance(0, t_card.start_position)} moves away. Head east.'
+    assert game.player.moves == 0
+
+
+def test_hint_only_with_an_oracle(world) -> None:
+    for oracle, offered in ((None, False), (DistanceOracle(world), True)):
+        world.reset()
+        output = []
+        game = Game(world, output.append, oracle=oracle)
+        output.clear()
+        game.step('[menu]')
+        assert ('hint' in output) == offered
+
+
+def test_early_loss_exactly_when_out_of_reach(world) -> None:
+    oracle = DistanceOracle(world)
+    words = vocabulary(world)
+    early = 0
+    for seed in range(200):
+        world.reset()
+        output = []
+        game, rng = Game(world, output.append, allowed_moves=12, oracle=oracle), random.Random(seed)
+        while True:
+            p = game.player
+            position = world.position_at(p.x, p.y)
+            needed = oracle.moves_to_win(game.progress, position)
+            move_cost = p.movement_mod
+            if move_cost > 0.5 and oracle.distance(position, SKATEBOARD_POSITION) != UNREACHABLE:
+                move_cost = 0.5
+            out_of_reach = needed == UNREACHABLE or p.moves + needed * move_cost > game.allowed_moves
+            ended_early = UNWINNABLE_TEXT in output
+            if game.over:
+                assert ended_early == (out_of_reach and not p.victory and p.moves <= game.allowed_moves
+                                       and not game.result().quit)
+                early += ended_early
+                break
+            assert not out_of_reach
+            game.step(next_command(rng, game, words))
+    assert early > 0
+
+
+def _corridor() -> World:
+    """Return a world of 12 locations in a row, with an item at the east end to bring back to the west end, and a
+    location at SKATEBOARD_POSITION that cannot be reached.
+    """
+    width = 12
+    exits = bytearray(width * 3)
+    for x in range(width):
+        exits[x] = (4 if x < width - 1 else 0) | (8 if x > 0 else 0)  # East, West
+    assert SKATEBOARD_POSITION == width
+    rows = [list(range(width)), [-1] * width, [SKATEBOARD_POSITION] + [-1] * (width - 1)]
+    locations = [(position, 0, f'Place {position}.\n', f'You are at place {position}.\n')
+                 for position in range(width + 1)]
+    return World.from_records(rows, bytes(exits), locations, [('Pen', width - 1, 0, 10)], [])
+
+
+def test_unreachable_skateboard_does_not_count() -> None:
+    for allowed_moves, over in ((21, True), (22, False)):  # 11 moves to the pen and 11 back, on foot
+        world, output = _corridor(), []
+        game = Game(world, output.append, allowed_moves=allowed_moves, goals=(0,), oracle=DistanceOracle(world))
+        assert game.over == over
+        assert (UNWINNABLE_TEXT in output) == over
+
+
+def test_no_early_loss_on_the_solution(world, solution) -> None:
+    output = []
+    result = play(world, solution, output.append, oracle=DistanceOracle(world))
+    assert ''.join(output) == SOLUTION_TRANSCRIPT
+    assert result.victory
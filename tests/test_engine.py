@@ -0,0 +1,128 @@
+"""Tests for engine.Game: the turns it plays and what it records about them.
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import ROOT, WORLD_PATHS
+from engine import OTHER_COMMAND, Game, play
+from profiling import Profiler
+from world_cache import parse_world
+
+# What adventure.py printed for solution.txt before the game loop moved into engine.Game
+with open(os.path.join(ROOT, 'tests', 'solution_transcript.txt')) as transcript_file:
+    SOLUTION_TRANSCRIPT = transcript_file.read()
+
+
+def test_solution_replays_baseline_transcript(world, solution) -> None:
+    output = []
+    result = play(world, solution, output.append)
+    assert ''.join(output) == SOLUTION_TRANSCRIPT
+    assert result.victory and not result.quit
+    assert (result.score, result.moves) == (75, 24)
+
+
+@pytest.mark.parametrize('embedded', ['1', '0'])
+def test_adventure_replays_baseline_transcript(embedded) -> None:
+    with open(os.path.join(ROOT, 'solution.txt')) as solution_file:
+        completed = subprocess.run([sys.executable, 'adventure.py'], stdin=solution_file, capture_output=True,
+                                   text=True, cwd=ROOT, env={**os.environ, 'ADVENTURE_EMBEDDED': embedded},
+                                   check=True)
+    assert completed.stdout == SOLUTION_TRANSCRIPT
+
+
+def test_saved_state_plays_on_the_same(solution) -> None:
+    half = len(solution) // 2
+    straight = []
+    game = Game(parse_world(*WORLD_PATHS), straight.append)
+    for command in solution[:half]:
+        game.step(command)
+    state, written = game.save_state(), len(straight)
+    for command in solution[half:]:
+        game.step(command)
+
+    resumed = []
+    restored = Game.from_state(parse_world(*WORLD_PATHS), state, resumed.append)
+    for command in solution[half:]:
+        restored.step(command)
+    assert resumed == straight[written:]
+    assert restored.result().score == game.result().score
+
+
+def test_profiler_records_every_turn(world) -> None:
+    profiler = Profiler()
+    game = Game(world, profiler=profiler)
+    game.step('east')
+    game.step('quit')
+    assert game.over
+    assert profiler.stages['describe'].calls == 2  # the first turn and the one after moving east
+    assert set(profiler.commands) == {'east', 'quit'}
+
+
+def test_profiler_buckets_unknown_commands(world) -> None:
+    profiler = Profiler()
+    game = Game(world, profiler=profiler)
+    for i in range(20):
+        game.step(f'dance {i}')
+    game.step('EAST')
+    game.step('pick up nothing')
+    assert set(profiler.commands) == {OTHER_COMMAND, 'east', 'pick up'}
+    assert profiler.commands[OTHER_COMMAND].calls == 20
+
+
+def _compound(commands: list[str]) -> list[str]:
+    """Return commands with every pick up or drop prompt and its answer joined into one compound command."""
+    joined, answers = [], iter(commands)
+    for command in answers:
+        joined.append(f'{command} {next(answers)}' if command in ('pick up', 'drop') else command)
+    return joined
+
+
+def _state(game: Game) -> tuple:
+    """Return the player's state and where every item of game is."""
+    p = game.player
+    return (p.x, p.y, p.moves, p.score, p.victory, game.over, [item.name for item in p.inventory],
+            [(location.position, [item.name for item in location.location_items])
+             for location in game.world.locations if location.location_items])
+
+
+def _typed(world, commands: list[str]) -> tuple[Game, list[str]]:
+    """Return a game in world with commands typed one at a time, and its output after the first turn."""
+    output = []
+    game = Game(world, output.append)
+    output.clear()
+    for command in commands:
+        game.step(command)
+    return game, output
+
+
+def test_batch_stops_at_the_first_impossible_step() -> None:
+    batch, output = _typed(parse_world(*WORLD_PATHS), ['east; south; north; north; east'])
+    typed, typed_output = _typed(parse_world(*WORLD_PATHS), ['east', 'south', 'north'])
+    assert output[-1] == 'Stopped at step 4 of 5, which is not possible from there: north'
+    assert output[:-1] == typed_output
+    assert _state(batch) == _state(typed)
+
+
+def test_batch_stops_at_a_failed_step() -> None:
+    batch, output = _typed(parse_world(*WORLD_PATHS), ['east; pick up t-card; south'])
+    assert output[-1] == 'Stopped at step 2 of 3: pick up t-card'
+    assert (batch.player.x, batch.player.y, batch.player.moves) == (1, 0, 1)
+
+
+def test_batch_plays_like_its_steps_typed(solution) -> None:
+    steps = _compound(solution)
+    batch, output = _typed(parse_world(*WORLD_PATHS), ['; '.join(steps)])
+    typed, typed_output = _typed(parse_world(*WORLD_PATHS), steps)
+    assert output == typed_output
+    assert _state(batch) == _state(typed)
+    assert batch.player.victory and batch.player.moves == 24
+
+
+def test_compound_commands_match_the_menu_flow(solution) -> None:
+    compound, output = _typed(parse_world(*WORLD_PATHS), _compound(solution))
+    menu, menu_output = _typed(parse_world(*WORLD_PATHS), solution)
+    assert _state(compound) == _state(menu)
+    assert output == [line for line in menu_output if not line.startswith(('You found: ', 'You have: '))]
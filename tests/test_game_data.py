@@ -0,0 +1,21 @@
+"""Tests for game_data.World: loading items, from files and from records.
+"""
+from conftest import WORLD_PATHS
+from game_data import Item, SpecialItem, World
+from world_cache import parse_world
+
+
+def test_key_is_not_replaced_by_a_later_item_of_the_same_name(tmp_path) -> None:
+    items_path = tmp_path / 'items.txt'
+    items_path.write_text('4 14 25 T-Card\n\n0 14 25 Cheat Sheet\nT-Card\nA hint.\n3 14 5 T-Card\nT-Card\nA hint.\n')
+    parsed = parse_world(*WORLD_PATHS[:2], str(items_path))
+
+    built = World.from_records([[0]], bytes(1), [(0, 0, 'A place.\n', 'A place.\n')], [('T-Card', 0, 14, 25)],
+                               [('Cheat Sheet', 0, 14, 25, 'T-Card', 'A hint.\n'),
+                                ('T-Card', 0, 14, 5, 'T-Card', 'A hint.\n')])
+
+    for world in (parsed, built):
+        t_card, cheat_sheet, other = world.items
+        assert type(t_card) is Item and isinstance(cheat_sheet, SpecialItem) and other.name == 'T-Card'
+        assert cheat_sheet.key is t_card and other.key is t_card
+        assert world.item_registry['T-Card'] is other
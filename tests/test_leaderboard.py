@@ -0,0 +1,81 @@
+"""Tests for leaderboard.Leaderboard: runs are written in batches and read back in order, a failing writer thread makes
+flush and close raise instead of hanging, and close closes the read connections of every thread.
+"""
+import sqlite3
+import threading
+
+import pytest
+
+import leaderboard
+from engine import GameResult
+
+
+@pytest.fixture
+def board(tmp_path):
+    """Return a new leaderboard in a scratch database, closed after the test."""
+    board = leaderboard.Leaderboard(str(tmp_path / 'leaderboard.db'))
+    yield board
+    try:
+        board.close()
+    except sqlite3.Error:
+        pass
+
+
+def _result(victory: bool, score: int, minutes_remaining: int = 0) -> GameResult:
+    """Return the result of a finished game."""
+    return GameResult(victory, not victory, score, 10, minutes_remaining, [])
+
+
+def test_runs_are_written_in_batches(board, monkeypatch) -> None:
+    monkeypatch.setattr(leaderboard, 'BATCH_SIZE', 4)
+    blocker = sqlite3.connect(board.path)
+    blocker.execute('BEGIN IMMEDIATE')  # the writer waits for this write lock with whatever it has dequeued
+    for i in range(10):
+        board.record(f'player{i}', 'world', _result(False, i), ended=i)
+    blocker.rollback()
+    blocker.close()
+    board.flush()
+    assert board.recorded == 10 == board.count()
+    assert 3 <= board.batches <= 4  # at most one batch taken before the rest were queued, then batches of 4
+
+
+def test_top_and_history(board) -> None:
+    board.record('ada', 'world', _result(False, 50), ended=1)
+    board.record('ada', 'world', _result(True, 40, 20), ended=2)
+    board.record('bob', 'world', _result(True, 40, 30), ended=3)
+    board.record('bob', 'other world', _result(True, 90), ended=4)
+    board.flush()
+    assert [(run.player, run.ended) for run in board.top('world')] == [('bob', 3), ('ada', 2), ('ada', 1)]
+    assert [run.ended for run in board.top('world', 1)] == [3]
+    assert [run.ended for run in board.history('ada')] == [2, 1]
+    assert [run.world for run in board.history('bob')] == ['other world', 'world']
+
+
+def test_failed_write_is_raised_by_flush_and_close(board) -> None:
+    board.record(None, 'world', _result(True, 10))  # violates NOT NULL, so the writer's batch fails
+    with pytest.raises(sqlite3.IntegrityError):
+        board.flush()
+    board.record('ada', 'world', _result(True, 10))
+    with pytest.raises(sqlite3.IntegrityError):
+        board.flush()  # the writer has stopped: this must not wait for it
+    with pytest.raises(sqlite3.IntegrityError):
+        board.close()
+
+
+def test_close_closes_the_readers_of_every_thread(board) -> None:
+    board.record('ada', 'world', _result(True, 10))
+    board.flush()
+    counts = []
+    threads = [threading.Thread(target=lambda: counts.append(board.count())) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    board.count()
+    assert counts == [1, 1, 1]
+    connections = list(board._reader_connections)
+    assert len(connections) == 4
+    board.close()
+    for connection in connections:
+        with pytest.raises(sqlite3.ProgrammingError):
+            connection.execute('SELECT 1')
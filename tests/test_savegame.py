@@ -0,0 +1,84 @@
+"""Tests for savegame: journaling input and resuming saved games."""
+import io
+
+from game_data import Player
+from savegame import JOURNAL_MAGIC, SavedGame, _varint, read_records
+
+
+def _position(player: Player) -> tuple[int, int]:
+    return player.x, player.y
+
+
+def test_read_records_round_trip() -> None:
+    commands = ['east', 'south', 'pick up t-card', 'é' * 200]
+    data = JOURNAL_MAGIC + b''.join(_varint(len(c.encode())) + c.encode() for c in commands)
+    journal = io.BytesIO(data)
+    journal.seek(len(JOURNAL_MAGIC))
+    assert read_records(journal) == (commands, len(data))
+
+
+def test_read_records_stops_at_a_cut_record() -> None:
+    complete = JOURNAL_MAGIC + _varint(4) + b'east'
+    for partial in (b'\x05so', b'\x85', b'\x05'):
+        journal = io.BytesIO(complete + partial)
+        journal.seek(len(JOURNAL_MAGIC))
+        assert read_records(journal) == (['east'], len(complete))
+
+
+def test_resume_after_a_cut_record_twice(world, tmp_path) -> None:
+    name = str(tmp_path / 'save')
+    saved = SavedGame.open(world, name)
+    for command in ('east', 'south'):
+        saved.step(command)
+    saved._journal.close()  # a crash: no final snapshot
+    with open(name + '.journal', 'ab') as journal:
+        journal.write(b'\x05so')  # a record cut short while it was written
+
+    saved = SavedGame.open(world, name)
+    assert saved.commands == 2
+    assert _position(saved.game.player) == (1, 1)
+    for command in ('south', 'east'):
+        saved.step(command)
+    saved._journal.close()
+    with open(name + '.journal', 'ab') as journal:
+        journal.write(b'\x04we')
+
+    saved = SavedGame.open(world, name)
+    assert saved.commands == 4
+    assert _position(saved.game.player) == (2, 2)
+    with open(name + '.journal', 'rb') as journal:
+        journal.seek(len(JOURNAL_MAGIC))
+        assert read_records(journal)[0] == ['east', 'south', 'south', 'east']
+    saved.close()
+
+    saved = SavedGame.open(world, name)  # from the final snapshot
+    assert saved.commands == 4
+    assert _position(saved.game.player) == (2, 2)
+    saved.discard()
+
+
+def test_close_right_after_resuming_a_cut_record(world, tmp_path) -> None:
+    name = str(tmp_path / 'save')
+    saved = SavedGame.open(world, name)
+    for command in ('east', 'south'):
+        saved.step(command)
+    saved._journal.close()  # a crash in the middle of writing the next record
+    with open(name + '.journal', 'ab') as journal:
+        journal.write(b'\x05so')
+
+    SavedGame.open(world, name).close()  # snapshot at once, before any new command
+    with open(name + '.journal', 'rb') as journal:
+        size = len(journal.read())
+    assert size == len(JOURNAL_MAGIC) + len(_varint(4) + b'east') + len(_varint(5) + b'south')
+
+    saved = SavedGame.open(world, name)
+    assert saved.commands == 2
+    assert _position(saved.game.player) == (1, 1)
+    saved.step('south')
+    saved.close()
+    saved = SavedGame.open(world, name)
+    with open(name + '.journal', 'rb') as journal:
+        journal.seek(len(JOURNAL_MAGIC))
+        assert read_records(journal)[0] == ['east', 'south', 'south']
+    assert _position(saved.game.player) == (1, 2)
+    saved.discard()
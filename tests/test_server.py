@@ -0,0 +1,69 @@
+"""Tests for server.GameServer: games played over a socket, and every game that ends recorded in the leaderboard.
+"""
+import asyncio
+import os
+
+from conftest import ROOT
+from leaderboard import Leaderboard
+from server import IDLE_MESSAGE, GameServer
+from test_engine import SOLUTION_TRANSCRIPT
+
+
+def _serve(world, board, client, idle_timeout: float = 5.0) -> GameServer:
+    """Run client(reader, writer) against a new server for world on a Unix socket, and return the server once the
+    client is done and its session has ended."""
+    server = GameServer(world, idle_timeout=idle_timeout, leaderboard=board, world_digest='campus')
+
+    async def run() -> None:
+        path = os.path.join(os.path.dirname(board.path), 'server.sock')
+        listener = await server.start(unix_path=path)
+        reader, writer = await asyncio.open_unix_connection(path)
+        await client(reader, writer)
+        writer.close()
+        while server.completed_sessions == 0:
+            await asyncio.sleep(0.01)
+        listener.close()
+        await listener.wait_closed()
+
+    asyncio.run(run())
+    board.flush()
+    return server
+
+
+def test_solution_over_a_socket(world, tmp_path) -> None:
+    board = Leaderboard(str(tmp_path / 'leaderboard.db'))
+    received = []
+
+    async def client(reader, writer) -> None:
+        with open(os.path.join(ROOT, 'solution.txt'), 'rb') as solution_file:
+            writer.write(solution_file.read())
+        received.append((await reader.read()).decode('utf-8'))
+
+    _serve(world, board, client)
+    intro_end = SOLUTION_TRANSCRIPT.index('You are in the Bahen Center')  # the server sends no introduction
+    assert received[0].rstrip('\n').endswith(SOLUTION_TRANSCRIPT[intro_end:].rstrip('\n'))
+    runs = board.top('campus')
+    assert len(runs) == 1 and runs[0].victory and runs[0].score == 75
+    board.close()
+
+
+def test_disconnected_and_idle_games_are_recorded(world, tmp_path) -> None:
+    board = Leaderboard(str(tmp_path / 'leaderboard.db'))
+
+    async def disconnect(reader, writer) -> None:
+        writer.write(b'east\n')
+        writer.write_eof()  # the server reads east, then sees the connection closed
+        await reader.read()
+
+    async def idle(reader, writer) -> None:
+        writer.write(b'east\nsouth\n')
+        await writer.drain()
+        assert (await reader.read()).decode('utf-8').endswith(IDLE_MESSAGE)
+
+    _serve(world, board, disconnect)
+    server = _serve(world, board, idle, idle_timeout=0.2)
+    assert server.evicted_sessions == 1
+    runs = board.history('local')
+    assert len(runs) == 2 and all(run.quit and not run.victory for run in runs)
+    assert sorted(run.moves for run in runs) == [1, 2]
+    board.close()
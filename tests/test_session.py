@@ -0,0 +1,80 @@
+"""Tests for session.WorldOverlay: games played in overlays of one shared world never see each other's changes, and
+never change the shared world.
+"""
+import random
+
+import pytest
+
+import worldgen
+from engine import Game
+from fuzzer import next_command, vocabulary
+from game_data import SpecialItem
+from session import WorldOverlay
+from world_cache import parse_world
+
+
+@pytest.fixture
+def paths(tmp_path):
+    """Return the paths of a generated campus with locked items."""
+    return worldgen.generate(str(tmp_path), 12, 12, 8, 4, seed=3)
+
+
+def _world_state(world) -> tuple:
+    """Return where every item of world is, which locations are visited and which SpecialItems are unlocked."""
+    return ([(location.visited, [item.name for item in location.location_items]) for location in world.locations],
+            [item.status for item in world.items if isinstance(item, SpecialItem)])
+
+
+def _play(world, seed: int, words: list[str]) -> list[str]:
+    """Return the output of a random game played in world."""
+    output = []
+    game, rng = Game(world, output.append, allowed_moves=60), random.Random(seed)
+    while not game.over:
+        game.step(next_command(rng, game, words))
+    return output
+
+
+def test_interleaved_sessions_are_isolated(paths) -> None:
+    template = parse_world(*paths)
+    untouched = _world_state(template)
+    words = vocabulary(template)
+    alone = [_play(parse_world(*paths), seed, words) for seed in range(4)]
+
+    sessions = [WorldOverlay(template) for _ in range(4)]
+    outputs = [[] for _ in sessions]
+    games = [Game(session, output.append, allowed_moves=60) for session, output in zip(sessions, outputs)]
+    rngs = [random.Random(seed) for seed in range(4)]
+    while not all(game.over for game in games):
+        for game, rng in zip(games, rngs):  # one turn of each session in turn
+            if not game.over:
+                game.step(next_command(rng, game, words))
+
+    assert outputs == alone
+    assert _world_state(template) == untouched
+
+
+def test_item_changes_stay_in_their_session(paths) -> None:
+    template = parse_world(*paths)
+    untouched = _world_state(template)
+    first, second = WorldOverlay(template), WorldOverlay(template)
+    special = next(i for i, item in enumerate(template.items) if isinstance(item, SpecialItem))
+    item = first.items[special]
+    first.location_at(item.start_position).location_items.remove(item)
+    first.location_at(0).location_items.add(item)
+    item.status = True
+    first.location_at(0).visited = True
+
+    assert item in first.location_at(0).location_items and first.items[special].status
+    assert first.items[special].key is first.items[template.items.index(template.items[special].key)]
+    assert _world_state(second) == untouched
+    assert _world_state(template) == untouched
+
+
+def test_reset_starts_from_the_template(paths) -> None:
+    template = parse_world(*paths)
+    words = vocabulary(template)
+    session = WorldOverlay(template)
+    first = _play(session, 1, words)
+    session.reset()
+    assert _world_state(session) == _world_state(template)
+    assert _play(session, 1, words) == first
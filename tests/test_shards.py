@@ -0,0 +1,145 @@
+"""Tests for shards.ShardedWorld: it matches the world it was built from, keeps what the game changed about locations
+whose shards were evicted while holding only a bounded number of shards, survives a failing prefetch thread and drops
+what it prefetched when reset.
+"""
+import random
+import threading
+
+import pytest
+
+import shards
+import worldgen
+from engine import Game
+from fuzzer import next_command, vocabulary
+from world_cache import parse_world
+
+
+@pytest.fixture
+def paths(tmp_path):
+    """Return the paths of a generated 40 x 40 campus."""
+    return worldgen.generate(str(tmp_path), 40, 40, 30, 3, seed=7)
+
+
+def _positions(world) -> list[int]:
+    """Return the position of every location of world, in map order."""
+    return [position for row in world.map for position in row if position != -1]
+
+
+def test_matches_parsed_world(paths) -> None:
+    parsed = parse_world(*paths)
+    world = shards.load_sharded_world(*paths, shard_size=8, max_shards=4, prefetch=False)
+    try:
+        assert [list(row) for row in world.map] == [list(row) for row in parsed.map]
+        assert all(world.exits_at(x, y) == parsed.exits_at(x, y)
+                   for y in range(parsed.height) for x in range(parsed.width) if parsed.position_at(x, y) != -1)
+        for position in _positions(parsed):
+            location, expected = world.location_at(position), parsed.location_at(position)
+            assert location.brief_description == expected.brief_description
+            assert location.long_description == expected.long_description
+            assert location.visit_points == expected.visit_points
+            assert [item.name for item in location.location_items] == \
+                [item.name for item in expected.location_items]
+        assert world.resident_shards <= 4
+    finally:
+        world.close()
+
+
+def test_changes_survive_eviction(paths) -> None:
+    world = shards.load_sharded_world(*paths, shard_size=4, max_shards=2, prefetch=False)
+    try:
+        positions = _positions(world)
+        first, last = positions[0], positions[-1]
+        item = world.items[0]
+        world.location_at(item.start_position).location_items.remove(item)
+        world.location_at(first).location_items.add(item)
+        world.location_at(first).visited = True
+
+        for position in positions:  # every other shard passes through memory, so first's shard is evicted
+            world.location_at(position)
+        assert world.evictions > 0 and world.resident_shards == 2
+        assert world.location_at(last) is world.location_at(last)
+
+        assert world.location_at(first).visited
+        assert item in world.location_at(first).location_items
+        assert item not in world.location_at(item.start_position).location_items
+        assert not world.location_at(positions[1]).visited
+
+        world.reset()
+        assert not world.location_at(first).visited
+        assert item in world.location_at(item.start_position).location_items
+    finally:
+        world.close()
+
+
+def test_plays_like_parsed_world(paths) -> None:
+    parsed = parse_world(*paths)
+    words = vocabulary(parsed)
+    world = shards.load_sharded_world(*paths, shard_size=4, max_shards=3)
+    try:
+        for seed in range(5):
+            transcripts = []
+            for w in (parsed, world):
+                w.reset()
+                rng, output = random.Random(seed), []
+                game = Game(w, output.append, allowed_moves=200)
+                while not game.over:
+                    game.step(next_command(rng, game, words))
+                transcripts.append(output)
+            assert transcripts[0] == transcripts[1]
+    finally:
+        world.close()
+
+
+def test_failed_prefetch_is_read_by_the_game(paths, monkeypatch) -> None:
+    read = shards.ShardedWorld._read
+
+    def read_or_fail(world, shard_id):
+        if threading.current_thread().name == 'shard-prefetch':
+            raise OSError('failed to read shard')
+        return read(world, shard_id)
+
+    monkeypatch.setattr(shards.ShardedWorld, '_read', read_or_fail)
+    world = shards.load_sharded_world(*paths, shard_size=4, max_shards=4)
+    try:
+        for x in range(world.width):
+            world.get_location(x, 0)
+        for x in range(world.width):
+            world.get_location(x, 20)
+        world.close()
+        assert world.prefetch_errors > 0 and world.prefetched == 0
+    finally:
+        world.close()
+
+
+def test_stopped_prefetch_thread_is_not_waited_on(paths, monkeypatch) -> None:
+    monkeypatch.setattr(shards, 'PREFETCH_TIMEOUT', 0.01)
+    world = shards.load_sharded_world(*paths, shard_size=4, max_shards=4)
+    try:
+        world._queue.put(-1)
+        world._thread.join()
+        world._reading = 3  # as if the thread had stopped in the middle of reading shard 3
+        assert world.position_at(12, 0) == world._read(3).cells[0]
+    finally:
+        world.close()
+
+
+def test_shard_read_during_a_reset_is_dropped(paths, monkeypatch) -> None:
+    read, reading, resume = shards.ShardedWorld._read, threading.Event(), threading.Event()
+
+    def read_slowly(world, shard_id):
+        if threading.current_thread().name == 'shard-prefetch':
+            reading.set()
+            resume.wait(5)
+        return read(world, shard_id)
+
+    monkeypatch.setattr(shards.ShardedWorld, '_read', read_slowly)
+    world = shards.load_sharded_world(*paths, shard_size=4, max_shards=16)
+    try:
+        world.get_location(0, 0)
+        assert reading.wait(5)
+        world.reset()
+        resume.set()
+        world.close()
+        assert world.resident_shards == 0 and world.prefetched == 0
+    finally:
+        world.close()
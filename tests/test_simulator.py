@@ -0,0 +1,66 @@
+"""Tests for simulator.simulate: the array simulation follows the same rules as the game itself
+(simulator.scalar_simulate), agent by agent.
+"""
+import random
+
+import numpy as np
+import pytest
+
+import simulator
+import worldgen
+from distances import DistanceOracle
+from world_cache import parse_world
+
+
+class _Script:
+    """The random numbers of one agent's moves, served to both simulations: to simulate as
+    np.random.Generator.random and to scalar_simulate as random.Random.choice.
+    """
+
+    def __init__(self, values: list[float]) -> None:
+        self._values = iter(values)
+
+    def random(self, n: int, dtype=np.float64) -> np.ndarray:
+        return np.array([next(self._values) for _ in range(n)], dtype=dtype)
+
+    def choice(self, options):
+        return options[int(next(self._values) * len(options))]
+
+
+def _scripts(seed: int, agents: int, length: int = 1000) -> list[list[float]]:
+    """Return the random numbers of agents agents, chosen so that scaling them by 1 to 4 exits never rounds
+    differently in 32 and 64 bits."""
+    rng = random.Random(seed)
+    return [[(rng.randrange(12) + 0.5) / 12 for _ in range(length)] for _ in range(agents)]
+
+
+def _both(world, compiled, values: list[float], monkeypatch, allowed_moves: float,
+          oracle=None) -> tuple:
+    """Return (won, score, moves remaining) of one agent moving by values, in simulate (with compiled, pruning if
+    oracle is given) and in scalar_simulate."""
+    monkeypatch.setattr(np.random, 'default_rng', lambda seed=None: _Script(values))
+    fast = simulator.simulate(world, 1, allowed_moves=allowed_moves, compiled=compiled, prune=oracle is not None)
+    monkeypatch.setattr(simulator.random, 'Random', lambda seed=None: _Script(values))
+    slow = simulator.scalar_simulate(world, 1, allowed_moves=allowed_moves, oracle=oracle)
+    return ((bool(fast.won[0]), int(fast.score[0]), float(fast.moves_remaining[0])),
+            (bool(slow.won[0]), int(slow.score[0]), float(slow.moves_remaining[0])))
+
+
+@pytest.mark.parametrize('prune', [False, True])
+def test_simulate_matches_scalar_simulate(world, monkeypatch, prune) -> None:
+    oracle = DistanceOracle(world) if prune else None
+    compiled = simulator.SimulationWorld(world, oracle=oracle)
+    outcomes = []
+    for values in _scripts(0, 60):
+        fast, slow = _both(world, compiled, values, monkeypatch, 150, oracle)
+        assert fast == slow
+        outcomes.append(fast[0])
+    assert any(outcomes) and not all(outcomes)
+
+
+def test_simulate_matches_scalar_simulate_with_locked_items(tmp_path, monkeypatch) -> None:
+    world = parse_world(*worldgen.generate(str(tmp_path), 8, 8, 4, 2, seed=2))
+    compiled = simulator.SimulationWorld(world)
+    for values in _scripts(1, 40):
+        fast, slow = _both(world, compiled, values, monkeypatch, 150)
+        assert fast == slow
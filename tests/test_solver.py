@@ -0,0 +1,51 @@
+"""Tests for solver.solve: its routes win the game in the moves it says they take, and bad worlds are rejected.
+"""
+import pytest
+
+import worldgen
+from distances import DistanceOracle
+from engine import Game
+from solver import solve
+from world_cache import parse_world
+
+
+def _replay(world, commands: list[str], allowed_moves: int = 30) -> Game:
+    """Return a game of world with commands played."""
+    game = Game(world, allowed_moves=allowed_moves)
+    for command in commands:
+        assert not game.over
+        game.step(command)
+    return game
+
+
+@pytest.mark.parametrize('use_oracle', [False, True])
+def test_route_replays_to_victory(world, use_oracle) -> None:
+    result = solve(world, oracle=DistanceOracle(world) if use_oracle else None)
+    assert result.moves == 15.5
+    game = _replay(world, result.commands)
+    assert game.over and game.player.victory
+    assert game.player.moves == result.moves
+
+
+def test_generated_routes_replay_to_victory(tmp_path) -> None:
+    for seed in (1, 2):  # small campuses with a locked item, solved in well under a second
+        paths = worldgen.generate(str(tmp_path / str(seed)), 8, 8, 4, 1, seed=seed)
+        result = solve(parse_world(*paths), allowed_moves=60)
+        game = _replay(parse_world(*paths), result.commands, allowed_moves=60)
+        assert game.player.victory and game.player.moves == result.moves
+
+
+def test_no_route_in_too_few_moves(world) -> None:
+    result = solve(world, allowed_moves=15)
+    assert result.commands is None and result.moves is None
+
+
+def test_item_off_the_map_is_rejected(world) -> None:
+    world.items[0].start_position = len(world.locations) + 5
+    with pytest.raises(ValueError):
+        solve(world)
+
+
+def test_start_off_the_map_is_rejected(world) -> None:
+    with pytest.raises(ValueError):
+        solve(world, start=(4, 0))
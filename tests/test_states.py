@@ -0,0 +1,43 @@
+"""Tests for game_data.StateTracker and states.StateStore: the Zobrist hash follows the state as the game is played,
+and a store keeps each distinct state once.
+"""
+import random
+
+from engine import Game
+from fuzzer import next_command, vocabulary
+from session import WorldOverlay
+from states import StateStore
+
+
+def test_hash_follows_the_game(world) -> None:
+    words = vocabulary(world)
+    for seed in range(20):
+        game = Game(WorldOverlay(world), track_state=True)
+        tracker, rng = game.player.tracker, random.Random(seed)
+        while not game.over:
+            game.step(next_command(rng, game, words))
+            assert tracker.hash == tracker.full_hash()
+
+
+def test_restored_game_has_the_same_state(world, solution) -> None:
+    game = Game(WorldOverlay(world), track_state=True)
+    for command in solution[:10]:
+        game.step(command)
+    restored = Game.from_state(WorldOverlay(world), game.save_state(), track_state=True)
+    assert restored.player.tracker.encode() == game.player.tracker.encode()
+    assert restored.player.tracker.hash == game.player.tracker.hash
+
+
+def test_store_keeps_each_state_once(world) -> None:
+    store = StateStore()
+    game = Game(WorldOverlay(world), track_state=True)
+    tracker = game.player.tracker
+    start_id, new = store.add(tracker)
+    assert new and tracker in store
+    game.step('east')
+    assert tracker not in store
+    east_id, new = store.add(tracker)
+    assert new and east_id != start_id
+    assert store.add(tracker) == (east_id, False)
+    assert len(store) == 2 and store.added == 3 and store.collisions == 0
+    assert store.encoding(east_id) == tracker.encode()
@@ -0,0 +1,41 @@
+"""Tests for world_cache: compiled snapshots of the world."""
+import os
+import shutil
+
+from conftest import WORLD_PATHS
+from world_cache import SNAPSHOT_NAME, load_world, parse_world
+
+
+def _copy_world(directory) -> None:
+    os.makedirs(directory)
+    for path in WORLD_PATHS:
+        shutil.copy(path, directory)
+
+
+def test_snapshot_reused_from_another_directory(tmp_path, monkeypatch) -> None:
+    world_dir = tmp_path / 'world'
+    _copy_world(world_dir)
+    monkeypatch.chdir(world_dir)
+    written = load_world('map.txt', 'locations.txt', 'items.txt')
+    assert os.path.exists(world_dir / SNAPSHOT_NAME)
+
+    elsewhere = tmp_path / 'elsewhere'
+    elsewhere.mkdir()
+    monkeypatch.chdir(elsewhere)
+    paths = [str(world_dir / name) for name in ('map.txt', 'locations.txt', 'items.txt')]
+    loaded = load_world(*paths)
+    for before, after in zip(written.locations, loaded.locations):
+        assert after.brief_description == before.brief_description
+        assert after.long_description == before.long_description
+
+
+def test_snapshot_matches_parsed_world(tmp_path, monkeypatch) -> None:
+    _copy_world(tmp_path / 'world')
+    monkeypatch.chdir(tmp_path / 'world')
+    load_world()  # writes the snapshot
+    cached = load_world()  # reads it back
+    parsed = parse_world('map.txt', 'locations.txt', 'items.txt')
+    assert cached.map == parsed.map and cached.exits == parsed.exits
+    assert [item.name for item in cached.items] == [item.name for item in parsed.items]
+    assert [location.long_description for location in cached.locations] == \
+        [location.long_description for location in parsed.locations]
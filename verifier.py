@@ -0,0 +1,276 @@
+"""CSC111 Project 1: Text Adventure Game Transcript Verifier
+
+Module Description
+==================
+
+Grades a batch of command transcripts (files like solution.txt, one line of input per line) against one world.
+Every transcript is played from the start in its own session.WorldOverlay, with the same rules as run_solution.py,
+and its outcome is recorded: victory, score, moves and where every item ended up.
+
+Transcripts are spread over a pool of worker processes, each of which loads the world once when it starts.
+Outcomes are cached in a file next to the world (see CACHE_NAME), keyed by a hash of the contents of the three
+world files and of the transcript, so a transcript that has not changed is never played again against a world
+that has not changed.
+
+The report lists the transcripts sorted by name and does not depend on the number of workers, the order in which
+they finished or which outcomes came from the cache, so two reports can be diffed. Throughput is printed to stderr.
+
+    python verifier.py solution.txt submissions/
+    python verifier.py --world big_map.txt big_locations.txt big_items.txt --jobs 8 transcripts/
+    python verifier.py --no-cache --output report.json transcripts/
+
+Copyright and Usage Information
+===============================
+
+This file is provided solely for the personal and private use of students
+taking CSC111 at the University of Toronto St. George campus. All forms of
+distribution of this code, whether as given or with any changes, are
+expressly prohibited. For more information on copyright for CSC111 materials,
+please consult our Course Syllabus.
+
+This file is Copyright (c) 2024 CSC111 Teaching Team
+"""
+import hashlib
+import multiprocessing
+import os
+import time
+from typing import Iterable, Optional
+
+from engine import Game
+from game_data import CARRIED, World
+from session import WorldOverlay
+from world_cache import load_world, read_snapshot, world_digest, write_snapshot
+
+CACHE_NAME = 'world.verified'
+# Bump this whenever the rules of the game change so that cached outcomes are played again
+VERIFIER_VERSION = 1
+# Transcripts handed to a worker at a time
+CHUNK_SIZE = 16
+
+
+class Verification:
+    """The outcome of playing one transcript.
+
+    Instance Attributes:
+        - name: the name of the transcript (its path)
+        - victory: True if the transcript wins the game
+        - quit: True if the game ended because the player quit or the transcript ran out
+        - score: the player's final score
+        - moves: the number of moves the transcript used
+        - commands: the number of lines of input the game read before it ended
+        - placement: the name of every item of the world, in the world's order, with the position of the location it
+        ended up at (CARRIED if it ended up in the player's inventory)
+        - cached: True if this outcome was read from the cache (or taken from an identical transcript of the same
+        batch) instead of being played
+
+    Representation Invariants:
+        - not (self.victory and self.quit)
+        - self.moves >= 0 and self.commands >= 0
+    """
+    name: str
+    victory: bool
+    quit: bool
+    score: int
+    moves: float
+    commands: int
+    placement: tuple[tuple[str, int], ...]
+    cached: bool
+
+    def __init__(self, name: str, outcome: tuple, cached: bool = False) -> None:
+        """Initialize the verification of the transcript called name from outcome, a tuple as returned by
+        play_transcript.
+        """
+        self.name = name
+        self.victory, self.quit, self.score, self.moves, self.commands, self.placement = outcome
+        self.cached = cached
+
+    def as_dict(self) -> dict:
+        """Return this verification as a JSON-compatible dictionary.
+        """
+        return {
+            'name': self.name,
+            'victory': self.victory,
+            'quit': self.quit,
+            'score': self.score,
+            'moves': self.moves,
+            'commands': self.commands,
+            'placement': {name: 'inventory' if position == CARRIED else position
+                          for name, position in self.placement},
+        }
+
+    def summary(self) -> str:
+        """Return a one-line report of this verification.
+        """
+        status = 'WON' if self.victory else 'QUIT' if self.quit else 'LOST'
+        items = ', '.join(f'{name}@{"inventory" if position == CARRIED else position}'
+                          for name, position in self.placement)
+        return f'{self.name}: {status} score={self.score} moves={self.moves:g} commands={self.commands} [{items}]'
+
+
+def world_hash(map_path: str, locations_path: str, items_path: str) -> bytes:
+    """Return a digest of the contents of the three world files and of the version of the verifier.
+    """
+    contents = world_digest(map_path, locations_path, items_path)
+    return hashlib.sha256(f'verifier {VERIFIER_VERSION} {contents}'.encode('utf-8')).digest()
+
+
+def transcript_key(world_digest: bytes, transcript: bytes) -> str:
+    """Return the cache key of the transcript (the raw contents of a transcript file) played in the world whose
+    files hash to world_digest.
+    """
+    return hashlib.sha256(world_digest + transcript).hexdigest()
+
+
+def play_transcript(world: World, transcript: bytes) -> tuple:
+    """Play the transcript (the raw contents of a transcript file) in a fresh session of world and return its
+    outcome: (victory, quit, score, moves, commands, placement), as described in Verification.
+
+    world is only read.
+    """
+    session = WorldOverlay(world)
+    game = Game(session)
+    for command in transcript.decode('utf-8').splitlines():
+        if game.over:
+            break
+        game.step(command)
+    game.abandon()
+
+    # Items only move between the player's inventory and locations the session has looked up
+    places = {id(item): item.start_position for item in session.items}
+    for location in session.touched_locations():
+        for item in location.location_items:
+            places[id(item)] = location.position
+    for item in game.player.inventory:
+        places[id(item)] = CARRIED
+
+    result = game.result()
+    placement = tuple((item.name, places[id(item)]) for item in session.items)
+    return result.victory, result.quit, result.score, result.moves, len(result.transcript), placement
+
+
+# The world loaded by this worker process (see _start_worker), or by the main process when there is one worker
+_worker_world: Optional[World] = None
+
+
+def _start_worker(paths: tuple[str, str, str]) -> None:
+    """Load the world of paths once for every transcript this worker process will play.
+    """
+    global _worker_world
+    _worker_world = load_world(*paths)
+
+
+def _play_job(job: tuple[int, bytes]) -> tuple[int, tuple]:
+    """Play the transcript of job, (index, transcript), in this worker's world and return (index, outcome).
+    """
+    index, transcript = job
+    return index, play_transcript(_worker_world, transcript)
+
+
+def verify(transcripts: dict[str, bytes], paths: tuple[str, str, str] = ('map.txt', 'locations.txt', 'items.txt'),
+           jobs: Optional[int] = None, use_cache: bool = True) -> list[Verification]:
+    """Return the verification of every transcript of transcripts (the raw contents of each transcript by name),
+    played in the world stored in paths, sorted by name.
+
+    Transcripts with no cached outcome are played by a pool of jobs worker processes (os.cpu_count() if jobs is
+    None); with jobs == 1, they are played in this process. Unless use_cache is False, outcomes are read from and
+    added to the cache file next to the world's map.
+    """
+    digest = world_hash(*paths)
+    cache_path = os.path.join(os.path.dirname(os.path.abspath(paths[0])), CACHE_NAME)
+    cache = (read_snapshot(cache_path, (VERIFIER_VERSION,)) if use_cache else None) or {}
+
+    names = sorted(transcripts)
+    keys = [transcript_key(digest, transcripts[name]) for name in names]
+    verifications: list[Optional[Verification]] = [None] * len(names)
+    todo = {}  # the index of the first transcript with each key that is not cached
+    for i, key in enumerate(keys):
+        if key in cache:
+            verifications[i] = Verification(names[i], cache[key], cached=True)
+        elif key not in todo:
+            todo[key] = i
+
+    jobs = jobs if jobs is not None else os.cpu_count() or 1
+    work = [(i, transcripts[names[i]]) for i in todo.values()]
+    if jobs == 1 or len(work) <= 1:
+        if work:
+            _start_worker(paths)
+        outcomes = dict(_play_job(job) for job in work)
+    else:
+        with multiprocessing.Pool(min(jobs, len(work)), _start_worker, (paths,)) as pool:
+            outcomes = dict(pool.imap_unordered(_play_job, work, CHUNK_SIZE))
+
+    for key, i in todo.items():
+        cache[key] = outcomes[i]
+    for i, key in enumerate(keys):
+        if verifications[i] is None:
+            verifications[i] = Verification(names[i], cache[key], cached=todo[key] != i)
+
+    if use_cache and todo:
+        try:
+            write_snapshot(cache_path, (VERIFIER_VERSION,), cache)
+        except OSError:
+            pass  # a read-only directory only costs us the cache
+    return verifications
+
+
+def read_transcripts(paths: Iterable[str]) -> dict[str, bytes]:
+    """Return the raw contents of every transcript file in paths by path, reading every .txt file of any directory
+    among them (recursively).
+    """
+    transcripts = {}
+    for path in paths:
+        if os.path.isdir(path):
+            for directory, _, files in os.walk(path):
+                for file_name in files:
+                    if file_name.endswith('.txt'):
+                        full_path = os.path.join(directory, file_name)
+                        with open(full_path, 'rb') as transcript_file:
+                            transcripts[full_path] = transcript_file.read()
+        else:
+            with open(path, 'rb') as transcript_file:
+                transcripts[path] = transcript_file.read()
+    return transcripts
+
+
+def report(verifications: list[Verification]) -> str:
+    """Return the report of verifications: one line per transcript, then the totals.
+    """
+    lines = [verification.summary() for verification in verifications]
+    won = [verification for verification in verifications if verification.victory]
+    lines.append(f'{len(verifications)} transcripts, {len(won)} won, '
+                 f'{len(verifications) - len(won)} not won')
+    if won:
+        lines.append(f'winners: best score {max(v.score for v in won)}, '
+                     f'fewest moves {min(v.moves for v in won):g}')
+    return '\n'.join(lines)
+
+
+if __name__ == '__main__':
+    import argparse
+    import json
+    import sys
+
+    parser = argparse.ArgumentParser(description='Verify command transcripts against a text adventure world.')
+    parser.add_argument('transcripts', nargs='+', help='transcript files, or directories of .txt transcripts')
+    parser.add_argument('--world', nargs=3, default=['map.txt', 'locations.txt', 'items.txt'],
+                        metavar=('MAP', 'LOCATIONS', 'ITEMS'))
+    parser.add_argument('--jobs', type=int, default=None, help='worker processes (default: one per core)')
+    parser.add_argument('--no-cache', action='store_true', help='play every transcript, and do not cache outcomes')
+    parser.add_argument('--output', default=None, help='also write the report to this JSON file')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    all_transcripts = read_transcripts(args.transcripts)
+    results = verify(all_transcripts, tuple(args.world), args.jobs, not args.no_cache)
+    elapsed = time.perf_counter() - start
+
+    print(report(results))
+    if args.output is not None:
+        with open(args.output, 'w') as output_file:
+            json.dump([verification.as_dict() for verification in results], output_file, indent=2)
+
+    played = [verification for verification in results if not verification.cached]
+    commands = sum(verification.commands for verification in played)
+    print(f'{len(results)} transcripts in {elapsed:.3f} s ({len(results) / elapsed:,.0f} transcripts/s): '
+          f'{len(played)} played ({commands:,} commands, {commands / elapsed:,.0f} commands/s), '
+          f'{len(results) - len(played)} from the cache', file=sys.stderr)
@@ -0,0 +1,178 @@
+"""CSC111 Project 1: Text Adventure Game World Snapshots
+
+Module Description
+==================
+
+Parsing map.txt, locations.txt and items.txt line by line dominates start-up for large worlds. This module keeps a
+compiled snapshot of the loaded World (map, locations, items and the keys of the special items) in a single binary
+file next to the source files. The snapshot is rebuilt whenever one of the source files changes (by size or
+modification time) and is otherwise loaded back with one bulk read.
+
+The world's DistanceOracle is cached the same way, in its own file next to the snapshot (see load_distances).
+
+Run this module to report cold (parse and write snapshot) and warm (load snapshot) start-up times.
+
+Copyright and Usage Information
+===============================
+
+This file is provided solely for the personal and private use of students
+taking CSC111 at the University of Toronto St. George campus. All forms of
+distribution of this code, whether as given or with any changes, are
+expressly prohibited. For more information on copyright for CSC111 materials,
+please consult our Course Syllabus.
+
+This file is Copyright (c) 2024 CSC111 Teaching Team
+"""
+import os
+import pickle
+import time
+from typing import Any, Optional
+
+from distances import ALL_PAIRS_LIMIT, DistanceOracle
+from game_data import World
+
+SNAPSHOT_NAME = 'world.snapshot'
+DISTANCES_NAME = 'world.distances'
+# Bump this whenever the attributes of World, Location or Item change so that old snapshots are rebuilt
+SNAPSHOT_VERSION = 8
+
+
+def source_key(map_path: str, locations_path: str, items_path: str, compact: bool = False) -> tuple:
+    """Return a key identifying the current contents of the three world files, made from their sizes and
+    modification times, and whether the world is compact.
+    """
+    key = [SNAPSHOT_VERSION, compact]
+    for path in (map_path, locations_path, items_path):
+        stat = os.stat(path)
+        key.extend([os.path.abspath(path), stat.st_size, stat.st_mtime_ns])
+    return tuple(key)
+
+
+def world_digest(map_path: str, locations_path: str, items_path: str) -> str:
+    """Return a hex digest of the contents of the three world files, which (unlike source_key) is the same for
+    copies of the same world anywhere.
+    """
+    import hashlib  # deferred, as loading OpenSSL is slow and only the leaderboard and verifier need digests
+    digest = hashlib.sha256()
+    for path in (map_path, locations_path, items_path):
+        with open(path, 'rb') as world_file:
+            data = world_file.read()
+        digest.update(len(data).to_bytes(8, 'little'))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+def snapshot_path(map_path: str) -> str:
+    """Return the path of the snapshot for the world whose map is stored at map_path.
+    """
+    return os.path.join(os.path.dirname(os.path.abspath(map_path)), SNAPSHOT_NAME)
+
+
+def parse_world(map_path: str, locations_path: str, items_path: str, compact: bool = False) -> World:
+    """Return a new World parsed from the given map, locations and items files.
+    """
+    with (open(map_path) as map_file, open(locations_path, encoding='utf-8') as locations_file,
+          open(items_path) as items_file):
+        return World(map_file, locations_file, items_file, compact)
+
+
+def read_snapshot(path: str, key: tuple) -> Optional[Any]:
+    """Return the World (or other object compiled from the world files, such as a DistanceOracle) stored in the
+    snapshot at path, or None if there is no snapshot, it cannot be read or it was compiled from files other than
+    the ones identified by key.
+    """
+    try:
+        with open(path, 'rb') as snapshot_file:
+            data = snapshot_file.read()
+        snapshot_key, world = pickle.loads(data)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ValueError, TypeError):
+        return None
+
+    if snapshot_key != key:
+        return None
+    return world
+
+
+def write_snapshot(path: str, key: tuple, world: Any) -> None:
+    """Compile world (or another object compiled from the world files) into a snapshot at path, tagged with key.
+
+    The snapshot is written to a temporary file first and then moved into place, so a reader never sees a
+    half-written snapshot.
+    """
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    with open(temp_path, 'wb') as snapshot_file:
+        snapshot_file.write(pickle.dumps((key, world), protocol=pickle.HIGHEST_PROTOCOL))
+    os.replace(temp_path, path)
+
+
+def load_world(map_path: str = 'map.txt', locations_path: str = 'locations.txt', items_path: str = 'items.txt',
+               use_snapshot: bool = True, compact: bool = False) -> World:
+    """Return the World stored in the given files, loading it from its snapshot when the snapshot is up to date
+    and otherwise parsing the files and (re)writing the snapshot.
+
+    If use_snapshot is False, the files are always parsed and no snapshot is read or written. If compact is True,
+    the world stores its map as a flat Grid (see World).
+    """
+    if not use_snapshot:
+        return parse_world(map_path, locations_path, items_path, compact)
+
+    key = source_key(map_path, locations_path, items_path, compact)
+    path = snapshot_path(map_path)
+    world = read_snapshot(path, key)
+
+    if world is None:
+        world = parse_world(map_path, locations_path, items_path, compact)
+        try:
+            write_snapshot(path, key, world)
+        except OSError:
+            pass  # a read-only directory only costs us the speed-up
+
+    return world
+
+
+def load_distances(world: World, map_path: str = 'map.txt', locations_path: str = 'locations.txt',
+                   items_path: str = 'items.txt') -> DistanceOracle:
+    """Return the DistanceOracle of world, which was loaded from the given files, loading it from its cache file
+    when the cache is up to date and otherwise computing it (every row, for worlds of up to ALL_PAIRS_LIMIT
+    locations) and (re)writing the cache.
+    """
+    key = source_key(map_path, locations_path, items_path)
+    path = os.path.join(os.path.dirname(os.path.abspath(map_path)), DISTANCES_NAME)
+    oracle = read_snapshot(path, key)
+
+    if oracle is None:
+        oracle = DistanceOracle(world)
+        if oracle.num_positions <= ALL_PAIRS_LIMIT:
+            oracle.complete()
+        try:
+            write_snapshot(path, key, oracle)
+        except OSError:
+            pass
+
+    return oracle
+
+
+if __name__ == '__main__':
+    import sys
+
+    paths = sys.argv[1:4] if len(sys.argv) >= 4 else ['map.txt', 'locations.txt', 'items.txt']
+    snapshot = snapshot_path(paths[0])
+    if os.path.exists(snapshot):
+        os.remove(snapshot)
+
+    start = time.perf_counter()
+    parse_world(*paths)
+    parse_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    load_world(*paths)
+    cold_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    load_world(*paths)
+    warm_time = time.perf_counter() - start
+
+    print(f'parse only:              {parse_time * 1000:.3f} ms')
+    print(f'cold (parse + snapshot): {cold_time * 1000:.3f} ms')
+    print(f'warm (snapshot):         {warm_time * 1000:.3f} ms')
+    print(f'snapshot size:           {os.path.getsize(snapshot)} bytes')
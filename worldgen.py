@@ -0,0 +1,175 @@
+"""CSC111 Project 1: Text Adventure Game World Generator
+
+Module Description
+==================
+
+Generates campuses of any size in the exact formats World.load_map, World.load_locations and World.load_items
+read, for load testing. Generation is seeded and deterministic, and every file is streamed to disk a row (or a
+record) at a time, so even gigabyte-scale worlds are generated in constant memory.
+
+The map is always connected: every even row is a street with no gaps, and every odd row has a gap-free crossing at
+a random column, while each of its other cells is open with probability density. Locations are numbered in row
+order, except that the cell of the Exam Centre (EXAM_X, EXAM_Y) always gets EXAM_POSITION (swapping numbers with
+the cell that would have had it), which is where the game expects the Exam Centre to be. The player's start (0, 0)
+is always walkable too.
+
+Items come in two groups, as in items.txt: normal items, then after a blank line SpecialItems, each followed by
+the name of its key (an earlier item) and its hint. The first `winning` normal items and every SpecialItem must
+be brought to the Exam Centre; the other items target random locations.
+
+    python worldgen.py OUTDIR --width 1000 --height 1000 --items 5000 --specials 50 --seed 111
+
+Copyright and Usage Information
+===============================
+
+This file is provided solely for the personal and private use of students
+taking CSC111 at the University of Toronto St. George campus. All forms of
+distribution of this code, whether as given or with any changes, are
+expressly prohibited. For more information on copyright for CSC111 materials,
+please consult our Course Syllabus.
+
+This file is Copyright (c) 2024 CSC111 Teaching Team
+"""
+import os
+import random
+from typing import TextIO
+
+from engine import EXAM_X, EXAM_Y, EXAM_POSITION, START_X, START_Y
+
+BUFFER_SIZE = 1 << 20
+
+PLACES = ['library', 'lecture hall', 'courtyard', 'cafeteria', 'study room', 'computer lab', 'bike rack',
+          'staircase', 'lounge', 'bookstore', 'quad', 'hallway', 'bus stop', 'greenhouse', 'gym']
+DETAILS = ['Students hurry past on their way to class.', 'Someone nearby is arguing about recursion.',
+           'A vending machine hums quietly in the corner.', 'The smell of coffee drifts through the air.',
+           'A poster advertises a hackathon that ended last week.', 'Rain taps softly against the windows.',
+           'A group of friends is cramming for the same exam as you.', 'Pigeons watch you with suspicion.']
+ADJECTIVES = ['Red', 'Old', 'Shiny', 'Lost', 'Tiny', 'Heavy', 'Lucky', 'Spare', 'Borrowed', 'Crumpled']
+NOUNS = ['Notebook', 'Calculator', 'Eraser', 'Stapler', 'Highlighter', 'Water Bottle', 'Umbrella', 'Textbook',
+         'Charger', 'Headphones']
+
+
+def generate(directory: str, width: int, height: int, num_items: int, num_specials: int = 0, winning: int = 3,
+             density: float = 0.7, seed: int = 111) -> tuple[str, str, str]:
+    """Write a generated world to map.txt, locations.txt and items.txt in directory and return their paths.
+
+    Preconditions:
+        - width > max(EXAM_X, START_X) and height > max(EXAM_Y, START_Y)
+        - num_items >= winning >= 0 and num_specials >= 0
+        - num_items > 0 or num_specials == 0
+        - 0.0 <= density <= 1.0
+    """
+    os.makedirs(directory, exist_ok=True)
+    paths = tuple(os.path.join(directory, name) for name in ('map.txt', 'locations.txt', 'items.txt'))
+    rng = random.Random(seed)
+
+    with open(paths[0], 'w', buffering=BUFFER_SIZE) as map_file:
+        count = write_map(map_file, width, height, density, rng)
+
+    with open(paths[1], 'w', encoding='utf-8', buffering=BUFFER_SIZE) as locations_file:
+        write_locations(locations_file, count, rng)
+
+    with open(paths[2], 'w', buffering=BUFFER_SIZE) as items_file:
+        write_items(items_file, count, num_items, num_specials, winning, rng)
+
+    return paths
+
+
+def write_map(map_file: TextIO, width: int, height: int, density: float, rng: random.Random) -> int:
+    """Write a connected width x height map to map_file, one row at a time, and return the number of locations
+    on it.
+    """
+    count = 0
+    held = []  # the rows up to the Exam Centre's, held back until its position can be swapped in
+
+    for y in range(height):
+        row = [-1] * width
+        crossing = rng.randrange(width)
+        for x in range(width):
+            if y % 2 == 0 or x == crossing or (x, y) == (START_X, START_Y) or rng.random() < density:
+                row[x] = count
+                count += 1
+
+        if y <= EXAM_Y:
+            held.append(row)
+            if y == EXAM_Y:
+                _swap_in_exam(held)
+                for held_row in held:
+                    map_file.write(' '.join(map(str, held_row)) + '\n')
+                held = []
+        else:
+            map_file.write(' '.join(map(str, row)) + '\n')
+
+    return count
+
+
+def _swap_in_exam(rows: list[list[int]]) -> None:
+    """Swap the position of the Exam Centre's cell in rows with EXAM_POSITION, wherever that is.
+    """
+    exam = rows[EXAM_Y][EXAM_X]
+    for row in rows:
+        for x, position in enumerate(row):
+            if position == EXAM_POSITION:
+                row[x] = exam
+    rows[EXAM_Y][EXAM_X] = EXAM_POSITION
+
+
+def write_locations(locations_file: TextIO, count: int, rng: random.Random) -> None:
+    """Write count locations (numbered 0 to count - 1, in order) to locations_file.
+    """
+    for position in range(count):
+        if position == EXAM_POSITION:
+            place = 'Exam Centre'
+            details = 'Rows of empty desks wait for the evening exam. This is where your items need to end up.'
+        else:
+            place = f'{rng.choice(PLACES)} #{position}'
+            details = ' '.join(rng.sample(DETAILS, 2))
+        points = rng.choice((0, 0, 0, 5, 10))
+        locations_file.write(f'{position}\n{points}\n'
+                             f'You are at the {place}.\n'
+                             f'You are at the {place}. {details}\n'
+                             f'Exits lead off in several directions.\n'
+                             'END\n\n')
+
+
+def write_items(items_file: TextIO, count: int, num_items: int, num_specials: int, winning: int,
+                rng: random.Random) -> None:
+    """Write num_items normal items and then num_specials SpecialItems, placed at random among count locations,
+    to items_file.
+    """
+    for i in range(num_items):
+        target = EXAM_POSITION if i < winning else rng.randrange(count)
+        items_file.write(f'{rng.randrange(count)} {target} 25 {_item_name(i)}\n')
+
+    if num_specials:
+        items_file.write('\n')
+    for i in range(num_specials):
+        name = f'Locked {_item_name(num_items + i)}'
+        key = _item_name(rng.randrange(num_items))
+        items_file.write(f'{rng.randrange(count)} {EXAM_POSITION} 25 {name}\n'
+                         f'{key}\n'
+                         f'The {name} is locked away. Perhaps the {key} would help.\n')
+
+
+def _item_name(i: int) -> str:
+    """Return the name of the i-th generated item (unique for every i).
+    """
+    return f'{ADJECTIVES[i % len(ADJECTIVES)]} {NOUNS[i // len(ADJECTIVES) % len(NOUNS)]} {i}'
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Generate a text adventure world.')
+    parser.add_argument('directory')
+    parser.add_argument('--width', type=int, default=100)
+    parser.add_argument('--height', type=int, default=100)
+    parser.add_argument('--items', type=int, default=100)
+    parser.add_argument('--specials', type=int, default=10)
+    parser.add_argument('--winning', type=int, default=3)
+    parser.add_argument('--density', type=float, default=0.7)
+    parser.add_argument('--seed', type=int, default=111)
+    args = parser.parse_args()
+
+    generate(args.directory, args.width, args.height, args.items, args.specials, args.winning, args.density,
+             args.seed)